@@ -5,9 +5,51 @@ __author__ = 'John Krauss'
 __license__ = 'BSD'
 __copyright__ = 'Copyright 2012 John Krauss'
 
-from .api import init
-from .utils import signature, global_config
+import importlib
+import sys
+import types
+
 from .exceptions import (
     NotJsonError, InvalidKeyError, DifferentRepoError, NoGlobalSettingError,
-    StagedDataError )
+    StagedDataError, GitCommandError, HeadMismatchError, PatchError )
 from .constants import GIT_SORT_NONE, GIT_SORT_TOPOLOGICAL, GIT_SORT_TIME, GIT_SORT_REVERSE
+
+# pygit2 and json_diff are slow to import, so nothing that needs them is
+# imported until it is first used.
+_LAZY = {
+    'init': ('api', 'init'),
+    'open_readonly': ('api', 'open_readonly'),
+    'signature': ('utils', 'signature'),
+    'global_config': ('utils', 'global_config'),
+}
+_SUBMODULES = frozenset([
+    'api', 'bench', 'history', 'maintenance', 'metrics', 'models', 'patches',
+    'paths', 'serializers', 'tracing', 'utils', 'views', 'watch',
+    'wrappers'])
+
+
+class _LazyModule(types.ModuleType):
+
+    def __getattr__(self, name):
+        if name in _LAZY:
+            module, attr = _LAZY[name]
+            value = getattr(importlib.import_module('.' + module, __name__),
+                            attr)
+        elif name in _SUBMODULES:
+            value = importlib.import_module('.' + name, __name__)
+        else:
+            raise AttributeError("'module' object has no attribute '%s'" %
+                                 name)
+        setattr(self, name, value)
+        return value
+
+    def __dir__(self):
+        return sorted(set(self.__dict__) | set(_LAZY) | _SUBMODULES)
+
+
+_module = _LazyModule(__name__, __doc__)
+_module.__dict__.update(sys.modules[__name__].__dict__)
+# The functions above use this module's globals, which are cleared if it is
+# garbage collected, so it must stay referenced.
+_module._original = sys.modules[__name__]
+sys.modules[__name__] = _module
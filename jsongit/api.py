@@ -7,7 +7,7 @@ jsongit.api
 import os
 import pygit2
 
-from .models import Repository
+from .models import Repository, ReadOnlyRepository
 import utils
 
 def init(path=None, repo=None, **kwargs):
@@ -39,6 +39,27 @@ def init(path=None, repo=None, **kwargs):
         (optional) An alternate function to use when loading data.  Defaults
         to :func:`json.loads`.
     :type loads: func
+    :param history_index:
+        (optional) Whether to keep an index of commit times for each key, so
+        that :func:`show <jsongit.models.Repository.show>` and :func:`head
+        <jsongit.models.Repository.head>` with `at` do not need to walk the
+        key's log.  Defaults to False.
+    :type history_index: boolean
+    :param codec:
+        (optional) The name of a codec in :mod:`jsongit.serializers` to write
+        values with, such as `'msgpack'`.  Blobs are tagged with the codec
+        that wrote them, so values written with any registered codec can be
+        read back.  Defaults to None, which writes untagged blobs with
+        `dumps`.
+    :type codec: string
+    :param metrics:
+        (optional) Where to report the time taken by each operation and its
+        phases.  Defaults to None, which costs next to nothing.
+    :type metrics: :class:`Metrics <jsongit.metrics.Metrics>`
+    :param tracer:
+        (optional) Where to send a span for each operation and its phases.
+        Defaults to None, which does not trace.
+    :type tracer: :class:`Tracer <jsongit.tracing.Tracer>`
 
     :returns: A repository reference
     :rtype: :class:`Repository <jsongit.models.Repository>`
@@ -55,4 +76,48 @@ def init(path=None, repo=None, **kwargs):
         raise TypeError("Missing repo or path")
     dumps = kwargs.pop('dumps', utils.import_json().dumps)
     loads = kwargs.pop('loads', utils.import_json().loads)
-    return Repository(repo, dumps, loads)
+    history_index = kwargs.pop('history_index', False)
+    codec = kwargs.pop('codec', None)
+    metrics = kwargs.pop('metrics', None)
+    tracer = kwargs.pop('tracer', None)
+    return Repository(repo, dumps, loads, history_index=history_index,
+                      codec=codec, metrics=metrics, tracer=tracer)
+
+def open_readonly(path, **kwargs):
+    """Obtain a :class:`ReadOnlyRepository` for an existing repository.  It
+    can only read, and does not need git config, so it is cheap to open and
+    suited to processes that never write.
+
+    >>> repo = jsongit.open_readonly('path/to/repo')
+    >>> repo.show('foo')
+    u'bar'
+
+    :param path: The path to an existing repository.
+    :type path: string
+    :param loads:
+        (optional) An alternate function to use when loading data.  Defaults
+        to :func:`json.loads`.
+    :type loads: func
+    :param cache_size:
+        (optional) How many decoded values to keep.  Defaults to 1024.
+    :type cache_size: int
+    :param metrics:
+        (optional) Where to report the time taken by each operation.
+    :type metrics: :class:`Metrics <jsongit.metrics.Metrics>`
+    :param tracer:
+        (optional) Where to send a span for each operation.
+    :type tracer: :class:`Tracer <jsongit.tracing.Tracer>`
+
+    :returns: A read-only repository reference
+    :rtype: :class:`ReadOnlyRepository <jsongit.models.ReadOnlyRepository>`
+    :raises: KeyError if there is no repository at path
+    """
+    repo = pygit2.Repository(path)
+    loads = kwargs.pop('loads', utils.import_json().loads)
+    cache_size = kwargs.pop('cache_size', 1024)
+    metrics = kwargs.pop('metrics', None)
+    tracer = kwargs.pop('tracer', None)
+    if kwargs:
+        raise TypeError("Unknown keyword args %s" % kwargs)
+    return ReadOnlyRepository(repo, loads, cache_size=cache_size,
+                              metrics=metrics, tracer=tracer)
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+
+"""
+jsongit.bench
+
+A benchmark suite for jsongit's hot paths.  Run it with::
+
+    $ python -m jsongit.bench --output results.json
+    $ python -m jsongit.bench --baseline results.json
+
+Results are JSON, so a run can be saved and later runs compared against it.
+"""
+
+import collections
+import contextlib
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+#: Registered benchmarks, by name, in the order they run.
+BENCHMARKS = collections.OrderedDict()
+
+
+def benchmark(name):
+    """Decorator to register a benchmark.  The benchmark is called with a
+    :class:`Context`, and should time its hot path with
+    :func:`Context.timer`.
+    """
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+class Context(object):
+    """What a benchmark gets to work with: scratch repositories, a seeded
+    random generator, a size to scale to, and somewhere to put results.
+    """
+
+    def __init__(self, scale=1, seed=0):
+        self.scale = scale
+        self.random = random.Random(seed)
+        self.seconds = None
+        self.ops = None
+        self.extra = {}
+        self._dirs = []
+
+    def n(self, base):
+        """Scale a number of operations.
+        """
+        return max(1, int(base * self.scale))
+
+    def repo(self, **kwargs):
+        """Create a scratch repository, removed once the benchmark ends.
+
+        :param kwargs: keyword arguments for :func:`jsongit.init`
+        """
+        import jsongit
+        path = tempfile.mkdtemp(prefix='jsongit-bench-')
+        self._dirs.append(path)
+        return jsongit.init(os.path.join(path, 'repo'), **kwargs)
+
+    @contextlib.contextmanager
+    def timer(self, ops):
+        """Time the body of a `with` block, which performs ops operations.
+        """
+        start = time.time()
+        yield
+        self.seconds = time.time() - start
+        self.ops = ops
+
+    def record(self, name, value):
+        """Record an extra measurement, such as a size in bytes.
+        """
+        self.extra[name] = value
+
+    def close(self):
+        for path in self._dirs:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def run(names=None, repeat=3, scale=1, out=None):
+    """Run benchmarks, keeping the fastest of several repeats of each.
+
+    :param names:
+        (optional) Substrings to select benchmarks by name.  Defaults to all.
+    :type names: list of strings
+    :param repeat: (optional) How many times to run each benchmark.
+    :type repeat: int
+    :param scale: (optional) How much to scale operation counts by.
+    :type scale: number
+    :param out: (optional) A file to report progress to.
+
+    :returns:
+        the results, suitable for :func:`json.dump`.  A benchmark that
+        raises is reported and recorded with its `error`, and the rest
+        still run.
+    :rtype: dict
+    """
+    import benchmarks
+    benchmarks  # registers the benchmarks
+
+    results = collections.OrderedDict()
+    for name, func in BENCHMARKS.iteritems():
+        if names and not any(n in name for n in names):
+            continue
+        best = None
+        try:
+            for i in xrange(repeat):
+                ctx = Context(scale=scale)
+                try:
+                    func(ctx)
+                finally:
+                    ctx.close()
+                if ctx.seconds is not None and (
+                        best is None or ctx.seconds < best.seconds):
+                    best = ctx
+        except Exception as e:
+            error = '%s: %s' % (type(e).__name__, e)
+            results[name] = collections.OrderedDict([('error', error)])
+            if out is not None:
+                out.write('%-32s FAILED %s\n' % (name, error))
+            continue
+        if best is None:
+            continue
+        result = collections.OrderedDict([
+            ('seconds', best.seconds),
+            ('ops', best.ops),
+            ('ops_per_second', best.ops / best.seconds if best.seconds else None),
+        ])
+        result.update(sorted(best.extra.iteritems()))
+        results[name] = result
+        if out is not None:
+            out.write('%-32s %10.4fs %12s ops/s\n' % (
+                name, best.seconds,
+                '%.1f' % result['ops_per_second']
+                if result['ops_per_second'] else '-'))
+    return collections.OrderedDict([
+        ('python', platform.python_version()),
+        ('platform', platform.platform()),
+        ('scale', scale),
+        ('results', results),
+    ])
+
+
+def compare(current, baseline, threshold=0.2):
+    """Find benchmarks that got slower than a baseline run.
+
+    :param current: results from :func:`run`
+    :type current: dict
+    :param baseline: results from an earlier :func:`run`
+    :type baseline: dict
+    :param threshold:
+        (optional) How much slower, as a fraction, counts as a regression.
+        Defaults to 0.2.
+    :type threshold: float
+
+    :returns:
+        `(name, baseline seconds, current seconds)` for every regression.
+    :rtype: list of tuples
+    """
+    regressions = []
+    before = baseline['results']
+    for name, result in current['results'].iteritems():
+        if 'error' in result:
+            continue
+        if name in before and before[name].get('seconds'):
+            ratio = result['seconds'] / before[name]['seconds']
+            if ratio > 1 + threshold:
+                regressions.append((name, before[name]['seconds'],
+                                    result['seconds']))
+    return regressions
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+"""
+Run the jsongit benchmarks from the command line.
+"""
+
+import argparse
+import json
+import sys
+
+from jsongit import bench
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m jsongit.bench',
+                                     description=__doc__)
+    parser.add_argument('names', nargs='*',
+                        help='only run benchmarks whose names contain these')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='runs of each benchmark, keeping the fastest')
+    parser.add_argument('--scale', type=float, default=1,
+                        help='multiplier for the number of operations')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--baseline',
+                        help='compare against results saved with --output')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='slowdown, as a fraction, counted as a regression')
+    parser.add_argument('--list', action='store_true',
+                        help='list the benchmarks and exit')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        import jsongit.bench.benchmarks
+        for name in bench.BENCHMARKS:
+            print name
+        return 0
+
+    results = bench.run(args.names, repeat=args.repeat, scale=args.scale,
+                        out=sys.stderr)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+    failed = [name for name, result in results['results'].iteritems()
+              if 'error' in result]
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = bench.compare(results, baseline, args.threshold)
+        for name, before, after in regressions:
+            sys.stderr.write('REGRESSION %s: %.4fs -> %.4fs (%+.0f%%)\n' % (
+                name, before, after, (after / before - 1) * 100))
+        if regressions:
+            return 1
+    if failed:
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,520 @@
+# -*- coding: utf-8 -*-
+
+"""
+jsongit.bench.benchmarks
+
+The benchmarks themselves.  Each builds what it needs outside of
+:func:`Context.timer <jsongit.bench.Context.timer>`, and times only the
+operation it is named for.
+"""
+
+import copy
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+
+from jsongit import constants, paths, serializers
+from jsongit.wrappers import Diff, Conflict
+from . import benchmark
+from .generators import random_document, mutate
+
+
+_corpus = {}
+
+def documents(ctx, count, size=10):
+    """The same count documents of size keys for every benchmark and every
+    run, since generating them is slow.
+    """
+    if (count, size) not in _corpus:
+        r = random.Random(0)
+        _corpus[count, size] = [random_document(r, i, size)
+                                for i in xrange(count)]
+    return _corpus[count, size]
+
+def history(ctx, repo, key, depth, size=10):
+    doc = documents(ctx, 1, size)[0]
+    for i in xrange(depth):
+        doc = mutate(ctx.random, i, doc, 1)
+        repo.commit(key, doc)
+    return doc
+
+def rss():
+    """Resident memory of this process, in bytes.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (IOError, OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+@benchmark('add')
+def bench_add(ctx):
+    repo = ctx.repo()
+    docs = documents(ctx, ctx.n(100))
+    with ctx.timer(len(docs)):
+        for i, doc in enumerate(docs):
+            repo.add('key%d' % i, doc)
+
+@benchmark('commit')
+def bench_commit(ctx):
+    repo = ctx.repo()
+    docs = documents(ctx, ctx.n(100))
+    with ctx.timer(len(docs)):
+        for i, doc in enumerate(docs):
+            repo.commit('key%d' % i, doc)
+
+@benchmark('commit.transaction')
+def bench_commit_transaction(ctx):
+    repo = ctx.repo()
+    docs = documents(ctx, ctx.n(100))
+    with ctx.timer(len(docs)):
+        with repo.transaction() as tx:
+            for i, doc in enumerate(docs):
+                tx.add('key%d' % i, doc)
+
+@benchmark('status')
+def bench_status(ctx):
+    repo = ctx.repo()
+    docs = documents(ctx, ctx.n(100))
+    for i, doc in enumerate(docs):
+        repo.add('key%d' % i, doc)
+    repo.commit()
+    for i in xrange(0, len(docs), 2):
+        repo.add('key%d' % i, docs[0])
+    with ctx.timer(len(docs)):
+        for key, state in repo.status():
+            pass
+
+@benchmark('commit.same_key')
+def bench_commit_same_key(ctx):
+    repo = ctx.repo()
+    docs = documents(ctx, ctx.n(100))
+    with ctx.timer(len(docs)):
+        for doc in docs:
+            repo.commit('key', doc)
+
+@benchmark('commit.unchanged')
+def bench_commit_unchanged(ctx):
+    repo = ctx.repo()
+    docs = documents(ctx, ctx.n(100))
+    for i, doc in enumerate(docs):
+        repo.commit('key%d' % i, doc)
+    with ctx.timer(len(docs)):
+        for i, doc in enumerate(docs):
+            repo.commit('key%d' % i, doc, if_changed=True)
+
+@benchmark('commit.threaded')
+def bench_commit_threaded(ctx):
+    repo = ctx.repo()
+    threads = 4
+    docs = documents(ctx, ctx.n(100))
+    errors = []
+    def work(t):
+        try:
+            for i in xrange(t, len(docs), threads):
+                repo.commit('key%d' % i, docs[i])
+        except Exception:
+            errors.append(sys.exc_info())
+    pool = [threading.Thread(target=work, args=(t,)) for t in xrange(threads)]
+    with ctx.timer(len(docs)):
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+    if errors:
+        raise errors[0][0], errors[0][1], errors[0][2]
+
+@benchmark('show')
+def bench_show(ctx):
+    repo = ctx.repo()
+    count = ctx.n(100)
+    for i, doc in enumerate(documents(ctx, count)):
+        repo.commit('key%d' % i, doc)
+    with ctx.timer(count):
+        for i in xrange(count):
+            repo.show('key%d' % i)
+
+@benchmark('show.readonly')
+def bench_show_readonly(ctx):
+    import jsongit
+    repo = ctx.repo()
+    count = ctx.n(100)
+    for i, doc in enumerate(documents(ctx, count)):
+        repo.commit('key%d' % i, doc)
+    reader = jsongit.open_readonly(repo._repo.path)
+    for i in xrange(count):
+        reader.show('key%d' % i)
+    with ctx.timer(count):
+        for i in xrange(count):
+            reader.show('key%d' % i)
+
+def large_document(ctx, fields):
+    """A document of many fields, each a small nested record.
+    """
+    return dict(('field%05d' % i, {'id': i, 'tags': ['a', 'b', 'c'],
+                                   'name': 'name%d' % i})
+                for i in xrange(fields))
+
+def bench_show_large(ctx, where):
+    repo = ctx.repo()
+    doc = large_document(ctx, ctx.n(20000))
+    repo.commit('key', doc)
+    # fields are serialized in the order the dict iterates them
+    fields = list(doc)
+    if where == 'middle':
+        where = len(fields) // 2
+    path = None if where is None else '%s.name' % fields[where]
+    count = ctx.n(20)
+    with ctx.timer(count):
+        for i in xrange(count):
+            repo.show('key', path=path)
+    blob = repo._repo[repo.head('key')._commit.tree[0].oid]
+    ctx.record('blob_bytes', len(blob.data))
+
+for _name, _where in (('full', None), ('path.first', 0),
+                      ('path.middle', 'middle'), ('path.last', -1)):
+    benchmark('show.large.%s' % _name)(
+        lambda ctx, where=_where: bench_show_large(ctx, where))
+
+@benchmark('checkout')
+def bench_checkout(ctx):
+    repo = ctx.repo()
+    repo.commit('key', large_document(ctx, ctx.n(2000)))
+    count = ctx.n(20)
+    with ctx.timer(count):
+        for i in xrange(count):
+            repo.checkout('key', 'copy%d' % i)
+
+def bench_checkout_prefix(ctx, batch):
+    repo = ctx.repo()
+    count = ctx.n(200)
+    for i, doc in enumerate(documents(ctx, count)):
+        repo.add('a/key%d' % i, doc)
+    repo.commit()
+    with ctx.timer(count):
+        if batch:
+            repo.checkout_prefix('a/', 'b/')
+        else:
+            for i in xrange(count):
+                repo.checkout('a/key%d' % i, 'b/key%d' % i)
+
+benchmark('checkout.prefix')(lambda ctx: bench_checkout_prefix(ctx, True))
+benchmark('checkout.loop')(lambda ctx: bench_checkout_prefix(ctx, False))
+
+@benchmark('head.back')
+def bench_head_back(ctx):
+    repo = ctx.repo()
+    depth = ctx.n(100)
+    history(ctx, repo, 'key', depth)
+    with ctx.timer(1):
+        repo.head('key', back=depth - 1)
+
+@benchmark('compact')
+def bench_compact(ctx):
+    repo = ctx.repo()
+    depth = ctx.n(1000)
+    history(ctx, repo, 'key', depth)
+    with ctx.timer(depth):
+        report = repo.compact('key', keep_last=10)
+    ctx.record('commits_after', report['commits_after'])
+
+@benchmark('log.walk.compacted')
+def bench_log_walk_compacted(ctx):
+    repo = ctx.repo()
+    depth = ctx.n(1000)
+    history(ctx, repo, 'key', depth)
+    repo.compact('key', keep_last=10)
+    with ctx.timer(1):
+        for commit in repo.log('key'):
+            pass
+
+@benchmark('log.walk')
+def bench_log_walk(ctx):
+    repo = ctx.repo()
+    depth = ctx.n(200)
+    history(ctx, repo, 'key', depth)
+    with ctx.timer(depth):
+        for commit in repo.log('key'):
+            pass
+
+@benchmark('log.walk.info')
+def bench_log_walk_info(ctx):
+    repo = ctx.repo()
+    depth = ctx.n(200)
+    history(ctx, repo, 'key', depth)
+    with ctx.timer(depth):
+        for commit in repo.log('key', info=True):
+            pass
+
+@benchmark('log.memory')
+def bench_log_memory(ctx):
+    repo = ctx.repo()
+    depth = ctx.n(500)
+    history(ctx, repo, 'key', depth)
+    before = rss()
+    commits = list(repo.log('key'))
+    ctx.record('commit_bytes', max(0, rss() - before))
+    del commits
+    before = rss()
+    with ctx.timer(depth):
+        infos = list(repo.log('key', info=True))
+    ctx.record('info_bytes', max(0, rss() - before))
+    del infos
+
+def bench_log_first(ctx, order, first_parent):
+    repo = ctx.repo()
+    depth = ctx.n(10000)
+    history(ctx, repo, 'key', depth)
+    with ctx.timer(1):
+        repo.log('key', order=order, info=True,
+                 first_parent=first_parent).next()
+
+for _name, _order in (('time', constants.GIT_SORT_TIME),
+                      ('none', constants.GIT_SORT_NONE),
+                      ('topological', constants.GIT_SORT_TOPOLOGICAL)):
+    benchmark('log.first.' + _name)(
+        lambda ctx, order=_order: bench_log_first(ctx, order, False))
+benchmark('log.first.first_parent')(
+    lambda ctx: bench_log_first(ctx, constants.GIT_SORT_NONE, True))
+
+def bench_merge(ctx, depth):
+    repo = ctx.repo()
+    base = documents(ctx, 1)[0]
+    repo.commit('source', base)
+    repo.checkout('source', 'dest')
+    source, dest = base, base
+    for i in xrange(depth):
+        source = dict(source, **{'source%d' % i: i})
+        repo.commit('source', source)
+        dest = dict(dest, **{'dest%d' % i: i})
+        repo.commit('dest', dest)
+    with ctx.timer(1):
+        merge = repo.merge('dest', 'source')
+    assert merge.success
+
+for _depth in (1, 10, 50):
+    benchmark('merge.depth%d' % _depth)(
+        lambda ctx, depth=_depth: bench_merge(ctx, depth))
+
+@benchmark('diff')
+def bench_diff(ctx):
+    count = ctx.n(100)
+    pairs = [(doc, mutate(ctx.random, i, doc, 3))
+             for i, doc in enumerate(documents(ctx, count))]
+    with ctx.timer(count):
+        for a, b in pairs:
+            Diff(a, b)
+
+@benchmark('diff.apply')
+def bench_diff_apply(ctx):
+    count = ctx.n(100)
+    pairs = []
+    for i, doc in enumerate(documents(ctx, count)):
+        pairs.append((doc, Diff(doc, mutate(ctx.random, i, doc, 3))))
+    with ctx.timer(count):
+        for doc, diff in pairs:
+            diff.apply(doc)
+
+def deep_document(ctx, depth, width):
+    """A document nesting dicts depth levels deep, width keys wide.
+    """
+    if depth == 0:
+        return dict(('leaf%d' % i, i) for i in xrange(width))
+    return dict(('level%d' % i, deep_document(ctx, depth - 1, width))
+                for i in xrange(width))
+
+def bench_apply_large(ctx, shape, in_place):
+    if shape == 'list':
+        size = ctx.n(20000)
+        a = range(size)
+        # an update in the middle, and many appends at the end
+        b = a[:size // 2] + [-1] + a[size // 2 + 1:] + range(size // 10)
+    elif shape == 'list.remove':
+        size = ctx.n(20000)
+        a = range(size)
+        b = a[:size - size // 10]
+    else:
+        a = deep_document(ctx, 5, 6)
+        b = deep_document(ctx, 5, 6)
+        b['level0']['level0']['level0']['level0']['level0']['leaf0'] = -1
+        b['level5'] = {}
+    diff = Diff(a, b)
+    count = ctx.n(20)
+    if in_place:
+        originals = [copy.deepcopy(a) for i in xrange(count)]
+    else:
+        originals = [a] * count
+    with ctx.timer(count):
+        for original in originals:
+            diff.apply(original, in_place=in_place)
+
+for _shape in ('list', 'list.remove', 'deep'):
+    benchmark('diff.apply.%s' % _shape)(
+        lambda ctx, shape=_shape: bench_apply_large(ctx, shape, False))
+    benchmark('diff.apply.%s.inplace' % _shape)(
+        lambda ctx, shape=_shape: bench_apply_large(ctx, shape, True))
+
+def bench_patch(ctx, rmw):
+    repo = ctx.repo()
+    doc = large_document(ctx, ctx.n(2000))
+    repo.commit('key', doc)
+    count = ctx.n(20)
+    with ctx.timer(count):
+        for i in xrange(count):
+            if rmw:
+                value = repo.show('key')
+                value['field00000']['name'] = 'name%d' % i
+                repo.commit('key', value)
+            else:
+                repo.patch('key', [{'op': 'replace',
+                                    'path': '/field00000/name',
+                                    'value': 'name%d' % i}])
+
+benchmark('patch')(lambda ctx: bench_patch(ctx, False))
+benchmark('patch.rmw')(lambda ctx: bench_patch(ctx, True))
+
+def bench_diff_log(ctx, cached):
+    repo = ctx.repo()
+    depth = ctx.n(50)
+    history(ctx, repo, 'key', depth)
+    if cached:
+        for back in xrange(depth - 1):
+            repo.diff('key', 'key', back_a=back + 1, back_b=back)
+    with ctx.timer(depth - 1):
+        for back in xrange(depth - 1):
+            repo.diff('key', 'key', back_a=back + 1, back_b=back)
+
+benchmark('diff.log')(lambda ctx: bench_diff_log(ctx, False))
+benchmark('diff.log.cached')(lambda ctx: bench_diff_log(ctx, True))
+
+def bench_blame(ctx, mode):
+    repo = ctx.repo()
+    depth = ctx.n(200)
+    doc = history(ctx, repo, 'key', depth)
+    path = None
+    if mode == 'path':
+        path = sorted(paths.leaves(doc))[0][0]
+    elif mode == 'cached':
+        repo.blame('key')
+        repo.commit('key', mutate(ctx.random, depth, doc, 1))
+    with ctx.timer(1):
+        repo.blame('key', path=path)
+
+for _mode in ('full', 'path', 'cached'):
+    benchmark('blame' if _mode == 'full' else 'blame.' + _mode)(
+        lambda ctx, mode=_mode: bench_blame(ctx, mode))
+
+@benchmark('conflict')
+def bench_conflict(ctx):
+    count = ctx.n(100)
+    pairs = []
+    for i, doc in enumerate(documents(ctx, count)):
+        pairs.append((Diff(doc, mutate(ctx.random, i, doc, 3)),
+                      Diff(doc, mutate(ctx.random, i + count, doc, 3))))
+    with ctx.timer(count):
+        for a, b in pairs:
+            Conflict(a, b)
+
+@benchmark('query.index')
+def bench_query_index(ctx):
+    repo = ctx.repo()
+    repo.create_index('age', path='age')
+    count = ctx.n(200)
+    for i in xrange(count):
+        repo.commit('key%d' % i, {'age': i % 100, 'name': 'name%d' % i})
+    queries = ctx.n(100)
+    with ctx.timer(queries * 2):
+        for i in xrange(queries):
+            repo.query('age', i % 100)
+            repo.query('age', low=i % 100, high=i % 100 + 10)
+
+@benchmark('query.scan')
+def bench_query_scan(ctx):
+    repo = ctx.repo()
+    count = ctx.n(200)
+    for i in xrange(count):
+        repo.commit('key%d' % i, {'age': i % 100, 'name': 'name%d' % i})
+    queries = ctx.n(10)
+    with ctx.timer(queries):
+        for i in xrange(queries):
+            [key for key in repo.keys() if repo.show(key)['age'] == i % 100]
+
+def bench_codec(ctx, name):
+    if name == 'json':
+        repo = ctx.repo()
+        encode, decode = repo._encode, repo._decode
+    else:
+        try:
+            serializers.lookup(name)
+        except ImportError:
+            return
+        repo = ctx.repo(codec=name)
+        encode, decode = repo._encode, repo._decode
+    docs = documents(ctx, ctx.n(100))
+    with ctx.timer(len(docs) * 2):
+        for doc in docs:
+            decode(encode(doc))
+    start = time.time()
+    encoded = [encode(doc) for doc in docs]
+    ctx.record('encode_seconds', time.time() - start)
+    start = time.time()
+    for raw in encoded:
+        decode(raw)
+    ctx.record('decode_seconds', time.time() - start)
+    for i, doc in enumerate(docs):
+        repo.add('key%d' % i, doc)
+    repo.commit()
+    stats = repo.stats()
+    ctx.record('encoded_bytes', sum(len(raw) for raw in encoded))
+    ctx.record('physical_bytes', stats['physical_bytes'])
+
+for _codec in ('json', 'msgpack', 'cbor', 'orjson', 'ujson'):
+    benchmark('codec.%s' % _codec)(
+        lambda ctx, name=_codec: bench_codec(ctx, name))
+
+def interpreter(code):
+    """Run code in a fresh interpreter that imports this jsongit, returning
+    its output and errors.
+    """
+    import jsongit
+    path = os.path.dirname(os.path.dirname(os.path.abspath(jsongit.__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+        [path, os.environ.get('PYTHONPATH', '')]))
+    proc = subprocess.Popen([sys.executable, '-c', code],
+                            env=env, stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE, universal_newlines=True)
+    out, err = proc.communicate()
+    if proc.returncode != 0:
+        raise RuntimeError(err)
+    return out, err
+
+def bench_import(ctx, code):
+    runs = ctx.n(10)
+    start = time.time()
+    for i in xrange(runs):
+        interpreter('pass')
+    ctx.record('startup_seconds', time.time() - start)
+    with ctx.timer(runs):
+        for i in xrange(runs):
+            interpreter(code)
+    out, err = interpreter('import sys, time; before = set(sys.modules); '
+                           'start = time.time(); %s; '
+                           'print(time.time() - start); '
+                           'print(len(set(sys.modules) - before))' % code)
+    seconds, modules = out.split()
+    ctx.record('import_seconds', float(seconds))
+    ctx.record('modules', int(modules))
+
+@benchmark('import')
+def bench_import_jsongit(ctx):
+    bench_import(ctx, 'import jsongit')
+
+@benchmark('import.init')
+def bench_import_init(ctx):
+    path = ctx.repo()._repo.path
+    bench_import(ctx, 'import jsongit; jsongit.init(%r)' % path)
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+"""
+jsongit.bench.generators
+
+Random JSON-compatible values, shared by the benchmarks and the threading
+tests.
+"""
+
+import sys
+import string
+
+MAX_DEPTH = 1
+
+def random_number(r, j, l, min=-sys.maxint, max=sys.maxint):
+    r.jumpahead(j + l)
+    return r.random() * (max - min) + min
+
+def random_string(r, j, l, min=1, max=50):
+    r.jumpahead(j + l)
+    return ''.join(r.choice(string.ascii_letters +
+                            string.digits)
+                   for i in xrange(r.randint(min, max)))
+
+def random_array(r, j, l, min=1, max=10):
+    if l > MAX_DEPTH:
+        return []
+    r.jumpahead(j + l)
+    return [random_object(r, i, l + 1) for i in xrange(r.randint(min, max))]
+
+def random_dict(r, j, l, min=1, max=10):
+    if l > MAX_DEPTH:
+        return {}
+    r.jumpahead(j + l)
+    return dict([(r.choice([random_string, random_number])(r, i, l),
+                  random_object(r, i, l + 1))
+                 for i in xrange(r.randint(min, max))])
+
+def random_object(r, j, l):
+    r.jumpahead(j + l)
+    return r.choice([random_array, random_dict, random_string, random_number])(r, j, l)
+
+def random_document(r, j, size):
+    """A dict with size string keys, each holding a random object.
+    """
+    return dict((random_string(r, j + i, 0), random_object(r, j + i, 0))
+                for i in xrange(size))
+
+def perturb(r, j, value):
+    """A changed copy of value with the same structure.  (:mod:`json_diff`
+    cannot compare a nested dict or list with a value of another type.)
+    """
+    if isinstance(value, dict):
+        return mutate(r, j, value, 1)
+    elif isinstance(value, list):
+        return value + [random_string(r, j, 0)]
+    else:
+        return r.choice([random_string, random_number])(r, j, 0)
+
+def mutate(r, j, doc, changes):
+    """A copy of a dict with changes of its keys perturbed, or added if it
+    is empty.
+    """
+    doc = dict(doc)
+    if not doc:
+        doc[random_string(r, j, 0)] = random_string(r, j, 0)
+    for i, k in enumerate(r.sample(sorted(doc), min(changes, len(doc)))):
+        doc[k] = perturb(r, j + i, doc[k])
+    return doc
@@ -4,9 +4,9 @@
 jsongit.constants
 """
 
-import pygit2
-
-GIT_SORT_NONE = pygit2.GIT_SORT_NONE
-GIT_SORT_TOPOLOGICAL = pygit2.GIT_SORT_TOPOLOGICAL
-GIT_SORT_TIME = pygit2.GIT_SORT_TIME
-GIT_SORT_REVERSE = pygit2.GIT_SORT_REVERSE
+# These are libgit2's values, so that importing jsongit does not have to
+# import pygit2 to find them.
+GIT_SORT_NONE = 0
+GIT_SORT_TOPOLOGICAL = 1
+GIT_SORT_TIME = 2
+GIT_SORT_REVERSE = 4
@@ -42,3 +42,26 @@ class StagedDataError(RuntimeError):
     the index. Subclasses :exc:`RuntimeError`
     """
     pass
+
+class GitCommandError(RuntimeError):
+    """Raised when a git command run on behalf of a repository, for example
+    during :func:`maintain <jsongit.models.Repository.maintain>`, fails.
+    Subclasses :exc:`RuntimeError`.
+    """
+
+    def __init__(self, args, message):
+        super(GitCommandError, self).__init__(
+            "git %s failed: %s" % (' '.join(args), message))
+
+class HeadMismatchError(ValueError):
+    """Raised when a key's head is not the commit an update expected, because
+    something else was committed to it first.  Subclasses
+    :exc:`ValueError`.
+    """
+    pass
+
+class PatchError(ValueError):
+    """Raised when a patch cannot be applied to a value.  Subclasses
+    :exc:`ValueError`.
+    """
+    pass
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+
+"""
+jsongit.history
+
+Sidecar files that map commit times to commits for each key, so that the
+value of a key at a point in time can be found without walking its log.
+"""
+
+import bisect
+import errno
+import os
+import struct
+import tempfile
+
+import pygit2
+
+#: Each record is an effective commit time followed by a raw commit oid.
+RECORD = struct.Struct('>q20s')
+
+#: Each file starts with the raw oid of the head it was built for.
+HEADER_SIZE = 20
+
+
+class _Times(object):
+    """Presents the times in a buffer of records as a sequence, so that
+    :mod:`bisect` can search them without unpacking the whole file.
+    """
+
+    def __init__(self, data):
+        self._data = data
+
+    def __len__(self):
+        return (len(self._data) - HEADER_SIZE) // RECORD.size
+
+    def __getitem__(self, i):
+        return RECORD.unpack_from(self._data, HEADER_SIZE + i * RECORD.size)[0]
+
+
+class HistoryIndex(object):
+    """Maintains one file of `(time, oid)` records per key, covering the
+    first-parent history of the key's head in order.
+
+    Record times are the minimum commit time of that commit and every
+    commit after it, so they are sorted even if clocks were skewed, and the
+    last record at or before a time is the newest commit at or before it.
+
+    A file is valid only for the head named in its header.  Commits made
+    through the repository extend it in place; anything else, such as a
+    commit made by another process, is noticed on the next lookup and the
+    file is rebuilt from the key's log.
+    """
+
+    def __init__(self, path):
+        self._path = path
+
+    def _file(self, key):
+        return os.path.join(self._path, key + '.idx')
+
+    def _read(self, key):
+        try:
+            with open(self._file(key), 'rb') as f:
+                return f.read()
+        except IOError as e:
+            if e.errno == errno.ENOENT:
+                return None
+            raise
+
+    def rebuild(self, repo, key, head):
+        """Rebuild the file for key from its first-parent history.
+
+        :param repo: the repository to read the history from
+        :type repo: :class:`pygit2.Repository`
+        :param key: the key
+        :type key: string
+        :param head: the head commit of key
+        :type head: :class:`pygit2.Oid`
+
+        :returns: the contents of the new file
+        :rtype: string
+        """
+        walker = repo.walk(head, pygit2.GIT_SORT_NONE)
+        walker.simplify_first_parent()
+        records = []
+        earliest = None
+        for c in walker:
+            if earliest is None or c.commit_time < earliest:
+                earliest = c.commit_time
+            records.append(RECORD.pack(earliest, c.oid.raw))
+        records.reverse()
+        data = head.raw + ''.join(records)
+
+        path = self._file(key)
+        directory = os.path.dirname(path)
+        if not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError as e:
+                if e.errno != errno.EEXIST:
+                    raise
+        fd, tmp = tempfile.mkstemp(dir=directory)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.rename(tmp, path)
+        return data
+
+    def lookup(self, repo, key, head, time):
+        """Find the newest commit for key at or before time.
+
+        :param repo: the repository to rebuild from, if necessary
+        :type repo: :class:`pygit2.Repository`
+        :param key: the key
+        :type key: string
+        :param head: the current head commit of key
+        :type head: :class:`pygit2.Oid`
+        :param time: the time, in UTC seconds
+        :type time: int
+
+        :returns: the commit, or None if key had no commits by then
+        :rtype: :class:`pygit2.Oid`
+        """
+        data = self._read(key)
+        if data is None or data[:HEADER_SIZE] != head.raw:
+            data = self.rebuild(repo, key, head)
+        i = bisect.bisect_right(_Times(data), time)
+        if i == 0:
+            return None
+        offset = HEADER_SIZE + (i - 1) * RECORD.size
+        return pygit2.Oid(raw=RECORD.unpack_from(data, offset)[1])
+
+    def append(self, key, parent, commit, time):
+        """Extend the file for key with a new head commit.  If the file does
+        not end at parent, or time is earlier than its last record, it is
+        discarded instead, to be rebuilt on the next lookup.
+
+        :param key: the key
+        :type key: string
+        :param parent: the first parent of the new commit, if any
+        :type parent: :class:`pygit2.Oid`
+        :param commit: the new head commit
+        :type commit: :class:`pygit2.Oid`
+        :param time: the commit time of the new head commit
+        :type time: int
+        """
+        try:
+            f = open(self._file(key), 'r+b')
+        except IOError as e:
+            if e.errno == errno.ENOENT:
+                return
+            raise
+        with f:
+            header = f.read(HEADER_SIZE)
+            if parent is not None and header == parent.raw:
+                f.seek(-RECORD.size, os.SEEK_END)
+                last = RECORD.unpack(f.read(RECORD.size))[0]
+                if time >= last:
+                    f.seek(0, os.SEEK_END)
+                    f.write(RECORD.pack(time, commit.raw))
+                    f.seek(0)
+                    f.write(commit.raw)
+                    return
+        self.discard(key)
+
+    def discard(self, key):
+        """Delete the file for key, if there is one.
+
+        :param key: the key
+        :type key: string
+        """
+        try:
+            os.remove(self._file(key))
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                raise
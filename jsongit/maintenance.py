@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+"""
+jsongit.maintenance
+
+Background housekeeping for repositories.
+"""
+
+import logging
+import threading
+
+logger = logging.getLogger('jsongit.maintenance')
+
+
+class MaintenanceScheduler(threading.Thread):
+    """A daemon thread that periodically checks a repository's loose object
+    count and runs :func:`maintain <jsongit.models.Repository.maintain>` once
+    it crosses a threshold.  Obtain one with
+    :func:`schedule_maintenance <jsongit.models.Repository.schedule_maintenance>`.
+    If maintenance fails, the error is logged and kept as :attr:`last_error`,
+    and the repository is checked again after the next interval.
+    """
+
+    def __init__(self, repo, threshold, interval, **kwargs):
+        super(MaintenanceScheduler, self).__init__(name='jsongit-maintenance')
+        self.daemon = True
+        self._repo = repo
+        self._threshold = threshold
+        self._interval = interval
+        self._kwargs = kwargs
+        self._stopped = threading.Event()
+        self._last_report = None
+        self._last_error = None
+
+    def run(self):
+        while not self._stopped.wait(self._interval):
+            try:
+                if self._repo.loose_objects() >= self._threshold:
+                    self._last_report = self._repo.maintain(**self._kwargs)
+            except Exception as e:
+                logger.exception("Maintenance of %s failed",
+                                 self._repo._repo.path)
+                self._last_error = e
+
+    def stop(self, timeout=None):
+        """Stop checking the repository, waiting for any maintenance in
+        progress to finish.
+
+        :param timeout: (optional) How long to wait, in seconds.
+        :type timeout: number
+        """
+        self._stopped.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    @property
+    def last_report(self):
+        """The report from the most recent :func:`maintain
+        <jsongit.models.Repository.maintain>`, or None if it has not run.
+        """
+        return self._last_report
+
+    @property
+    def last_error(self):
+        """The exception from the most recent check or maintenance that
+        failed, or None if none has.
+        """
+        return self._last_error
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+
+"""
+jsongit.metrics
+
+Timings and counts for repository operations.  Pass a :class:`Metrics` to
+:func:`jsongit.init` to receive them:
+
+>>> recorder = jsongit.metrics.Recorder()
+>>> repo = jsongit.init('repo', metrics=recorder)
+>>> repo.commit('foo', 'bar')
+>>> recorder.timings['commit.tree']
+{'count': 1, 'total': 0.000412, 'max': 0.000412}
+
+Timings are named for the operation, such as `commit`, or for a phase of it,
+such as `commit.tree`:
+
+- `add`: `add.serialize`, `add.blob`, `add.index`
+- `commit`: `commit.tree`, `commit.head`, and `commit.ref` for each key,
+  with the number of keys counted as `commit.keys`, and commits skipped by
+  `if_changed` as `commit.unchanged`
+- `merge`: `merge.shared_parent`, `merge.diff`, `merge.conflict`,
+  `merge.apply`
+- `show`, `show_many`, and `decode` for every value read, or
+  `decode.path` when only part of one is read
+- `log`, once a log has been iterated through, for the time spent stepping
+  through it
+- `diff`, with diffs that were remembered counted as `diff.cached`
+- `blame`, with blames that picked up where the last left off counted as
+  `blame.cached`
+"""
+
+import functools
+import logging
+import threading
+import time
+
+
+class Metrics(object):
+    """Receives timings and counts.  Subclass this and override
+    :func:`timing` and :func:`count`.
+    """
+
+    def timing(self, name, seconds):
+        """Called with the time an operation took.
+
+        :param name: the operation or phase
+        :type name: string
+        :param seconds: how long it took
+        :type seconds: float
+        """
+        pass
+
+    def count(self, name, value=1):
+        """Called when something countable happens.
+
+        :param name: what happened
+        :type name: string
+        :param value: (optional) how many times.  Defaults to 1.
+        :type value: int
+        """
+        pass
+
+    def timer(self, name):
+        """A context manager that reports the time its body takes to
+        :func:`timing`.
+        """
+        return _Timer(self, name)
+
+
+class _Timer(object):
+
+    __slots__ = ('_metrics', '_name', '_start')
+
+    def __init__(self, metrics, name):
+        self._metrics = metrics
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.time()
+
+    def __exit__(self, type, value, traceback):
+        self._metrics.timing(self._name, time.time() - self._start)
+
+
+class _NullTimer(object):
+
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, type, value, traceback):
+        pass
+
+
+class NullMetrics(Metrics):
+    """Discards everything.  This is what a repository uses when it is not
+    given metrics, and its timers do not even read the clock.
+    """
+
+    _timer = _NullTimer()
+
+    def timer(self, name):
+        return self._timer
+
+
+#: The shared :class:`NullMetrics`.
+NULL = NullMetrics()
+
+
+def timed(name):
+    """Decorator for :class:`Repository <jsongit.models.Repository>` methods
+    that times each call to them with the repository's metrics.
+    """
+    def decorate(meth):
+        @functools.wraps(meth)
+        def wrapped(self, *args, **kwargs):
+            with self._metrics.timer(name):
+                return meth(self, *args, **kwargs)
+        return wrapped
+    return decorate
+
+
+class Recorder(Metrics):
+    """Aggregates timings and counts in memory.  Safe to share between
+    threads and repositories.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timings = {}
+        self._counts = {}
+
+    def timing(self, name, seconds):
+        with self._lock:
+            stat = self._timings.get(name)
+            if stat is None:
+                self._timings[name] = {'count': 1, 'total': seconds,
+                                       'max': seconds}
+            else:
+                stat['count'] += 1
+                stat['total'] += seconds
+                if seconds > stat['max']:
+                    stat['max'] = seconds
+
+    def count(self, name, value=1):
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + value
+
+    @property
+    def timings(self):
+        """For each name, the number of timings and their total and maximum
+        in seconds.
+
+        :rtype: dict
+        """
+        with self._lock:
+            return dict((name, dict(stat))
+                        for name, stat in self._timings.iteritems())
+
+    @property
+    def counts(self):
+        """The total of each count.
+
+        :rtype: dict
+        """
+        with self._lock:
+            return dict(self._counts)
+
+    def reset(self):
+        """Forget everything recorded so far.
+        """
+        with self._lock:
+            self._timings.clear()
+            self._counts.clear()
+
+
+class PrometheusExporter(Recorder):
+    """A :class:`Recorder` that renders what it has recorded in the
+    Prometheus text exposition format, to be served from a metrics endpoint.
+    """
+
+    def __init__(self, prefix='jsongit'):
+        super(PrometheusExporter, self).__init__()
+        self._prefix = prefix
+
+    def render(self):
+        """
+        :returns: the metrics, in Prometheus text format
+        :rtype: string
+        """
+        lines = []
+        timings = self.timings
+        counts = self.counts
+        if timings:
+            name = '%s_operation_seconds' % self._prefix
+            lines.append('# HELP %s Time spent in jsongit operations.' % name)
+            lines.append('# TYPE %s summary' % name)
+            for op in sorted(timings):
+                stat = timings[op]
+                lines.append('%s_sum{op="%s"} %r' % (name, op, stat['total']))
+                lines.append('%s_count{op="%s"} %d' % (name, op, stat['count']))
+            name = '%s_operation_seconds_max' % self._prefix
+            lines.append('# TYPE %s gauge' % name)
+            for op in sorted(timings):
+                lines.append('%s{op="%s"} %r' % (name, op, timings[op]['max']))
+        if counts:
+            name = '%s_events_total' % self._prefix
+            lines.append('# TYPE %s counter' % name)
+            for event in sorted(counts):
+                lines.append('%s{event="%s"} %d' % (name, event, counts[event]))
+        return '\n'.join(lines) + '\n' if lines else ''
+
+
+class LoggingMetrics(Metrics):
+    """Logs every timing and count with :mod:`logging`.
+    """
+
+    def __init__(self, logger=None, level=logging.DEBUG):
+        self._logger = logger or logging.getLogger('jsongit.metrics')
+        self._level = level
+
+    def timing(self, name, seconds):
+        self._logger.log(self._level, '%s took %.6fs', name, seconds)
+
+    def count(self, name, value=1):
+        self._logger.log(self._level, '%s +%d', name, value)
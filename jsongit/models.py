@@ -11,21 +11,69 @@ import pygit2
 # import functools
 import shutil
 import itertools
+import os
+import threading
+import time
 
 from .exceptions import (
-    NotJsonError, InvalidKeyError, DifferentRepoError, StagedDataError)
-from .wrappers import Commit, Diff, Conflict, Merge
+    NotJsonError, InvalidKeyError, DifferentRepoError, StagedDataError,
+    HeadMismatchError)
+from .wrappers import Commit, CommitInfo, DiffWrapper, Diff, Conflict, Merge
+from .maintenance import MaintenanceScheduler
+from .history import HistoryIndex
+from .views import View, Index
+from .paths import MISSING
+from .watch import Watcher
 import constants
+import metrics as _metrics
+import patches
+import paths
+import serializers
+import tracing as _tracing
 import utils
+from .metrics import timed
+from .tracing import traced
 
 
-class Repository(object):
-    def __init__(self, repo, dumps, loads):
+REF_PREFIX = 'refs/heads/jsongit/'
+
+#: How many locks keys are spread across for :func:`Repository.patch`.
+KEY_LOCKS = 64
+
+#: How many times :func:`Repository.patch` applies a patch before giving up
+#: on other commits moving the head.
+PATCH_ATTEMPTS = 5
+
+#: How many diffs :func:`Repository.diff` remembers.
+DIFF_CACHE_SIZE = 256
+
+#: How many keys :func:`Repository.blame` remembers the attributions of.
+BLAME_CACHE_SIZE = 256
+
+
+def _oid(oid):
+    """Accept an id as a :class:`pygit2.Oid` or hex string.
+    """
+    return None if oid is None else pygit2.Oid(hex=str(oid))
+
+
+class BaseRepository(object):
+    """What every kind of repository handle shares: finding keys' references
+    and reading commits.
+    """
+
+    def __init__(self, repo, loads, metrics=None, tracer=None):
         self._repo = repo
-        self._global_name = utils.global_config('user.name')
-        self._global_email = utils.global_config('user.email')
-        self._dumps = dumps
         self._loads = loads
+        # blobs written as JSON text can be read partially
+        json = utils.import_json()
+        self._json = json if loads is json.loads else None
+        self._metrics = _metrics.NULL if metrics is None else metrics
+        self._tracer = _tracing.NULL if tracer is None else tracer
+        self._watchers = []
+        self._watchers_lock = threading.Lock()
+        self._diffs = utils.LRUCache(DIFF_CACHE_SIZE)
+        self._blames = utils.LRUCache(BLAME_CACHE_SIZE)
 
     def __eq__(self, other):
         return self._repo.path == other._repo.path
@@ -42,7 +90,7 @@ class Repository(object):
         elif key[-1] == '.' or key[-1] == '/' or key[0] == '/' or key[0] == '.':
             raise InvalidKeyError("Key '%s' should not start or end in . or /" % key)
         else:
-            return 'refs/heads/jsongit/%s' % key
+            return REF_PREFIX + key
 
     def _navigate_tree(self, oid, path):
         """Find an OID inside a nested tree.
@@ -52,12 +100,449 @@ class Repository(object):
             oid = self._repo.get(oid)[step].oid
         return oid
 
-    def _build_commit(self, pygit2_commit):
-        #assert key in pygit2_commit.tree
-        key = pygit2_commit.tree[0].name
-        raw = self._repo[pygit2_commit.tree[0].oid].data
-        value = self._loads(raw)
-        return Commit(self, key, value, pygit2_commit)
+    def _decode(self, raw):
+        return serializers.decode(raw, self._loads)
+
+    def _key_entry(self, pygit2_commit):
+        """Find the key a commit is for, and the OID of its blob.  The tree
+        of a key's commit holds only that key, so its single entry is
+        followed down through the trees of a nested key.
+        """
+        entry = pygit2_commit.tree[0]
+        key = entry.name
+        while entry.filemode == pygit2.GIT_FILEMODE_TREE:
+            entry = self._repo[entry.oid][0]
+            key += '/' + entry.name
+        return key, entry.oid
+
+    def _build_commit(self, pygit2_commit, lazy=False):
+        key, blob_id = self._key_entry(pygit2_commit)
+        data = MISSING if lazy else self._value(blob_id)
+        return Commit(self, key, data, pygit2_commit)
+
+    def _walk(self, oid, order, info=False, first_parent=False, key=None):
+        build = (lambda c: CommitInfo(self, c)) if info else self._build_commit
+        walker = self._repo.walk(oid, order)
+        if first_parent:
+            walker.simplify_first_parent()
+        if self._metrics is _metrics.NULL and self._tracer is _tracing.NULL:
+            return (build(c) for c in walker)
+        return self._timed_walk(walker, build, key)
+
+    def _timed_walk(self, walker, build, key):
+        """Yield commits from a walk, timing only the steps through it and
+        not what is done with each commit in between.  Once the walk is
+        exhausted or closed the total is reported as `log`, and as a `log`
+        span with the number of commits walked as `depth`.
+        """
+        first = time.time()
+        seconds = 0.0
+        depth = 0
+        try:
+            while True:
+                start = time.time()
+                try:
+                    commit = build(next(walker))
+                except StopIteration:
+                    return
+                finally:
+                    seconds += time.time() - start
+                depth += 1
+                yield commit
+        finally:
+            self._metrics.timing('log', seconds)
+            self._tracer.record('log', first, first + seconds, key=key,
+                                depth=depth)
+
+    def _value(self, blob_id, steps=None):
+        """Decode a blob, or only what steps from :func:`parse_path
+        <jsongit.paths.parse_path>` lead to within it.
+        """
+        raw = self._repo[blob_id].data
+        if steps is None:
+            with self._metrics.timer('decode'):
+                return self._decode(raw)
+        elif self._json is not None and raw[:1] != serializers.TAG:
+            with self._metrics.timer('decode.path'):
+                return paths.extract_json(raw, steps, self._json)
+        else:
+            with self._metrics.timer('decode'):
+                return paths.extract(self._decode(raw), steps)
+
+    def _start(self, key, at=None):
+        """The id of the commit that steps back from key are counted from.
+
+        :raises: KeyError
+        """
+        return self._repo.lookup_reference(self._key2ref(key)).target
+
+    def _commit_at(self, key, back=0, at=None):
+        """Find a commit for key without decoding it.  See :func:`head`.
+        """
+        try:
+            oid = self._start(key, at)
+        except KeyError:
+            raise KeyError("There is no key at %s" % key)
+        return self._step_back(oid, back, key)
+
+    def _step_back(self, oid, back, name):
+        """Find the commit back steps from the one with oid, following first
+        parents.
+
+        :raises: IndexError
+        """
+        if back == 0:
+            return self._repo[oid]
+        walker = self._repo.walk(oid, constants.GIT_SORT_NONE)
+        walker.simplify_first_parent()
+        try:
+            return itertools.islice(walker, back, back + 1).next()
+        except StopIteration:
+            raise IndexError("%s has fewer than %s commits" % (name, back))
+
+    def _blob_at(self, key_or_commit, back):
+        """The id of the blob for a key or commit, back steps from it.
+        """
+        if isinstance(key_or_commit, basestring):
+            commit = self._commit_at(key_or_commit, back)
+        else:
+            if key_or_commit.repo != self:
+                raise DifferentRepoError()
+            commit = self._step_back(key_or_commit.oid, back,
+                                     key_or_commit.hex)
+        return self._key_entry(commit)[1]
+
+    def _show_path(self, key, back, at, path):
+        value = self._value(self._key_entry(self._commit_at(key, back, at))[1],
+                            paths.parse_path(path))
+        if value is MISSING:
+            raise KeyError("There is nothing at %s in %s" % (path, key))
+        return value
+
+    def _head_oid(self, key):
+        """The id of the head commit for key, or None if it has none.
+        """
+        try:
+            return self._repo.lookup_reference(self._key2ref(key)).target
+        except KeyError:
+            return None
+
+    def _heads(self, prefix=''):
+        """The head commit id of every key starting with prefix.
+        """
+        heads = {}
+        for name in self._repo.listall_references():
+            if name.startswith(REF_PREFIX + prefix):
+                ref = self._repo.lookup_reference(name)
+                heads[name[len(REF_PREFIX):]] = ref.target
+        return heads
+
+    def _publish(self, key, old, new):
+        for watcher in self._watchers:
+            watcher.publish(key, old, new)
+
+    def _unwatch(self, watcher):
+        with self._watchers_lock:
+            if watcher in self._watchers:
+                self._watchers = [w for w in self._watchers if w is not watcher]
+
+    @timed('diff')
+    @traced('diff')
+    def diff(self, a, b, back_a=0, back_b=0):
+        """Find the differences between two values, each the head of a key
+        or a commit, or some steps back from one.
+
+        >>> repo.commit('jon', {'status': 'active'})
+        >>> repo.commit('jon', {'status': 'retired'})
+        >>> repo.diff('jon', 'jon', back_a=1).update
+        {u'status': u'retired'}
+
+        Values that are the same blob are not read at all, and recent diffs
+        are remembered by the pair of blobs they were between, so diffing
+        each commit of a log against its parent again is cheap.  Diffs may
+        therefore be shared, and should not be modified.
+
+        :param a: the key or commit to diff from
+        :type a: string or :class:`Commit <jsongit.wrappers.Commit>`
+        :param b: the key or commit to diff to
+        :type b: string or :class:`Commit <jsongit.wrappers.Commit>`
+        :param back_a:
+            (optional) How many steps back from a to go.  Defaults to 0.
+        :type back_a: integer
+        :param back_b:
+            (optional) How many steps back from b to go.  Defaults to 0.
+        :type back_b: integer
+
+        :returns: the differences
+        :rtype: :class:`Diff <jsongit.wrappers.Diff>`
+        :raises:
+            KeyError if a key has no commits, IndexError if it has too few,
+            :class:`DifferentRepoError <jsongit.DifferentRepoError>`
+        """
+        blob_a = self._blob_at(a, back_a)
+        blob_b = self._blob_at(b, back_b)
+        if blob_a == blob_b:
+            return Diff(None, None)
+        pair = (blob_a.raw, blob_b.raw)
+        diff = self._diffs.get(pair)
+        if diff is None:
+            diff = Diff(self._value(blob_a), self._value(blob_b))
+            self._diffs.put(pair, diff)
+        else:
+            self._metrics.count('diff.cached')
+        return diff
+
+    @timed('blame')
+    @traced('blame')
+    def blame(self, key, path=None):
+        """Find the commit that last changed each part of the value of a key.
+
+        >>> repo.commit('jon', {'name': 'Jon', 'limits': {'max_conn': 10}})
+        >>> repo.commit('jon', {'name': 'Jon', 'limits': {'max_conn': 20}})
+        >>> blame = repo.blame('jon')
+        >>> blame['limits.max_conn'] == repo.head('jon')
+        True
+        >>> blame['name'] == repo.head('jon', back=1)
+        True
+
+        History is walked once, newest first, following first parents, and
+        stops as soon as everything asked about is accounted for.  Commits
+        that did not change the value are not read.  What was found is
+        remembered for each key, so blaming it again after more commits
+        only reads the new ones.
+
+        :param key: The key to look up.
+        :type key: string
+        :param path:
+            (optional) A path within the value to blame, like `'a.b[3].c'`.
+            Defaults to the path of every scalar and empty container in the
+            value, or the empty path if the value is itself one.
+        :type path: string
+
+        :returns:
+            each path, mapped to the commit that last changed what it leads
+            to.  The commits decode their data only when it is asked for.
+        :rtype: dict
+        :raises:
+            KeyError if there is no entry for key or nothing at path,
+            ValueError if the path is malformed
+        """
+        head = self._commit_at(key)
+        head_blob = self._navigate_tree(head.tree.oid, key)
+        if path is None:
+            value = self._value(head_blob)
+            pending = dict((p, (steps, paths.extract(value, steps)))
+                           for p, steps in paths.leaves(value))
+        else:
+            steps = paths.parse_path(path)
+            value = self._value(head_blob, steps)
+            if value is MISSING:
+                raise KeyError("There is nothing at %s in %s" % (path, key))
+            pending = {path: (steps, value)}
+        cached = self._blames.get(key)
+        found = {}
+        newer = newer_blob = None
+        walker = self._repo.walk(head.oid, constants.GIT_SORT_NONE)
+        walker.simplify_first_parent()
+        for c in walker:
+            blob = self._key_entry(c)[1]
+            if newer is not None and blob != newer_blob:
+                older = self._value(blob) if path is None else MISSING
+                for p, (steps, current) in pending.items():
+                    if older is MISSING:
+                        old = self._value(blob, steps)
+                    else:
+                        old = paths.extract(older, steps)
+                    if type(old) is not type(current) or old != current:
+                        found[p] = newer.oid
+                        del pending[p]
+                if not pending:
+                    break
+            newer, newer_blob = c, blob
+            if cached is not None and c.oid == cached[0]:
+                # everything still pending is unchanged since the last blame
+                self._metrics.count('blame.cached')
+                for p in pending.keys():
+                    if p in cached[1]:
+                        found[p] = cached[1][p]
+                        del pending[p]
+                if not pending:
+                    break
+        else:
+            # the rest were never changed after the oldest commit
+            for p in pending:
+                found[p] = newer.oid
+
+        remembered = {}
+        if cached is not None and cached[0] == head.oid:
+            remembered.update(cached[1])
+        remembered.update(found)
+        self._blames.put(key, (head.oid, remembered))
+
+        commits = {}
+        for oid in set(found.itervalues()):
+            commits[oid] = self._build_commit(self._repo[oid], lazy=True)
+        return dict((p, commits[oid]) for p, oid in found.iteritems())
+
+    def keys(self):
+        """All the keys that have been committed.
+
+        >>> repo.commit('spoon', {'material': 'silver'})
+        >>> repo.commit('fork', {'material': 'stainless'})
+        >>> repo.keys()
+        ['fork', 'spoon']
+
+        :returns: the keys, in sorted order
+        :rtype: list
+        """
+        return sorted(name[len(REF_PREFIX):]
+                      for name in self._repo.listall_references()
+                      if name.startswith(REF_PREFIX))
+
+    @timed('show_many')
+    @traced('show_many')
+    def show_many(self, keys, back=0, path=None, default=MISSING):
+        """Obtain the data for several keys at once.
+
+        >>> repo.show_many(['jon', 'mary'], path='user.email')
+        {'jon': u'jon@q.com', 'mary': u'mary@q.com'}
+
+        :param keys: the keys to look up
+        :type keys: iterable of strings
+        :param back:
+            (optional) How many steps back from each head to get the data.
+            Defaults to 0 (the current head).
+        :type back: integer
+        :param path:
+            (optional) Only obtain what this path leads to within each value.
+            See :func:`show`.
+        :type path: string
+        :param default:
+            (optional) What to give for keys with no such commit, or nothing
+            at path.  Defaults to raising an error like :func:`show`.
+
+        :returns: the data, by key
+        :rtype: dict
+        """
+        steps = None if path is None else paths.parse_path(path)
+        values = {}
+        for key in keys:
+            try:
+                commit = self._commit_at(key, back)
+                value = self._value(self._key_entry(commit)[1], steps)
+            except (KeyError, IndexError):
+                if default is MISSING:
+                    raise
+                value = default
+            if value is MISSING:
+                if default is MISSING:
+                    raise KeyError("There is nothing at %s in %s" % (path, key))
+                value = default
+            values[key] = value
+        return values
+
+    def watch(self, prefix=None, poll=1.0, maxlen=10000):
+        """Watch for changes to keys.  This returns an iterator of
+        `(key, old, new)` events, where `old` and `new` are the ids of the
+        key's head commit before and after the change, or None if there was
+        no such head.
+
+        >>> watcher = repo.watch('users/')
+        >>> repo.commit('users/jon', {'name': 'Jon'})
+        >>> watcher.next()
+        Event(key='users/jon', old=None, new=Oid(...))
+        >>> watcher.close()
+
+        :param prefix:
+            (optional) Only watch keys starting with this.  Defaults to
+            watching every key.
+        :type prefix: string
+        :param poll:
+            (optional) How often to look for changes made by other
+            processes, in seconds, if inotify is unavailable.  None only
+            reports changes made through this repository object.  Defaults to
+            1.
+        :type poll: number
+        :param maxlen:
+            (optional) How many unread events to keep before discarding the
+            oldest.  Defaults to 10000.
+        :type maxlen: int
+
+        :returns: the watcher, which should be closed once done with
+        :rtype: :class:`Watcher <jsongit.watch.Watcher>`
+        """
+        watcher = Watcher(self, prefix, poll=poll, maxlen=maxlen)
+        with self._watchers_lock:
+            self._watchers = self._watchers + [watcher]
+        return watcher
+
+
+class Repository(BaseRepository):
+    def __init__(self, repo, dumps, loads, history_index=False, codec=None,
+                 metrics=None, tracer=None):
+        super(Repository, self).__init__(repo, loads, metrics=metrics,
+                                         tracer=tracer)
+        self._global_name = utils.global_config('user.name')
+        self._global_email = utils.global_config('user.email')
+        self._dumps = dumps
+        self._codec = None if codec is None else serializers.lookup(codec)
+        self._lock = threading.RLock()
+        self._key_locks = [threading.Lock() for i in xrange(KEY_LOCKS)]
+        if history_index:
+            path = os.path.join(repo.path, 'jsongit', 'history')
+            self._history = HistoryIndex(path)
+        else:
+            self._history = None
+        self._views = {}
+
+    def _encode(self, value):
+        if self._codec is None:
+            return self._dumps(value)
+        else:
+            return self._codec.encode(value)
+
+    def _oid_at(self, key, time):
+        """Find the newest commit in the first-parent history of key at or
+        before time.
+
+        :raises: KeyError, IndexError
+        """
+        head = self._repo.lookup_reference(self._key2ref(key)).target
+        if self._history is not None:
+            oid = self._history.lookup(self._repo, key, head, time)
+        else:
+            oid = None
+            walker = self._repo.walk(head, constants.GIT_SORT_NONE)
+            walker.simplify_first_parent()
+            for c in walker:
+                if c.commit_time <= time:
+                    oid = c.oid
+                    break
+        if oid is None:
+            raise IndexError("%s has no commits at or before %s" % (key, time))
+        return oid
+
+    def _start(self, key, at=None):
+        if at is None:
+            return super(Repository, self)._start(key)
+        return self._oid_at(key, at)
+
+    def _update_views(self, key, blob_id, oid):
+        value = self._decode(self._repo[blob_id].data)
+        for view in self._views.values():
+            view.update(key, oid.hex, value)
+
+    def _add_view(self, view):
+        with self._lock:
+            view.load()
+            view.sync(dict((key, oid.hex)
+                           for key, oid in self._heads().iteritems()),
+                      self._show_hex)
+            self._views[view.name] = view
+        return view
+
+    def _show_hex(self, hex):
+        return self._build_commit(self._repo[hex]).data
 
     def _head_target(self):
         return self._repo.lookup_reference('HEAD').target
@@ -68,6 +553,218 @@ class Repository(object):
         except KeyError:
             return None
 
+    def _physical_bytes(self):
+        """The size of every object on disk, loose or packed, along with
+        pack indexes.
+        """
+        physical = 0
+        for dirpath, dirnames, filenames in os.walk(
+                os.path.join(self._repo.path, 'objects')):
+            for filename in filenames:
+                physical += os.path.getsize(os.path.join(dirpath, filename))
+        return physical
+
+    def _stage(self, entries, removals=()):
+        """Point keys in the index at blobs that are already written,
+        writing the index once.
+
+        :param entries: `(key, blob_id)` pairs
+        :param removals: keys to take out of the index
+        """
+        # writing the index takes its lock file, so only one thread may
+        with self._lock:
+            index = self._repo.index
+            for key, blob_id in entries:
+                if key in index:
+                    index.remove(key)
+                index.add(pygit2.IndexEntry(key, blob_id,
+                                            pygit2.GIT_FILEMODE_BLOB))
+            for key in removals:
+                if key in index:
+                    index.remove(key)
+            index.write()
+
+    def _write_tree(self):
+        """Write the index as a tree for HEAD.
+
+        :returns: the id of the tree
+        """
+        with self._lock, self._metrics.timer('commit.tree'):
+            return self._repo.index.write_tree()
+
+    def _check_keys(self, keys, removals=()):
+        """Ensure keys can all be written together, after removals.
+
+        :raises:
+            :class:`InvalidKeyError <jsongit.InvalidKeyError>` if a key is
+            invalid, or one key would be a directory holding another
+        """
+        for key in keys:
+            self._key2ref(key)
+        final = (set(self.keys()) - set(removals)) | set(keys)
+        dirs = set()
+        for key in final:
+            parts = key.split('/')
+            for i in xrange(1, len(parts)):
+                dirs.add('/'.join(parts[:i]))
+        for key in keys:
+            if key in dirs:
+                raise InvalidKeyError("Key '%s' is a directory of other keys" %
+                                      key)
+            parts = key.split('/')
+            for i in xrange(1, len(parts)):
+                if '/'.join(parts[:i]) in final:
+                    raise InvalidKeyError("Key '%s' is inside key '%s'" %
+                                          (key, '/'.join(parts[:i])))
+
+    def _restore_refs(self, olds):
+        """Put references back to what they were before a failed update.
+        """
+        # delete new keys first, as they may hold a removed key's directory
+        for key, old in sorted(olds.iteritems(), key=lambda o: o[1] is not None):
+            name = self._key2ref(key)
+            try:
+                if old is None:
+                    self._repo.lookup_reference(name).delete()
+                else:
+                    self._repo.create_reference(name, old, force=True)
+            except (KeyError, pygit2.GitError, OSError):
+                pass
+
+    def _commit_refs(self, entries, tree_id, author, committer, message,
+                     removals=()):
+        """Commit blobs to the references of keys, and the tree to HEAD.
+        The commits are written first, and then every reference is moved.
+        If any cannot be, those already moved are put back, so either every
+        key changes or none do.  Must be called with the lock held.
+
+        :param entries: `(key, blob_id, parent_oids)` triples
+        :param tree_id: the tree for HEAD
+        :param removals: keys whose references are deleted
+        :returns: the ids of the new commits, in the order of entries
+        """
+        self._metrics.count('commit.keys', len(entries))
+        oids = []
+        for key, blob_id, parent_oids in entries:
+            with self._metrics.timer('commit.ref'), \
+                    self._tracer.start_span('commit.ref', key=key):
+                # create a single-entry tree for the commit.
+                idx = pygit2.Index('')
+                idx.add(pygit2.IndexEntry(key, blob_id, pygit2.GIT_FILEMODE_BLOB))
+                key_tree_id = idx.write_tree(self._repo)
+                oids.append(self._repo.create_commit(None, author, committer,
+                                                     message, key_tree_id,
+                                                     parent_oids))
+        olds = {}
+        try:
+            # removals first, as they may free a directory for a new key
+            for key in removals:
+                ref = self._repo.lookup_reference(self._key2ref(key))
+                olds[key] = ref.target
+                ref.delete()
+            for (key, _, _), oid in zip(entries, oids):
+                name = self._key2ref(key)
+                olds.setdefault(key, self._head_oid(key))
+                self._repo.create_reference(name, oid, force=True)
+            repo_head = self._repo_head()
+            with self._metrics.timer('commit.head'):
+                self._repo.create_commit(self._head_target(), author,
+                                         committer, message, tree_id,
+                                         [repo_head.oid] if repo_head else [])
+        except (pygit2.GitError, OSError) as e:
+            self._restore_refs(olds)
+            if (str(e).startswith('Failed to create reference') or
+                    'directory' in str(e)):
+                raise InvalidKeyError(e)
+            else:
+                raise e
+        for (key, blob_id, parent_oids), oid in zip(entries, oids):
+            if self._history is not None:
+                self._history.append(key,
+                                     parent_oids[0] if parent_oids else None,
+                                     oid, committer.time)
+            self._publish(key, olds[key], oid)
+            if self._views:
+                self._update_views(key, blob_id, oid)
+        for key in removals:
+            self._publish(key, olds[key], None)
+            for view in self._views.values():
+                view.discard(key)
+            if self._history is not None:
+                self._history.discard(key)
+        return oids
+
+    def _commit_index(self, keys, parents, author, committer, message):
+        """Commit what the index holds for keys.
+
+        :returns: the ids of the new commits, in the order of keys
+        """
+        # the tree is unreachable until committed, so hold the lock that
+        # keeps maintain() from pruning it
+        with self._lock:
+            tree_id = self._write_tree()
+            entries = []
+            for key in keys:
+                if parents is not None:
+                    parent_oids = [parent.oid for parent in parents]
+                else:
+                    head = self._head_oid(key)
+                    parent_oids = [] if head is None else [head]
+                entries.append((key, self._navigate_tree(tree_id, key),
+                                parent_oids))
+            return self._commit_refs(entries, tree_id, author, committer,
+                                     message)
+
+    def _apply(self, writes, removals, message, author, committer):
+        """Commit the changes of a :class:`Transaction`.
+
+        :param writes: values by key
+        :param removals: whether to force removal, by key
+        :returns: the ids of the new commits, by key
+        """
+        self._check_keys(writes.keys(), removals.keys())
+        for key, force in removals.iteritems():
+            if key in writes:
+                raise ValueError("%s is both changed and removed" % key)
+            if not self.committed(key):
+                raise KeyError("There is no key at %s" % key)
+            if not force and self.staged(key):
+                raise StagedDataError("There is data staged for %s" % key)
+        raws = []
+        for key, value in sorted(writes.iteritems()):
+            try:
+                with self._metrics.timer('add.serialize'):
+                    raws.append((key, self._encode(value)))
+            except (ValueError, TypeError) as e:
+                raise NotJsonError(e)
+        with self._lock:
+            blobs = []
+            for key, raw in raws:
+                with self._metrics.timer('add.blob'):
+                    blobs.append((key, self._repo.write(pygit2.GIT_OBJ_BLOB,
+                                                        raw)))
+            entries = []
+            for key, blob_id in blobs:
+                head = self._head_oid(key)
+                entries.append((key, blob_id, [] if head is None else [head]))
+            index = self._repo.index
+            previous = [(key, index[key].oid if key in index else None)
+                        for key in set(writes) | set(removals)]
+            self._stage(blobs, removals)
+            try:
+                oids = self._commit_refs(entries, self._write_tree(), author,
+                                         committer, message,
+                                         removals=sorted(removals))
+            except:
+                # put the index back as it was
+                self._stage([(key, oid) for key, oid in previous
+                             if oid is not None],
+                            [key for key, oid in previous if oid is None])
+                raise
+        return dict((key, oid) for (key, _), oid in zip(blobs, oids))
+
+    @timed('add')
+    @traced('add')
     def add(self, key, value):
         """Add a value for a key to the working tree, staging it for commit.
 
@@ -88,17 +785,23 @@ class Repository(object):
         """
         self._key2ref(key) # throw InvalidKeyError
         try:
-            blob_id = self._repo.write(pygit2.GIT_OBJ_BLOB, self._dumps(value))
+            with self._metrics.timer('add.serialize'):
+                raw = self._encode(value)
         except ValueError as e:
             raise NotJsonError(e)
         except TypeError as e:
             raise NotJsonError(e)
+        self._tracer.current().set('blob_size', len(raw))
 
-        if key in self._repo.index:
-            self._repo.index.remove(key)
-        self._repo.index.add(pygit2.IndexEntry(key, blob_id, pygit2.GIT_FILEMODE_BLOB))
-        self._repo.index.write()
+        # the blob is unreachable until staged, so hold the lock that keeps
+        # maintain() from pruning it
+        with self._lock:
+            with self._metrics.timer('add.blob'):
+                blob_id = self._repo.write(pygit2.GIT_OBJ_BLOB, raw)
+            with self._metrics.timer('add.index'):
+                self._stage([(key, blob_id)])
 
+    @traced('checkout')
     def checkout(self, source, dest, **kwargs):
         """ Replace the HEAD reference for dest with a commit that points back
         to the value at source.
@@ -122,9 +825,65 @@ class Repository(object):
         :raises: :class:`StagedDataError <jsongit.StagedDataError>`
         """
         message = "Checkout %s from %s" % (dest, source)
-        commit = self.head(source)
-        self.commit(dest, commit.data, message=message, parents=[commit])
+        # the source's blob is committed as it is, without decoding it
+        commit = self._commit_at(source)
+        self._stage([(dest, self._navigate_tree(commit.tree.oid, source))])
+        self.commit(dest, message=message,
+                    parents=[CommitInfo(self, commit)], **kwargs)
+
+    @traced('checkout_prefix')
+    def checkout_prefix(self, source, dest, **kwargs):
+        """Check out every key starting with source to the same key
+        starting with dest instead, as :func:`checkout` would one at a time.
+        The index and HEAD are written once for all of them.
+
+        >>> repo.commit('tenant/a/spoon', {'material': 'silver'})
+        >>> repo.commit('tenant/a/fork', {'material': 'stainless'})
+        >>> repo.checkout_prefix('tenant/a/', 'tenant/b/')
+        ['tenant/b/fork', 'tenant/b/spoon']
+
+        :param source: The prefix of the source keys.
+        :type source: string
+        :param dest: The prefix to replace it with.
+        :type dest: string
+        :param author:
+            (optional) The author of the commits.  Defaults to global author.
+        :type author: pygit2.Signature
+        :param committer:
+            (optional) The committer of the commits.  Will default to global
+            author.
+        :type committer: pygit2.Signature
 
+        :returns: the keys checked out to
+        :rtype: list
+        :raises:
+            KeyError if no keys start with source,
+            :class:`InvalidKeyError <jsongit.InvalidKeyError>` if a
+            destination key is invalid, before anything is written
+        """
+        author = kwargs.pop('author', utils.signature(self._global_name,
+                                                      self._global_email))
+        committer = kwargs.pop('committer', author)
+        if kwargs:
+            raise TypeError("Unknown keyword args %s" % kwargs)
+        heads = self._heads(source)
+        if not heads:
+            raise KeyError("There are no keys starting with %s" % source)
+        entries = []
+        for key, oid in sorted(heads.iteritems()):
+            dest_key = dest + key[len(source):]
+            self._key2ref(dest_key) # throw InvalidKeyError
+            blob_id = self._navigate_tree(self._repo[oid].tree.oid, key)
+            entries.append((dest_key, blob_id, [oid]))
+        message = "Checkout %s from %s" % (dest, source)
+        with self._lock:
+            self._stage([(key, blob_id) for key, blob_id, _ in entries])
+            self._commit_refs(entries, self._write_tree(), author, committer,
+                              message)
+        return [key for key, _, _ in entries]
+
+    @timed('commit')
+    @traced('commit')
     def commit(self, key=None, value=None, add=True, **kwargs):
         """Commit the index to the working tree.
 
@@ -164,16 +923,33 @@ class Repository(object):
             for this key if it already exists, or an empty list if not.
         :type parents: list of :class:`Commit <jsongit.wrappers.Commit>`
 
+        :param if_changed:
+            (optional) Whether to commit only if the value differs from the
+            key's head.  If it does not, the head is returned and nothing
+            is committed.  Defaults to False.
+        :type if_changed: boolean
+        :param if_head:
+            (optional) Commit only if this is the id of the key's head
+            commit, or if the key has none and this is None.
+        :type if_head: :class:`pygit2.Oid` or hex string
+
+        :returns: the new head commit for key, if one was given
+        :rtype: :class:`Commit <jsongit.wrappers.Commit>`
         :raises:
             :class:`NotJsonError <jsongit.NotJsonError>`
             :class:`InvalidKeyError <jsongit.InvalidKeyError>`
+            :class:`HeadMismatchError <jsongit.HeadMismatchError>` if the
+            head is not `if_head`
         """
+        single = key is not None
         keys = [key] if key is not None else [e.path for e in self._repo.index]
         message = kwargs.pop('message', '')
         parents = kwargs.pop('parents', None)
         author = kwargs.pop('author', utils.signature(self._global_name,
                                                       self._global_email))
         committer = kwargs.pop('committer', author)
+        if_changed = kwargs.pop('if_changed', False)
+        if_head = kwargs.pop('if_head', MISSING)
         if kwargs:
             raise TypeError("Unknown keyword args %s" % kwargs)
         if key is None and value is not None:
@@ -184,34 +960,31 @@ class Repository(object):
                 if parent.repo != self:
                     raise DifferentRepoError()
 
-        if add is True and key is not None and value is not None:
-            self.add(key, value)
-
-        repo_head = self._repo_head()
-        tree_id = self._repo.index.write_tree()
-        self._repo.create_commit(self._head_target(), author, committer,
-                                 message, tree_id,
-                                [repo_head.oid] if repo_head else [])
-
-        # TODO This will create some keys but not others if there is a bad key
-        for key in keys:
-            if parents is None:
-                parents = [self.head(key)] if self.committed(key) else []
-            try:
-                # create a single-entry tree for the commit.
-                blob_id = self._navigate_tree(tree_id, key)
-                idx = pygit2.Index('')
-                idx.add(pygit2.IndexEntry(key, blob_id, pygit2.GIT_FILEMODE_BLOB))
-                key_tree_id = idx.write_tree(self._repo)
-                self._repo.create_commit(self._key2ref(key), author,
-                                         committer, message, key_tree_id,
-                                         [parent.oid for parent in parents])
-            except (pygit2.GitError, OSError) as e:
-                if (str(e).startswith('Failed to create reference') or
-                        'directory' in str(e)):
-                    raise InvalidKeyError(e)
-                else:
-                    raise e
+        if if_changed or if_head is not MISSING:
+            if key is None:
+                raise TypeError("if_changed and if_head need a key")
+            # hold the lock throughout, so the head checked is the parent
+            with self._lock:
+                head = self._head_oid(key)
+                if if_head is not MISSING and head != _oid(if_head):
+                    raise HeadMismatchError("Head of %s is %s, not %s" %
+                                            (key, head, if_head))
+                if add is True and value is not None:
+                    self.add(key, value)
+                if if_changed and head is not None and \
+                        self._repo.index[key].oid == self._navigate_tree(
+                            self._repo[head].tree.oid, key):
+                    self._metrics.count('commit.unchanged')
+                    return self._build_commit(self._repo[head], lazy=True)
+                oids = self._commit_index(keys, parents, author, committer,
+                                          message)
+        else:
+            if add is True and key is not None and value is not None:
+                self.add(key, value)
+            oids = self._commit_index(keys, parents, author, committer,
+                                      message)
+        if single:
+            return self._build_commit(self._repo[oids[0]], lazy=True)
 
     def committed(self, key):
         """Determine whether there is a commit for a key.
@@ -234,6 +1007,167 @@ class Repository(object):
         except KeyError:
             return False
 
+    def _compact_key(self, key, keep_last, keep_since):
+        """Squash the history of key behind the commits to keep.  Must be
+        called with the lock held.
+
+        :returns: how many commits a walk of the key's log took before and
+            after
+        """
+        head = self._head_oid(key)
+        if head is None:
+            return 0, 0
+        before = sum(1 for c in self._repo.walk(head, constants.GIT_SORT_NONE))
+        walker = self._repo.walk(head, constants.GIT_SORT_NONE)
+        walker.simplify_first_parent()
+        chain = []
+        for i, c in enumerate(walker):
+            if (keep_last is not None and i < keep_last) or \
+                    (keep_since is not None and c.commit_time >= keep_since):
+                chain.append(c)
+            else:
+                base = c
+                break
+        else:
+            # everything is kept
+            return before, before
+        if before <= len(chain) + 1:
+            return before, before
+        oid = self._repo.create_commit(
+            None, base.author, base.committer,
+            "Squashed %d commits of %s" % (before - len(chain), key),
+            base.tree.oid, [])
+        for c in reversed(chain):
+            oid = self._repo.create_commit(None, c.author, c.committer,
+                                           c.message, c.tree.oid, [oid])
+        self._repo.create_reference(self._key2ref(key), oid, force=True)
+        if self._history is not None:
+            self._history.discard(key)
+        self._publish(key, head, oid)
+        if self._views:
+            self._update_views(key, self._navigate_tree(
+                self._repo[oid].tree.oid, key), oid)
+        return before, len(chain) + 1
+
+    def compact(self, key_or_prefix, keep_last=None, keep_since=None):
+        """Squash old history into a single commit, so that walking the log
+        of a key, and everything built on that such as :func:`head` with
+        `back` and :func:`merge`, takes time bounded by what is kept.  The
+        kept commits keep their values, messages, authors and order, but
+        become new commits.  Only their first parents are kept, so a key
+        compacted past a merge no longer shares history with the key merged
+        in.
+
+        >>> len(list(repo.log('jon')))
+        5000
+        >>> repo.compact('jon', keep_last=100)
+        {'keys': 1, 'commits_before': 5000, 'commits_after': 101}
+
+        The squashed commits remain on disk until :func:`maintain` prunes
+        unreachable objects.  Their values are still recorded in the history
+        of the repository's HEAD, so their blobs are kept.
+
+        :param key_or_prefix:
+            A key, or a prefix ending in `/` of the keys to compact.
+        :type key_or_prefix: string
+        :param keep_last:
+            (optional) How many of the most recent commits to keep.
+        :type keep_last: int
+        :param keep_since:
+            (optional) Keep every commit made at or after this time, in UTC
+            seconds.
+        :type keep_since: number
+
+        :returns:
+            how many keys were compacted, and how many commits walking their
+            logs took before and after
+        :rtype: dict
+        :raises:
+            TypeError if neither keep_last nor keep_since is given, KeyError
+            if there is no key at key_or_prefix
+        """
+        if keep_last is None and keep_since is None:
+            raise TypeError("Specify keep_last, keep_since, or both")
+        if key_or_prefix.endswith('/'):
+            keys = sorted(self._heads(key_or_prefix))
+        elif self.committed(key_or_prefix):
+            keys = [key_or_prefix]
+        else:
+            raise KeyError("There is no key at %s" % key_or_prefix)
+        report = {'keys': 0, 'commits_before': 0, 'commits_after': 0}
+        for key in keys:
+            with self._lock:
+                before, after = self._compact_key(key, keep_last, keep_since)
+            if after < before:
+                report['keys'] += 1
+            report['commits_before'] += before
+            report['commits_after'] += after
+        return report
+
+    def create_index(self, name, path=None, func=None):
+        """Keep an index of the keys in the repository.  This is a view,
+        like those from :func:`create_view`, that can also be searched for a
+        range of terms with :func:`query`.
+
+        >>> repo.create_index('by_email', path='user.email')
+        >>> repo.create_index('by_age', path='user.age')
+        >>> repo.commit('jon', {'user': {'email': 'jon@q.com', 'age': 30}})
+        >>> repo.query('by_email', 'jon@q.com')
+        ['jon']
+        >>> repo.query('by_age', low=18, high=65)
+        ['jon']
+
+        :param name: the name of the index
+        :type name: string
+        :param path:
+            (optional) The path to extract from each value, like
+            `'user.email'`.
+        :type path: string
+        :param func:
+            (optional) A function to extract a term from each value.
+        :type func: func
+
+        :returns: the index
+        :rtype: :class:`Index <jsongit.views.Index>`
+        :raises: TypeError unless exactly one of path and func is given
+        """
+        directory = os.path.join(self._repo.path, 'jsongit', 'views')
+        return self._add_view(Index(name, directory, path=path, func=func))
+
+    def create_view(self, name, path=None, func=None):
+        """Keep a view of the keys in the repository, mapping what is
+        extracted from each key's value to the keys, so that :func:`find`
+        does not have to read every value.  Views are kept up to date by
+        commits and removals, and persisted in the repository, so creating
+        a view again later only reads the keys that changed since.
+
+        >>> repo.create_view('status', path='status')
+        >>> repo.create_view('domain', func=lambda v: v['email'].split('@')[1])
+        >>> repo.commit('jon', {'status': 'active', 'email': 'jon@q.com'})
+        >>> repo.find(status='active', domain='q.com')
+        ['jon']
+
+        Values where the path leads nowhere, or where the function raises a
+        KeyError, IndexError or TypeError, are left out of the view.
+
+        :param name: the name of the view
+        :type name: string
+        :param path:
+            (optional) The path to extract from each value, as dotted keys
+            with list indices in brackets, like `'user.emails[0]'`.
+        :type path: string
+        :param func:
+            (optional) A function to extract a term from each value.  If it
+            is changed, the view should be dropped and created again.
+        :type func: func
+
+        :returns: the view
+        :rtype: :class:`View <jsongit.views.View>`
+        :raises: TypeError unless exactly one of path and func is given
+        """
+        directory = os.path.join(self._repo.path, 'jsongit', 'views')
+        return self._add_view(View(name, directory, path=path, func=func))
+
     def destroy(self):
         """Erase this Git repository entirely.  This will remove its directory.
         Methods called on a repository or its objects after it is destroyed
@@ -246,7 +1180,37 @@ class Repository(object):
         shutil.rmtree(self._repo.path)
         self._repo = None
 
-    def head(self, key, back=0):
+    def drop_view(self, name):
+        """Stop keeping a view, and delete it from the repository.
+
+        :param name: the name of the view
+        :type name: string
+
+        :raises: KeyError if there is no such view
+        """
+        with self._lock:
+            self._views.pop(name).destroy()
+
+    def find(self, **criteria):
+        """Find the keys whose values match every criterion, each naming a
+        view created with :func:`create_view`.
+
+        >>> repo.find(status='active')
+        ['jon', 'mary']
+
+        :param criteria: view names and the terms to find in them
+
+        :returns: the keys, in sorted order
+        :rtype: list
+        :raises: KeyError if a view does not exist
+        """
+        keys = None
+        for name, term in criteria.iteritems():
+            found = self._views[name].find(term)
+            keys = found if keys is None else keys & found
+        return sorted(keys or ())
+
+    def head(self, key, back=0, at=None):
         """Get the head commit for a key.
 
         >>> repo.commit('foo', 'bar', message="leveraging fu")
@@ -261,22 +1225,22 @@ class Repository(object):
         :param key: The key to look up.
         :type key: string
         :param back:
-            (optional) How many steps back from head to get the commit.
-            Defaults to 0 (the current head).
+            (optional) How many steps back from head to get the commit,
+            following first parents.  Defaults to 0 (the current head).
         :type back: integer
+        :param at:
+            (optional) A time, in UTC seconds.  If specified, steps back are
+            counted from the newest commit for key at or before this time,
+            rather than from the current head.
+        :type at: int
 
         :returns: the data
         :rtype: int, float, NoneType, unicode, boolean, list, or dict
         :raises:
             KeyError if there is no entry for key, IndexError if too many steps
-            back are specified.
+            back are specified or there is no commit at or before `at`.
         """
-        try:
-            return itertools.islice(self.log(key), back, back + 1).next()
-        except KeyError:
-            raise KeyError("There is no key at %s" % key)
-        except StopIteration:
-            raise IndexError("%s has fewer than %s commits" % (key, back))
+        return self._build_commit(self._commit_at(key, back, at))
 
     def index(self, key):
         """Pull the current data for key from the index.
@@ -293,8 +1257,10 @@ class Repository(object):
         """
         self._repo.index.read()
         raw = self._repo[self._repo.index[key].oid].data
-        return self._loads(raw)
+        return self._decode(raw)
 
+    @timed('merge')
+    @traced('merge')
     def merge(self, dest, key=None, commit=None, **kwargs):
         """Try to merge two commits together.
 
@@ -341,17 +1307,32 @@ class Repository(object):
 
         # Do a merge if there were no overlapping changes
         # First, find the shared parent
-        try:
-            shared_commit = (dc for dc in self.log(commit=dest_head)
-                             if dc.oid in (sc.oid for sc in self.log(commit=commit))).next()
-        except StopIteration:
+        shared_commit = None
+        with self._metrics.timer('merge.shared_parent'), \
+                self._tracer.start_span('merge.shared_parent') as span:
+            source = set(c.oid for c in self._repo.walk(
+                commit.oid, constants.GIT_SORT_NONE))
+            depth = 0
+            for c in self._repo.walk(dest_head.oid,
+                                     constants.GIT_SORT_TOPOLOGICAL):
+                depth += 1
+                if c.oid in source:
+                    shared_commit = self._build_commit(c)
+                    break
+            span.set('depth', depth)
+        if shared_commit is None:
             return Merge(False, commit, dest_head, "No shared parent")
 
         # Now, see if the diffs conflict
-        source_diff = Diff(shared_commit.data, commit.data)
-        dest_diff = Diff(shared_commit.data, dest_head.data)
+        with self._metrics.timer('merge.diff'), \
+                self._tracer.start_span('merge.diff'):
+            source_diff = Diff(shared_commit.data, commit.data)
+            dest_diff = Diff(shared_commit.data, dest_head.data)
 
-        conflict = Conflict(source_diff, dest_diff)
+        with self._metrics.timer('merge.conflict'), \
+                self._tracer.start_span('merge.conflict') as span:
+            conflict = Conflict(source_diff, dest_diff)
+            span.set('conflict', bool(conflict))
 
         # No-go, the user's gonna have to figure this one out
         if conflict:
@@ -359,14 +1340,21 @@ class Repository(object):
                                 conflict=conflict)
         # Sweet. we can apply all the diffs.
         else:
-            merged_data = dest_diff.apply(source_diff.apply(shared_commit.data))
+            with self._metrics.timer('merge.apply'), \
+                    self._tracer.start_span('merge.apply'):
+                # shared_commit's data was decoded for this merge alone, and the
+                # diffs touch disjoint parts of it, so both apply in place.
+                merged_data = dest_diff.apply(
+                    source_diff.apply(shared_commit.data, in_place=True),
+                    in_place=True)
             message = "Auto-merge of %s and %s from shared parent %s" % (
                 commit.hex[0:10], dest_head.hex[0:10], shared_commit.hex[0:10])
             parents = [dest_head, commit]
             result = self.commit(dest, merged_data, message=message, parents=parents, **kwargs)
             return Merge(True, commit, dest_head, message, result=result)
 
-    def log(self, key=None, commit=None, order=constants.GIT_SORT_TOPOLOGICAL):
+    def log(self, key=None, commit=None, order=constants.GIT_SORT_NONE,
+            info=False, first_parent=False):
         """ Traverse commits from the specified key or commit.  Must specify
         one or the other.
 
@@ -390,9 +1378,27 @@ class Repository(object):
         :type commit: :class:`Commit <jsongit.wrappers.Commit>`
         :param order:
             (optional) Flags to order traversal.  Valid flags are in
-            :mod:`constants <jsongit.constants>`.
-            Defaults to :const:`GIT_SORT_TOPOLOGICAL <jsongit.GIT_SORT_TOPOLOGICAL>`
+            :mod:`constants <jsongit.constants>`.  Defaults to
+            :const:`GIT_SORT_NONE <jsongit.GIT_SORT_NONE>`, which yields
+            each commit as the walk reaches it, starting from the head and
+            newest first along first parents.
+            :const:`GIT_SORT_TOPOLOGICAL <jsongit.GIT_SORT_TOPOLOGICAL>`
+            never shows a commit before its children, but walks the entire
+            history before yielding the first commit.
+            :const:`GIT_SORT_TIME <jsongit.GIT_SORT_TIME>` orders by commit
+            time, so clocks that disagree reorder it.
         :type order: number
+        :param first_parent:
+            (optional) Whether to follow only the first parent of each
+            commit, leaving out the history of keys merged in.  Defaults to
+            False.
+        :type first_parent: boolean
+        :param info:
+            (optional) Whether to yield compact :class:`CommitInfo
+            <jsongit.wrappers.CommitInfo>` records, which neither decode
+            data nor keep the underlying commit alive, instead of full
+            commits.  Defaults to False.
+        :type info: boolean
 
         :returns:
             A generator to traverse commits, yielding
@@ -404,8 +1410,243 @@ class Repository(object):
         elif commit is None:
             c = self._repo.lookup_reference(self._key2ref(key)).get_object()
             commit = self._build_commit(c)
-        return (self._build_commit(c) for c in self._repo.walk(commit.oid, order))
+        return self._walk(commit.oid, order, info, first_parent, key)
+
+    def loose_objects(self):
+        """Count the loose (unpacked) objects in the repository.  Every
+        :func:`add` and :func:`commit` creates several of these, and they are
+        only consolidated by :func:`maintain`.
+
+        >>> repo.commit('foo', 'bar')
+        >>> repo.loose_objects()
+        5
+
+        :returns: the number of loose objects
+        :rtype: int
+        """
+        objects = os.path.join(self._repo.path, 'objects')
+        count = 0
+        for fan in os.listdir(objects):
+            if len(fan) == 2:
+                count += len(os.listdir(os.path.join(objects, fan)))
+        return count
+
+    def maintain(self, repack=True, pack_refs=True, prune_unreachable=False,
+                 window=None, depth=None, retention=None):
+        """Consolidate the repository on disk.  This uses the system `git`,
+        like :func:`global_config <jsongit.utils.global_config>`.  Writes
+        through this repository object wait until it is done, so nothing
+        they write is pruned before it is referred to.
+
+        >>> repo.loose_objects()
+        3127
+        >>> repo.maintain()
+        {'loose_before': 3127, 'loose_after': 0}
+
+        :param repack:
+            (optional) Whether to pack loose objects into a single pack file.
+            Defaults to True.
+        :type repack: boolean
+        :param pack_refs:
+            (optional) Whether to pack the references for every key into
+            `packed-refs`.  Defaults to True.
+        :type pack_refs: boolean
+        :param prune_unreachable:
+            (optional) Whether to delete commits and blobs that are no longer
+            reachable from any key, such as those left behind by
+            :func:`remove`.  If True, everything unreachable is deleted
+            immediately; if a string such as `'2.weeks.ago'`, only
+            unreachable objects older than that are deleted.  Defaults to
+            False.
+        :type prune_unreachable: boolean or string
+        :param window:
+            (optional) How many similar objects to compare each blob against
+            when delta-compressing the pack.  Git groups the versions of a
+            key together, so a larger window finds more of them.  If this or
+            `depth` is specified, existing deltas are recomputed.  Defaults to
+            git's own setting.
+        :type window: int
+        :param depth:
+            (optional) The longest chain of deltas to allow in the pack.
+            Longer chains store near-identical versions more compactly, but
+            take longer to read back.  Defaults to git's own setting.
+        :type depth: int
+        :param retention:
+            (optional) Policies to :func:`compact` keys with first, mapping
+            each key or prefix to the arguments for it.  `keep_for` may be
+            given instead of `keep_since`, as an age in seconds.  Combine
+            with `prune_unreachable` to delete the squashed commits.
+
+            >>> repo.maintain(prune_unreachable=True, retention={
+            ...     'logs/': {'keep_for': 7 * 24 * 60 * 60},
+            ...     'users/': {'keep_last': 100}})
+        :type retention: dict
+
+        :returns:
+            loose object counts before and after maintenance, and with
+            retention, the report from :func:`compact` for each policy and
+            the size of all objects before and after, in bytes
+        :rtype: dict
+        :raises: :class:`GitCommandError <jsongit.GitCommandError>`
+        """
+        path = self._repo.path
+        # writers hold the lock from writing an object until something
+        # refers to it, so nothing is pruned from under them
+        with self._lock:
+            report = {'loose_before': self.loose_objects()}
+            if retention:
+                report['bytes_before'] = self._physical_bytes()
+                report['compacted'] = {}
+                for key_or_prefix, policy in sorted(retention.iteritems()):
+                    policy = dict(policy)
+                    if 'keep_for' in policy:
+                        policy['keep_since'] = (time.time() -
+                                                policy.pop('keep_for'))
+                    report['compacted'][key_or_prefix] = self.compact(
+                        key_or_prefix, **policy)
+            if pack_refs:
+                utils.git(path, 'pack-refs', '--all', '--prune')
+            if prune_unreachable:
+                expire = ('now' if prune_unreachable is True
+                          else prune_unreachable)
+                utils.git(path, 'reflog', 'expire', '--all',
+                          '--expire-unreachable=%s' % expire)
+            if repack:
+                args = ['repack', '-a', '-d', '-q']
+                if window is not None or depth is not None:
+                    args.append('-f')
+                if window is not None:
+                    args.append('--window=%d' % window)
+                if depth is not None:
+                    args.append('--depth=%d' % depth)
+                utils.git(path, *args)
+            if prune_unreachable:
+                utils.git(path, 'prune', '--expire=%s' % expire)
+            report['loose_after'] = self.loose_objects()
+            if retention:
+                report['bytes_after'] = self._physical_bytes()
+            return report
+
+    def query(self, name, value=MISSING, low=None, high=None, values=False):
+        """Find keys through an index from :func:`create_index`, either by
+        an exact term or by a range of terms.
+
+        >>> repo.query('by_email', 'jon@q.com')
+        ['jon']
+        >>> repo.query('by_age', low=18, high=65, values=True)
+        [('jon', {u'user': {u'email': u'jon@q.com', u'age': 30}})]
+
+        :param name: the name of the index
+        :type name: string
+        :param value: (optional) the exact term to find
+        :param low: (optional) the lowest term of a range, inclusive
+        :param high: (optional) the highest term of a range, inclusive
+        :param values:
+            (optional) Whether to return `(key, value)` pairs instead of
+            keys.  Defaults to False.
+        :type values: boolean
+
+        :returns:
+            the keys, sorted for an exact term or ordered by term for a
+            range
+        :rtype: list
+        :raises:
+            KeyError if there is no such index, TypeError if it is a view
+            and a range was asked for, or the bounds are unusable
+        """
+        index = self._views[name]
+        if value is not MISSING:
+            keys = sorted(index.find(value))
+        elif isinstance(index, Index):
+            keys = index.range(low, high)
+        else:
+            raise TypeError("%s is a view, not an index" % name)
+        if values:
+            return [(key, self._show_hex(index.head(key))) for key in keys]
+        return keys
+
+    @timed('patch')
+    @traced('patch')
+    def patch(self, key, ops, expected_oid=None, **kwargs):
+        """Change part of the value for key, and commit the result.  The
+        head is read, patched and committed while holding a lock for the key,
+        and the commit only lands if the head is still the one patched --
+        otherwise the patch is applied again to the new head, up to
+        :data:`PATCH_ATTEMPTS` times.  Patches to the same key, and other
+        commits made meanwhile, are never overwritten.
+
+        >>> repo.commit('jon', {'status': 'active', 'tags': ['a']})
+        >>> repo.patch('jon', [{'op': 'replace', 'path': '/status',
+        ...                     'value': 'retired'},
+        ...                    {'op': 'add', 'path': '/tags/-', 'value': 'b'}])
+        >>> repo.show('jon')
+        {u'status': u'retired', u'tags': [u'a', u'b']}
+
+        :param key: the key to patch
+        :type key: string
+        :param ops:
+            An `RFC 6902 <http://tools.ietf.org/html/rfc6902>`_ JSON Patch,
+            or a :class:`Diff <jsongit.wrappers.Diff>` or a dict shaped like
+            one.
+        :type ops: list of dicts, or :class:`Diff <jsongit.wrappers.Diff>`
+        :param expected_oid:
+            (optional) The id of the commit the patch was made against.  If
+            the key's head is anything else, nothing is committed.
+        :type expected_oid: :class:`pygit2.Oid` or hex string
+        :param message: (optional) The message for the commit.
+        :type message: string
+        :param author: (optional) The author of the commit.
+        :type author: pygit2.Signature
+        :param committer: (optional) The committer of the commit.
+        :type committer: pygit2.Signature
+
+        :returns: the new head commit
+        :rtype: :class:`Commit <jsongit.wrappers.Commit>`
+        :raises:
+            KeyError if there is no entry for key,
+            :class:`HeadMismatchError <jsongit.HeadMismatchError>` if the
+            head is not `expected_oid`, or if other commits kept moving the
+            head for every attempt,
+            :class:`PatchError <jsongit.PatchError>` if the patch does not
+            apply
+        """
+        kwargs.setdefault('message', "Patch %s" % key)
+        with self._key_locks[hash(key) % KEY_LOCKS]:
+            for attempt in xrange(PATCH_ATTEMPTS):
+                head = self.head(key)
+                if expected_oid is not None and \
+                        _oid(expected_oid) != head.oid:
+                    raise HeadMismatchError("Head of %s is %s, not %s" %
+                                            (key, head.hex, expected_oid))
+                if isinstance(ops, DiffWrapper):
+                    value = ops.apply(head.data)
+                elif isinstance(ops, dict):
+                    value = DiffWrapper(ops).apply(head.data)
+                else:
+                    value = patches.apply_patch(head.data, ops)
+                # commits that do not patch skip the key lock, so only
+                # commit if the head is still the one patched
+                with self._lock:
+                    current = self._head_oid(key)
+                    if current == head.oid:
+                        return self.commit(key, value, parents=[head],
+                                           **kwargs)
+                if expected_oid is not None or attempt == PATCH_ATTEMPTS - 1:
+                    raise HeadMismatchError("Head of %s is %s, not %s" %
+                                            (key, current, head.hex))
+
+    def refresh_views(self):
+        """Bring every view up to date with changes made by other
+        processes or repository objects.  Changes made through this
+        repository object are always reflected already.
+        """
+        with self._lock:
+            heads = dict((key, oid.hex)
+                         for key, oid in self._heads().iteritems())
+            for view in self._views.values():
+                view.sync(heads, self._show_hex)
 
+    @traced('remove')
     def remove(self, key, force=False):
         """Remove the head reference to this key, so that it is no longer
         visible in the repo.  Prior commits and blobs remain in the repo, but
@@ -432,7 +1673,15 @@ class Repository(object):
             self._repo.index.remove(key)
         elif force is False and self.staged(key):
             raise StagedDataError("There is data staged for %s" % key)
-        self._repo.lookup_reference(self._key2ref(key)).delete()
+        with self._lock:
+            ref = self._repo.lookup_reference(self._key2ref(key))
+            old = ref.target
+            ref.delete()
+            self._publish(key, old, None)
+            for view in self._views.values():
+                view.discard(key)
+            if self._history is not None:
+                self._history.discard(key)
 
     def reset(self, key):
         """Reset the value in the index to its HEAD value.
@@ -446,9 +1695,36 @@ class Repository(object):
         :param key: the key to reset
         :type key: string
         """
-        self.add(key, self.head(key).data)
+        self._stage([(key, self._navigate_tree(self._commit_at(key).tree.oid,
+                                               key))])
+
+    def schedule_maintenance(self, threshold=10000, interval=60, **kwargs):
+        """Run :func:`maintain` in a background thread whenever the number of
+        :func:`loose_objects` reaches a threshold.
+
+        >>> scheduler = repo.schedule_maintenance(threshold=5000, interval=30)
+        >>> scheduler.stop()
+
+        :param threshold:
+            (optional) The number of loose objects that triggers maintenance.
+            Defaults to 10000.
+        :type threshold: int
+        :param interval:
+            (optional) How often to count loose objects, in seconds.  Defaults
+            to 60.
+        :type interval: number
+        :param kwargs: (optional) Keyword arguments for :func:`maintain`.
+
+        :returns: the running scheduler
+        :rtype: :class:`MaintenanceScheduler <jsongit.maintenance.MaintenanceScheduler>`
+        """
+        scheduler = MaintenanceScheduler(self, threshold, interval, **kwargs)
+        scheduler.start()
+        return scheduler
 
-    def show(self, key, back=0):
+    @timed('show')
+    @traced('show')
+    def show(self, key, back=0, at=None, path=None):
         """Obtain the data at HEAD, or a certain number of steps back, for key.
 
         >>> repo.commit('president', 'washington')
@@ -458,6 +1734,15 @@ class Repository(object):
         u'madison'
         >>> repo.show('president', back=2)
         u'washington'
+        >>> repo.show('president', at=1332438935)
+        u'adams'
+
+        With a path, only what it leads to is decoded, and as little of the
+        value after it as possible is read.
+
+        >>> repo.commit('jon', {'user': {'emails': ['jon@q.com']}})
+        >>> repo.show('jon', path='user.emails[0]')
+        u'jon@q.com'
 
         :param key: The key to look up.
         :type key: string
@@ -465,14 +1750,107 @@ class Repository(object):
             (optional) How many steps back from head to get the commit.
             Defaults to 0 (the current head).
         :type back: integer
+        :param at:
+            (optional) A time, in UTC seconds, to show the value as of.
+            Defaults to the current head.
+        :type at: int
+        :param path:
+            (optional) A path within the value to show, as dotted keys with
+            list indices in brackets, like `'a.b[3].c'`.
+        :type path: string
 
         :returns: the data
         :rtype: int, float, NoneType, unicode, boolean, list, or dict
         :raises:
-            KeyError if there is no entry for key, IndexError if too many steps
-            back are specified.
+            KeyError if there is no entry for key or nothing at path,
+            IndexError if too many steps back are specified or there is no
+            commit at or before `at`.
         """
-        return self.head(key, back=back).data
+        self._tracer.current().set('back', back)
+        if path is not None:
+            return self._show_path(key, back, at, path)
+        return self.head(key, back=back, at=at).data
+
+    def snapshot(self):
+        """Capture the head commit of every key at this instant.  Reads from
+        the snapshot are consistent with one another even while other threads
+        commit, and resolve keys without looking up any references.
+
+        >>> repo.commit('roses', 'red')
+        >>> snapshot = repo.snapshot()
+        >>> repo.commit('roses', 'white')
+        >>> snapshot.show('roses')
+        u'red'
+        >>> repo.show('roses')
+        u'white'
+
+        :returns: a read-only view of the repository
+        :rtype: :class:`Snapshot <jsongit.models.Snapshot>`
+        """
+        with self._lock:
+            return Snapshot(self, self._heads())
+
+    def stats(self):
+        """Measure how much space the values in the repository take.  Every
+        version of every key counts towards the logical size; identical
+        values are stored once, and git compresses what remains, zlib for
+        loose objects and deltas between similar values once
+        :func:`maintain` packs them.  Only the blobs holding values are
+        measured, not the commits and trees that refer to them.  This uses
+        the system `git`, like :func:`maintain`.
+
+        >>> repo.stats()
+        {'keys': 2, 'commits': 40, 'blobs': 21, 'logical_bytes': 81920,
+         'unique_bytes': 43008, 'physical_bytes': 12288,
+         'dedup_ratio': 1.9, 'compression_ratio': 6.66}
+
+        :returns:
+            counts of keys, commits and distinct blobs; the logical size of
+            all versions, the size of distinct blobs, and the size of those
+            blobs on disk once compressed, in bytes; and the ratios of
+            logical size to distinct and on-disk size.
+        :rtype: dict
+        :raises: :class:`GitCommandError <jsongit.GitCommandError>`
+        """
+        heads = []
+        for name in self._repo.listall_references():
+            if name.startswith(REF_PREFIX):
+                heads.append(self._repo.lookup_reference(name).target)
+
+        commits = 0
+        logical = 0
+        sizes = {}
+        if heads:
+            walker = self._repo.walk(heads[0], constants.GIT_SORT_NONE)
+            for head in heads[1:]:
+                walker.push(head)
+            for c in walker:
+                blob_id = self._key_entry(c)[1]
+                if blob_id not in sizes:
+                    sizes[blob_id] = self._repo[blob_id].size
+                commits += 1
+                logical += sizes[blob_id]
+        unique = sum(sizes.itervalues())
+
+        physical = 0
+        if sizes:
+            # the compressed size of each blob, loose or in a pack
+            out = utils.git(self._repo.path, 'cat-file', '--batch-all-objects',
+                            '--batch-check=%(objectname) %(objectsize:disk)')
+            disk = dict(line.split() for line in out.splitlines())
+            physical = sum(int(disk[blob_id.hex]) for blob_id in sizes)
+
+        return {
+            'keys': len(heads),
+            'commits': commits,
+            'blobs': len(sizes),
+            'logical_bytes': logical,
+            'unique_bytes': unique,
+            'physical_bytes': physical,
+            'dedup_ratio': float(logical) / unique if unique else 1.0,
+            'compression_ratio':
+                float(logical) / physical if physical else 1.0,
+        }
 
     def staged(self, key):
         """Determine whether the value in the index differs from the committed
@@ -493,11 +1871,11 @@ class Repository(object):
         :returns: whether the entries are different.
         :rtype: boolean
         """
-        if key in self._repo.index:
-            if self.committed(key):
-                return self.index(key) != self.show(key)
-            else:
-                return True
+        index = self._repo.index
+        if key in index:
+            head = self._head_oid(key)
+            return head is None or index[key].oid != self._navigate_tree(
+                self._repo[head].tree.oid, key)
         else:
             return False
         # try:
@@ -506,6 +1884,335 @@ class Repository(object):
         # except KeyError:
         #     return False
 
+    def status(self):
+        """Report whether each key in the index differs from its head,
+        without decoding any values.  A key is `new` if it has never been
+        committed, `modified` if its staged value is not the committed one,
+        and `unmodified` otherwise.
+
+        >>> repo.commit('huey', 'short')
+        >>> repo.add('huey', 'long')
+        >>> repo.add('dewey', 'tall')
+        >>> list(repo.status())
+        [('dewey', 'new'), ('huey', 'modified')]
+
+        :returns: `(key, state)` pairs, in the order of the index
+        :rtype: iterator
+        """
+        for entry in self._repo.index:
+            head = self._head_oid(entry.path)
+            if head is None:
+                yield entry.path, 'new'
+            elif entry.oid != self._navigate_tree(self._repo[head].tree.oid,
+                                                  entry.path):
+                yield entry.path, 'modified'
+            else:
+                yield entry.path, 'unmodified'
+
+    def transaction(self, **kwargs):
+        """Change many keys at once.  The changes are made when the `with`
+        block ends, all together or not at all, and are discarded if it
+        raises.
+
+        >>> with repo.transaction(message='Rename') as tx:
+        ...     tx.add('users/jonathan', repo.show('users/jon'))
+        ...     tx.remove('users/jon')
+        >>> repo.keys()
+        ['users/jonathan']
+
+        :param message: (optional) The message for the commits.
+        :type message: string
+        :param author:
+            (optional) The author of the commits.  Defaults to global author.
+        :type author: pygit2.Signature
+        :param committer:
+            (optional) The committer of the commits.  Defaults to author.
+        :type committer: pygit2.Signature
+
+        :rtype: :class:`Transaction <jsongit.models.Transaction>`
+        """
+        message = kwargs.pop('message', '')
+        author = kwargs.pop('author', utils.signature(self._global_name,
+                                                      self._global_email))
+        committer = kwargs.pop('committer', author)
+        if kwargs:
+            raise TypeError("Unknown keyword args %s" % kwargs)
+        return Transaction(self, message, author, committer)
+
+
+class Transaction(object):
+    """Changes to many keys, made together or not at all when the `with`
+    block using it ends.  Obtain one from :func:`Repository.transaction`.
+
+    Every key is checked before anything is written, and the references of
+    all of them are moved together while holding the repository's lock.  If
+    one cannot be moved, those already moved are put back.
+    """
+
+    def __init__(self, repo, message, author, committer):
+        self._repo = repo
+        self._message = message
+        self._author = author
+        self._committer = committer
+        self._writes = {}
+        self._removals = {}
+        self._oids = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        if type is None:
+            self.commit()
+        return False
+
+    def _check_open(self):
+        if self._oids is not None:
+            raise ValueError("The transaction is already committed")
+
+    def add(self, key, value):
+        """Set the value for a key.
+
+        :param key: The key
+        :type key: string
+        :param value: The value
+        :type value: anything that runs through :func:`json.dumps`
+        """
+        self._check_open()
+        self._removals.pop(key, None)
+        self._writes[key] = value
+
+    def remove(self, key, force=False):
+        """Remove a key, as :func:`Repository.remove` would.
+
+        :param key: The key to remove
+        :type key: string
+        :param force:
+            (optional) Whether to remove it even if there is data staged for
+            it.
+        :type force: boolean
+        """
+        self._check_open()
+        self._writes.pop(key, None)
+        self._removals[key] = force
+
+    def commit(self):
+        """Make the changes.  This happens when the `with` block ends, so
+        it need only be called when not using one.
+
+        :raises:
+            :class:`InvalidKeyError <jsongit.InvalidKeyError>`,
+            :class:`NotJsonError <jsongit.NotJsonError>`,
+            :class:`StagedDataError <jsongit.StagedDataError>`, or KeyError
+            if a removed key does not exist, all before anything is written
+        """
+        self._check_open()
+        self._oids = self._repo._apply(self._writes, self._removals,
+                                       self._message, self._author,
+                                       self._committer)
+
+    @property
+    def commits(self):
+        """The new head commit of each key that was changed, once
+        committed.
+
+        :rtype: dict
+        """
+        if self._oids is None:
+            return {}
+        return dict((key, self._repo._build_commit(self._repo._repo[oid],
+                                                   lazy=True))
+                    for key, oid in self._oids.iteritems())
+
+
+class Snapshot(object):
+    """A read-only view of the keys in a :class:`Repository` as they were
+    when :func:`Repository.snapshot` was called.  Obtain one from the
+    repository, not the constructor.
+    """
+
+    def __init__(self, repo, oids):
+        self._repo = repo
+        self._oids = oids
+
+    def __contains__(self, key):
+        return key in self._oids
+
+    def __len__(self):
+        return len(self._oids)
+
+    def head(self, key, back=0):
+        """Get the head commit for a key as of the snapshot.  See
+        :func:`Repository.head`.
+
+        :raises:
+            KeyError if there was no entry for key, IndexError if too many
+            steps back are specified.
+        """
+        try:
+            oid = self._oids[key]
+        except KeyError:
+            raise KeyError("There is no key at %s" % key)
+        return self._repo._build_commit(self._repo._step_back(oid, back, key))
+
+    def keys(self):
+        """All the keys that were committed when the snapshot was taken.
+
+        >>> snapshot.keys()
+        ['fork', 'spoon']
+
+        :returns: the keys, in sorted order
+        :rtype: list
+        """
+        return sorted(self._oids)
+
+    def log(self, key=None, commit=None, order=constants.GIT_SORT_NONE,
+            info=False, first_parent=False):
+        """Traverse commits from the snapshot's head for key, or from an
+        explicit commit.  See :func:`Repository.log`.
+
+        :raises: KeyError if there was no entry for key
+        """
+        if key is None and commit is None:
+            raise TypeError()
+        elif commit is None:
+            try:
+                oid = self._oids[key]
+            except KeyError:
+                raise KeyError("There is no key at %s" % key)
+        else:
+            oid = commit.oid
+        return self._repo._walk(oid, order, info, first_parent, key)
+
+    @property
+    def repo(self):
+        """
+        :returns: The repository this is a snapshot of.
+        :rtype: :class:`Repository <jsongit.models.Repository>`
+        """
+        return self._repo
+
+    def show(self, key, back=0):
+        """Obtain the data for key as of the snapshot, or a certain number of
+        steps back from it.  See :func:`Repository.show`.
+
+        :raises:
+            KeyError if there was no entry for key, IndexError if too many
+            steps back are specified.
+        """
+        return self.head(key, back=back).data
+
+
+class ReadOnlyRepository(BaseRepository):
+    """A handle for processes that only read.  It never reads git config or
+    touches the index, and caches aggressively: each key's head is cached
+    until its reference file changes, and decoded values are cached by blob
+    id.  One handle can be shared between threads.  Obtain one with
+    :func:`open_readonly <jsongit.open_readonly>`.
+
+    Values are shared between every read of the same blob, so they must not
+    be modified.
+    """
+
+    def __init__(self, repo, loads, cache_size=1024, metrics=None,
+                 tracer=None):
+        super(ReadOnlyRepository, self).__init__(repo, loads, metrics=metrics,
+                                                 tracer=tracer)
+        self._refs = {}
+        self._blobs = utils.LRUCache(cache_size)
+
+    def _stamp(self, path):
+        try:
+            stat = os.stat(path)
+            return stat.st_ino, stat.st_mtime, stat.st_size
+        except OSError:
+            return None
+
+    def _target(self, key):
+        """Find the head commit id for key.  References are cached until
+        either their file or `packed-refs` changes.
+
+        :raises: KeyError if there is no entry for key
+        """
+        ref = self._key2ref(key)
+        stamp = (self._stamp(os.path.join(self._repo.path, ref)),
+                 self._stamp(os.path.join(self._repo.path, 'packed-refs')))
+        cached = self._refs.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        try:
+            oid = self._repo.lookup_reference(ref).target
+        except KeyError:
+            self._refs.pop(key, None)
+            raise KeyError("There is no key at %s" % key)
+        self._refs[key] = (stamp, oid)
+        return oid
+
+    def _start(self, key, at=None):
+        if at is not None:
+            raise TypeError("Read-only repositories cannot look up times")
+        return self._target(key)
+
+    def _value(self, blob_id, steps=None):
+        value = self._blobs.get(blob_id, MISSING)
+        if value is MISSING:
+            if steps is not None:
+                return super(ReadOnlyRepository, self)._value(blob_id, steps)
+            value = super(ReadOnlyRepository, self)._value(blob_id)
+            self._blobs.put(blob_id, value)
+        return value if steps is None else paths.extract(value, steps)
+
+    def committed(self, key):
+        """Determine whether there is a commit for a key.  See
+        :func:`Repository.committed`.
+
+        :rtype: boolean
+        """
+        try:
+            self._target(key)
+            return True
+        except KeyError:
+            return False
+
+    def head(self, key, back=0):
+        """Get the head commit for a key.  See :func:`Repository.head`.
+
+        :raises:
+            KeyError if there is no entry for key, IndexError if too many
+            steps back are specified.
+        """
+        return self._build_commit(self._commit_at(key, back))
+
+    def log(self, key=None, commit=None, order=constants.GIT_SORT_NONE,
+            info=False, first_parent=False):
+        """Traverse commits from the head for key, or from an explicit commit.
+        See :func:`Repository.log`.
+
+        :raises: KeyError if there is no entry for key
+        """
+        if key is None and commit is None:
+            raise TypeError()
+        elif commit is None:
+            oid = self._target(key)
+        else:
+            oid = commit.oid
+        return self._walk(oid, order, info, first_parent, key)
+
+    @traced('show')
+    def show(self, key, back=0, path=None):
+        """Obtain the data at the head for key, or a certain number of steps
+        back from it, or only what a path leads to within it.  See
+        :func:`Repository.show`.
+
+        :raises:
+            KeyError if there is no entry for key or nothing at path,
+            IndexError if too many steps back are specified.
+        """
+        if path is not None:
+            return self._show_path(key, back, None, path)
+        return self.head(key, back=back).data
+
+
 # class Value(object):
 #     """Values are what exist behind a single key.  They provide convenience
 #     methods to their underlying repository.
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+
+"""
+jsongit.patches
+
+Applying `RFC 6902 <http://tools.ietf.org/html/rfc6902>`_ JSON Patches to
+values.
+"""
+
+import copy
+
+from .exceptions import PatchError
+
+
+def parse_pointer(pointer):
+    """Split an `RFC 6901 <http://tools.ietf.org/html/rfc6901>`_ JSON
+    Pointer into its reference tokens.
+
+    >>> parse_pointer('/a/b~1c/0')
+    ['a', 'b/c', '0']
+
+    :param pointer: the pointer
+    :type pointer: string
+
+    :rtype: list of strings
+    :raises: :class:`PatchError <jsongit.PatchError>`
+    """
+    if pointer == '':
+        return []
+    if not isinstance(pointer, basestring) or pointer[0] != '/':
+        raise PatchError("Invalid pointer %r" % (pointer, ))
+    return [token.replace('~1', '/').replace('~0', '~')
+            for token in pointer[1:].split('/')]
+
+
+def _index(container, token, pointer, end=False):
+    if end and token == '-':
+        return len(container)
+    if not token.isdigit() or (token != '0' and token[0] == '0'):
+        raise PatchError("Invalid list index in %s" % pointer)
+    index = int(token)
+    if index > len(container) or (index == len(container) and not end):
+        raise PatchError("Index out of range in %s" % pointer)
+    return index
+
+
+def _parent(value, pointer):
+    """Find the container the last token of pointer refers into.
+    """
+    tokens = parse_pointer(pointer)
+    for token in tokens[:-1]:
+        if isinstance(value, dict) and token in value:
+            value = value[token]
+        elif isinstance(value, list):
+            value = value[_index(value, token, pointer)]
+        else:
+            raise PatchError("Nothing at %s" % pointer)
+    if not isinstance(value, (dict, list)):
+        raise PatchError("Nothing at %s" % pointer)
+    return value, tokens[-1]
+
+
+def _get(value, pointer):
+    if pointer == '':
+        return value
+    container, token = _parent(value, pointer)
+    if isinstance(container, list):
+        return container[_index(container, token, pointer)]
+    elif token in container:
+        return container[token]
+    raise PatchError("Nothing at %s" % pointer)
+
+
+def _add(value, pointer, item):
+    if pointer == '':
+        return item
+    container, token = _parent(value, pointer)
+    if isinstance(container, list):
+        container.insert(_index(container, token, pointer, end=True), item)
+    else:
+        container[token] = item
+    return value
+
+
+def _remove(value, pointer):
+    if pointer == '':
+        raise PatchError("Cannot remove the whole value")
+    container, token = _parent(value, pointer)
+    if isinstance(container, list):
+        del container[_index(container, token, pointer)]
+    elif token in container:
+        del container[token]
+    else:
+        raise PatchError("Nothing at %s" % pointer)
+    return value
+
+
+def apply_patch(value, ops):
+    """Apply a JSON Patch to a value.  The value is modified in place where
+    possible, so pass a copy if the original must be kept.
+
+    >>> apply_patch({'a': [1]}, [{'op': 'add', 'path': '/a/-', 'value': 2},
+    ...                          {'op': 'add', 'path': '/b', 'value': 3}])
+    {'a': [1, 2], 'b': 3}
+
+    :param value: the value to patch
+    :param ops: the operations, each a dict with `op` and `path` members
+    :type ops: list of dicts
+
+    :returns: the patched value
+    :raises:
+        :class:`PatchError <jsongit.PatchError>` if an operation is
+        malformed, refers to something that does not exist, or is a failed
+        `test`
+    """
+    for op in ops:
+        try:
+            name, path = op['op'], op['path']
+            if name == 'add':
+                value = _add(value, path, op['value'])
+            elif name == 'remove':
+                value = _remove(value, path)
+            elif name == 'replace':
+                _get(value, path)
+                value = _add(_remove(value, path) if path else value, path,
+                             op['value'])
+            elif name == 'move':
+                if path.startswith(op['from'] + '/'):
+                    raise PatchError("Cannot move %s into itself" % op['from'])
+                item = _get(value, op['from'])
+                value = _add(_remove(value, op['from']), path, item)
+            elif name == 'copy':
+                item = copy.deepcopy(_get(value, op['from']))
+                value = _add(value, path, item)
+            elif name == 'test':
+                if _get(value, path) != op['value']:
+                    raise PatchError("Test failed at %s" % path)
+            else:
+                raise PatchError("Unknown op %r" % (name, ))
+        except (KeyError, TypeError) as e:
+            raise PatchError("Malformed operation %r: %s" % (op, e))
+    return value
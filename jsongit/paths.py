@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+
+"""
+jsongit.paths
+
+Paths into values, like `'user.emails[0]'`, and reading them out of
+serialized JSON without decoding the rest of it.
+"""
+
+import re
+
+
+#: Returned by :func:`extract` when a path leads nowhere.
+MISSING = object()
+
+_STEP = re.compile(r'(?:^|\.)([^.\[\]]+)|\[(\d+)\]')
+_NAME = re.compile(r'[^.\[\]]+$')
+
+
+def parse_path(path):
+    """Split a path into the dict keys and list indices it steps through.
+
+    >>> parse_path('user.emails[0]')
+    ('user', 'emails', 0)
+
+    :param path: dotted names, with list indices in square brackets
+    :type path: string
+
+    :rtype: tuple
+    :raises: ValueError if the path is malformed
+    """
+    steps = []
+    pos = 0
+    while pos < len(path):
+        match = _STEP.match(path, pos)
+        if match is None or match.group(0)[0] == '.' and pos == 0:
+            raise ValueError("Invalid path %r" % path)
+        name, index = match.groups()
+        steps.append(name if index is None else int(index))
+        pos = match.end()
+    if not steps:
+        raise ValueError("Invalid path %r" % path)
+    return tuple(steps)
+
+
+def extract(value, steps):
+    """Follow steps from :func:`parse_path` into a value.
+
+    :returns: what the steps lead to, or :data:`MISSING`
+    """
+    for step in steps:
+        if isinstance(step, int):
+            if not isinstance(value, list) or step >= len(value):
+                return MISSING
+        elif not isinstance(value, dict) or step not in value:
+            return MISSING
+        value = value[step]
+    return value
+
+
+def leaves(value, path='', steps=()):
+    """Find the path to every scalar and empty container within a value.
+    Dicts with names that cannot be written in a path are not stepped into,
+    so they are found as a whole.
+
+    >>> sorted(leaves({'user': {'emails': ['jon@q.com']}, 'age': 30}))
+    [('age', ('age',)), ('user.emails[0]', ('user', 'emails', 0))]
+
+    :returns:
+        `(path, steps)` pairs, or only the empty path with no steps if the
+        value is itself a scalar or empty
+    :rtype: generator
+    """
+    if isinstance(value, dict) and value and all(
+            isinstance(name, basestring) and _NAME.match(name)
+            for name in value):
+        for name, item in value.iteritems():
+            for leaf in leaves(item, path + '.' + name if path else name,
+                               steps + (name, )):
+                yield leaf
+    elif isinstance(value, list) and value:
+        for i, item in enumerate(value):
+            for leaf in leaves(item, '%s[%d]' % (path, i), steps + (i, )):
+                yield leaf
+    else:
+        yield path, steps
+
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+def extract_json(raw, steps, json):
+    """Follow steps from :func:`parse_path` into serialized JSON, decoding
+    only the value they lead to and whatever comes before it.  Nothing after
+    that value is read.
+
+    >>> extract_json('{"a": [1, {"b": 2}], "c": 3}', ('a', 1, 'b'), json)
+    2
+
+    :param raw: a serialized JSON value
+    :type raw: string
+    :param steps: the steps to follow
+    :type steps: tuple
+    :param json: the json module that wrote raw
+
+    :returns: what the steps lead to, or :data:`MISSING`
+    """
+    ws = _WHITESPACE.match
+    decoder = json.JSONDecoder()
+    scanstring = json.decoder.scanstring
+    skip = lambda pos: ws(raw, decoder.raw_decode(raw, pos)[1]).end()
+    pos = ws(raw, 0).end()
+    for step in steps:
+        if isinstance(step, int):
+            if raw[pos] != '[':
+                return MISSING
+            pos = ws(raw, pos + 1).end()
+            if raw[pos] == ']':
+                return MISSING
+            for i in xrange(step):
+                pos = skip(pos)
+                if raw[pos] == ']':
+                    return MISSING
+                pos = ws(raw, pos + 1).end()
+        else:
+            if isinstance(step, str):
+                step = step.decode('utf-8')
+            if raw[pos] != '{':
+                return MISSING
+            pos = ws(raw, pos + 1).end()
+            if raw[pos] == '}':
+                return MISSING
+            while True:
+                name, pos = scanstring(raw, pos + 1)
+                pos = ws(raw, ws(raw, pos).end() + 1).end()
+                if name == step:
+                    break
+                pos = skip(pos)
+                if raw[pos] == '}':
+                    return MISSING
+                pos = ws(raw, pos + 1).end()
+    return decoder.raw_decode(raw, pos)[0]
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+
+"""
+jsongit.serializers
+
+A registry of codecs for the values stored in blobs.  Values written with
+the repository's default `dumps` are stored as-is, so plain JSON blobs stay
+readable by any git tool.  Values written with a named codec are prefixed
+with a tag, `\\x00<name>\\x00`, which no JSON document can start with, so
+repositories can hold a mix of codecs and every blob is decoded with the
+codec that wrote it.
+"""
+
+import threading
+
+TAG = '\x00'
+
+
+class Codec(object):
+    """A named pair of `dumps` and `loads` functions.
+    """
+
+    def __init__(self, name, dumps, loads):
+        if TAG in name:
+            raise ValueError("Codec name %r may not contain NUL" % name)
+        self._name = name
+        self._tag = TAG + name + TAG
+        self._dumps = dumps
+        self._loads = loads
+
+    def __repr__(self):
+        return "%s(%s)" % (type(self).__name__, self._name)
+
+    @property
+    def name(self):
+        """The name recorded in the tag of every blob this codec writes.
+        """
+        return self._name
+
+    def encode(self, value):
+        """Serialize value, prefixed with this codec's tag.
+
+        :rtype: string
+        """
+        return self._tag + self._dumps(value)
+
+    def decode(self, payload):
+        """Deserialize a payload written by :func:`encode`, without its tag.
+        """
+        return self._loads(payload)
+
+
+def _msgpack():
+    import msgpack
+    return (lambda v: msgpack.packb(v, use_bin_type=True),
+            lambda raw: msgpack.unpackb(raw, raw=False))
+
+def _cbor():
+    import cbor2
+    return cbor2.dumps, cbor2.loads
+
+def _orjson():
+    import orjson
+    return orjson.dumps, orjson.loads
+
+def _ujson():
+    import ujson
+    return ujson.dumps, ujson.loads
+
+_builtins = {
+    'msgpack': _msgpack,
+    'cbor': _cbor,
+    'orjson': _orjson,
+    'ujson': _ujson,
+}
+_codecs = {}
+_lock = threading.Lock()
+
+
+def register(name, dumps, loads):
+    """Register a codec, so that repositories can write values with it and
+    read blobs tagged with its name.
+
+    >>> import marshal
+    >>> jsongit.serializers.register('marshal', marshal.dumps, marshal.loads)
+    >>> repo = jsongit.init('path/to/repo', codec='marshal')
+
+    :param name: The name to tag blobs with.
+    :type name: string
+    :param dumps: A function to serialize a value to a string.
+    :type dumps: func
+    :param loads: A function to deserialize a string to a value.
+    :type loads: func
+
+    :returns: the codec
+    :rtype: :class:`Codec`
+    """
+    codec = Codec(name, dumps, loads)
+    with _lock:
+        _codecs[name] = codec
+    return codec
+
+
+def unregister(name):
+    """Remove a registered codec.  Blobs tagged with its name can no longer
+    be read until it is registered again.
+
+    :param name: The name of the codec.
+    :type name: string
+
+    :raises: KeyError if there is no such codec
+    """
+    with _lock:
+        try:
+            del _codecs[name]
+        except KeyError:
+            raise KeyError("There is no codec named %s" % name)
+
+
+def lookup(name):
+    """Find a registered codec.  The built-in codecs, `msgpack`, `cbor`,
+    `orjson` and `ujson`, are registered the first time they are looked up,
+    and need the library of the same name (`cbor2` for `cbor`).
+
+    :param name: The name of the codec.
+    :type name: string
+
+    :returns: the codec
+    :rtype: :class:`Codec`
+    :raises:
+        KeyError if there is no such codec, ImportError if its library is not
+        installed.
+    """
+    try:
+        return _codecs[name]
+    except KeyError:
+        if name not in _builtins:
+            raise KeyError("There is no codec named %s" % name)
+        dumps, loads = _builtins[name]()
+        return register(name, dumps, loads)
+
+
+def decode(raw, loads):
+    """Deserialize the contents of a blob, using the codec named in its tag
+    if it has one and `loads` otherwise.
+
+    :param raw: the contents of the blob
+    :type raw: string
+    :param loads: the function for untagged blobs
+    :type loads: func
+
+    :raises: ValueError if the codec named in the tag is not registered
+    """
+    if raw[:1] == TAG:
+        end = raw.find(TAG, 1)
+        if end != -1:
+            name = raw[1:end]
+            try:
+                codec = lookup(name)
+            except KeyError:
+                raise ValueError("Unknown codec %r; register it with "
+                                 "serializers.register" % name)
+            return codec.decode(raw[end + 1:])
+    return loads(raw)
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+
+"""
+jsongit.tracing
+
+Spans around repository operations, for tracing individual requests.  Pass
+a :class:`Tracer` to :func:`jsongit.init` to receive them:
+
+>>> tracer = jsongit.tracing.Recorder()
+>>> repo = jsongit.init('repo', tracer=tracer)
+>>> repo.merge('fork', 'spoon')
+>>> [(span.name, span.duration) for span in tracer.spans]
+[('merge.shared_parent', 3.02), ('merge.diff', 1.01),
+ ('merge.conflict', 0.0), ('merge.apply', 0.0), ..., ('merge', 4.05)]
+
+Operations (`add`, `commit`, `checkout`, `show`, `log`, `merge` and
+`remove`) get a span with the `key` they were called with, and their phases
+get child spans with attributes such as `blob_size` and `depth`, the number
+of commits walked.  `show` records how many steps `back` it was asked for.
+The `log` span is reported once the log has been iterated through, and only
+covers stepping through it.
+"""
+
+import functools
+import threading
+import time
+
+
+class Span(object):
+    """A timed operation, with attributes.  Use it as a context manager.
+    """
+
+    __slots__ = ('_tracer', 'name', 'attributes', 'parent', 'start', 'end')
+
+    def __init__(self, tracer, name, attributes, parent):
+        self._tracer = tracer
+        #: The name of the operation.
+        self.name = name
+        #: A dict of attributes, such as `key`.
+        self.attributes = attributes
+        #: The span this one was started within, if any.
+        self.parent = parent
+        #: When the span started and ended, in UTC seconds.
+        self.start = None
+        self.end = None
+
+    def __repr__(self):
+        return "%s(%s,%s)" % (type(self).__name__, self.name, self.attributes)
+
+    def __enter__(self):
+        self.start = time.time()
+        self._tracer._stack().append(self)
+        self._tracer.on_start(self)
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.end = time.time()
+        if value is not None:
+            self.attributes['error'] = repr(value)
+        self._tracer._stack().pop()
+        self._tracer.on_end(self)
+
+    def set(self, name, value):
+        """Set an attribute.
+        """
+        self.attributes[name] = value
+
+    @property
+    def duration(self):
+        """How long the span took, in seconds, or None if it has not ended.
+        """
+        if self.end is None:
+            return None
+        return self.end - self.start
+
+
+class _NullSpan(object):
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        pass
+
+    def set(self, name, value):
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer(object):
+    """Creates spans, keeping track of which span each thread is in.
+    Subclass this and override :func:`on_start` and :func:`on_end` to
+    forward spans elsewhere.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _stack(self):
+        try:
+            return self._local.stack
+        except AttributeError:
+            self._local.stack = []
+            return self._local.stack
+
+    def start_span(self, name, **attributes):
+        """Create a span, to be used as a context manager.  It will be a
+        child of the span the current thread is in, if any.
+
+        :param name: the name of the operation
+        :type name: string
+        :param attributes: attributes of the span
+
+        :rtype: :class:`Span`
+        """
+        stack = self._stack()
+        return Span(self, name, attributes, stack[-1] if stack else None)
+
+    def current(self):
+        """The span the current thread is in, so attributes can be added to
+        it.  If there is none, this returns a span that ignores them.
+        """
+        stack = self._stack()
+        return stack[-1] if stack else _NULL_SPAN
+
+    def record(self, name, start, end, **attributes):
+        """Report a span that has already ended, for an operation that is
+        not a single block, such as walking a log.  It will be a child of
+        the span the current thread is in, if any.
+
+        :param name: the name of the operation
+        :type name: string
+        :param start: when it started, in UTC seconds
+        :type start: float
+        :param end: when it ended, in UTC seconds
+        :type end: float
+        :param attributes: attributes of the span
+        """
+        span = self.start_span(name, **attributes)
+        span.start = start
+        self.on_start(span)
+        span.end = end
+        self.on_end(span)
+
+    def on_start(self, span):
+        """Called when a span starts.
+        """
+        pass
+
+    def on_end(self, span):
+        """Called when a span ends.
+        """
+        pass
+
+
+class NullTracer(Tracer):
+    """Does not trace.  This is what a repository uses when it is not given
+    a tracer.
+    """
+
+    def __init__(self):
+        pass
+
+    def start_span(self, name, **attributes):
+        return _NULL_SPAN
+
+    def current(self):
+        return _NULL_SPAN
+
+    def record(self, name, start, end, **attributes):
+        pass
+
+
+#: The shared :class:`NullTracer`.
+NULL = NullTracer()
+
+
+def traced(name):
+    """Decorator for :class:`Repository <jsongit.models.Repository>` methods
+    that wraps each call to them in a span, with the key they were called
+    with as the `key` attribute.
+    """
+    def decorate(meth):
+        @functools.wraps(meth)
+        def wrapped(self, *args, **kwargs):
+            key = args[0] if args else kwargs.get('key')
+            with self._tracer.start_span(name, key=key):
+                return meth(self, *args, **kwargs)
+        return wrapped
+    return decorate
+
+
+class Recorder(Tracer):
+    """Keeps every finished span in memory, so traces can be inspected
+    locally, for instance in tests.
+    """
+
+    def __init__(self):
+        super(Recorder, self).__init__()
+        self._lock = threading.Lock()
+        self._spans = []
+
+    def on_end(self, span):
+        with self._lock:
+            self._spans.append(span)
+
+    @property
+    def spans(self):
+        """Finished spans, in the order they ended.
+
+        :rtype: list of :class:`Span`
+        """
+        with self._lock:
+            return list(self._spans)
+
+    def find(self, name):
+        """Finished spans with a name.
+
+        :rtype: list of :class:`Span`
+        """
+        return [span for span in self.spans if span.name == name]
+
+    def clear(self):
+        """Forget every span recorded so far.
+        """
+        with self._lock:
+            del self._spans[:]
@@ -7,9 +7,11 @@ jsongit.author
 from time import altzone, daylight, timezone
 from time import time as curtime
 from pygit2 import Signature
+import collections
 import subprocess
+import threading
 
-from .exceptions import NoGlobalSettingError
+from .exceptions import NoGlobalSettingError, GitCommandError
 
 def global_config(name):
     """Find the value of a `git --global` setting.
@@ -37,6 +39,30 @@ def global_config(name):
     else:
         raise NoGlobalSettingError(name)
 
+def git(path, *args):
+    """Run a git command against the repository at path.
+
+    >>> jsongit.utils.git(repo.path, 'count-objects')
+    '12 objects, 48 kilobytes\\n'
+
+    :param path: the path to the git directory of a repository
+    :type path: string
+    :param args: the git subcommand and its arguments
+    :type args: strings
+    :return: the output of the command
+    :rtype: string
+    :raises: :exc:`GitCommandError <jsongit.GitCommandError>`
+    """
+    popen = subprocess.Popen(['git', '--git-dir=%s' % path] + list(args),
+                             stdout=subprocess.PIPE,
+                             stderr=subprocess.PIPE)
+
+    out, err = popen.communicate()
+    if popen.returncode == 0:
+        return out
+    else:
+        raise GitCommandError(args, err.rstrip())
+
 def signature(name, email, time=None, offset=None):
     """Convenience method to generate pygit2 signatures.
 
@@ -59,11 +85,63 @@ def signature(name, email, time=None, offset=None):
     time = time or int(curtime())
     return Signature(name, email, time, offset)
 
+_json = None
+
 def import_json():
-    try:
-        import simplejson
-        return simplejson
-    except ImportError:
-        import json
-        return json
+    global _json
+    if _json is None:
+        try:
+            import simplejson as _json
+        except ImportError:
+            import json as _json
+    return _json
+
+
+class LRUCache(object):
+    """A thread-safe mapping that keeps only the most recently used items.
+
+    >>> cache = LRUCache(2)
+    >>> cache.put('a', 1)
+    >>> cache.put('b', 2)
+    >>> cache.get('a')
+    1
+    >>> cache.put('c', 3)
+    >>> cache.get('b')
+    None
+
+    :param size: how many items to keep
+    :type size: int
+    """
+
+    def __init__(self, size):
+        self._size = size
+        self._items = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key, default=None):
+        """Get an item, marking it as the most recently used.
+        """
+        with self._lock:
+            try:
+                value = self._items.pop(key)
+            except KeyError:
+                return default
+            self._items[key] = value
+            return value
+
+    def put(self, key, value):
+        """Add an item, evicting the least recently used if the cache is
+        full.
+        """
+        with self._lock:
+            self._items.pop(key, None)
+            self._items[key] = value
+            if len(self._items) > self._size:
+                self._items.popitem(last=False)
 
+    def clear(self):
+        with self._lock:
+            self._items.clear()
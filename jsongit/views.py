@@ -0,0 +1,345 @@
+# -*- coding: utf-8 -*-
+
+"""
+jsongit.views
+
+Views map something extracted from each key's value, such as a field, to
+the keys it was extracted from, so that keys can be found by their content
+without reading every value.
+
+>>> repo.create_view('status', path='status')
+>>> repo.commit('jon', {'status': 'active'})
+>>> repo.find(status='active')
+['jon']
+
+Indexes are views that also keep their terms in order, for range queries.
+
+>>> repo.create_index('age', path='age')
+>>> repo.query('age', low=18, high=65)
+['jon']
+"""
+
+import bisect
+import errno
+import os
+import tempfile
+import threading
+
+import utils
+from .paths import MISSING, parse_path, extract
+
+
+class View(object):
+    """A mapping from extracted terms to the keys they were extracted from,
+    persisted as a journal in the repository.  Obtain one with
+    :func:`create_view <jsongit.models.Repository.create_view>`.
+
+    The journal records the head each key was indexed at, so that when a
+    view is created again it only needs to read the keys that changed since.
+    """
+
+    def __init__(self, name, directory, path=None, func=None):
+        if (path is None) == (func is None):
+            raise TypeError("Specify one of path or func")
+        if not name or '/' in name or name[0] == '.':
+            raise ValueError("Invalid view name %r" % name)
+        #: The name of the view.
+        self.name = name
+        #: The path the view extracts, if it was created with one.
+        self.path = path
+        if path is not None:
+            steps = parse_path(path)
+            func = lambda value: extract(value, steps)
+        self._func = func
+        self._file = os.path.join(directory, name + '.log')
+        self._json = utils.import_json()
+        self._lock = threading.Lock()
+        self._keys = {}
+        self._terms = {}
+        self._journal = 0
+
+    def _encode(self, term):
+        return self._json.dumps(term, sort_keys=True, separators=(',', ':'))
+
+    def _extract(self, value):
+        try:
+            return self._func(value)
+        except (KeyError, IndexError, TypeError):
+            return MISSING
+
+    def _unindex(self, key):
+        entry = self._keys.pop(key, None)
+        if entry is not None and entry[1] is not None:
+            keys = self._terms[entry[1]]
+            keys.discard(key)
+            if not keys:
+                del self._terms[entry[1]]
+        return entry
+
+    def _index(self, key, head, encoded):
+        self._keys[key] = (head, encoded)
+        if encoded is not None:
+            self._terms.setdefault(encoded, set()).add(key)
+
+    def _added(self, key, head, encoded):
+        """Hook for subclasses, called once key is indexed under a term.
+        """
+        pass
+
+    def _removed(self, key, encoded):
+        """Hook for subclasses, called once key is no longer indexed under a
+        term.
+        """
+        pass
+
+    def _write(self, lines):
+        directory = os.path.dirname(self._file)
+        if not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError as e:
+                if e.errno != errno.EEXIST:
+                    raise
+        with open(self._file, 'ab') as f:
+            f.write(''.join(self._json.dumps(line) + '\n' for line in lines))
+        self._journal += len(lines)
+
+    def _set(self, key, head, value):
+        """Index the value of key at head.  Must be called with the lock
+        held.
+
+        :returns: the journal line recording it
+        """
+        term = self._extract(value)
+        encoded = None if term is MISSING else self._encode(term)
+        self._forget(key)
+        self._index(key, head, encoded)
+        if encoded is not None:
+            self._added(key, head, encoded)
+            return [key, head, term]
+        else:
+            return [key, head]
+
+    def _forget(self, key):
+        """Stop indexing key.  Must be called with the lock held.
+
+        :returns: the journal line recording it, or None
+        """
+        old = self._unindex(key)
+        if old is None:
+            return None
+        if old[1] is not None:
+            self._removed(key, old[1])
+        return [key]
+
+    def update(self, key, head, value):
+        """Index a new value for key.
+
+        :param key: the key
+        :type key: string
+        :param head: the hex id of the key's new head commit
+        :type head: string
+        :param value: the value at that commit
+        """
+        with self._lock:
+            self._write([self._set(key, head, value)])
+
+    def discard(self, key):
+        """Stop indexing a key that was removed.
+
+        :param key: the key
+        :type key: string
+        """
+        with self._lock:
+            line = self._forget(key)
+            if line is not None:
+                self._write([line])
+
+    def load(self):
+        """Read the journal, if there is one.  A journal written for a
+        different path is discarded.
+        """
+        with self._lock:
+            try:
+                f = open(self._file, 'rb')
+            except IOError as e:
+                if e.errno == errno.ENOENT:
+                    return
+                raise
+            with f:
+                lines = [self._json.loads(line) for line in f if line.strip()]
+            if not lines or lines[0] != {'path': self.path}:
+                os.remove(self._file)
+                return
+            for line in lines[1:]:
+                key = line[0]
+                self._forget(key)
+                if len(line) == 2:
+                    self._index(key, line[1], None)
+                elif len(line) == 3:
+                    encoded = self._encode(line[2])
+                    self._index(key, line[1], encoded)
+                    self._added(key, line[1], encoded)
+            self._journal = len(lines)
+
+    def sync(self, heads, show):
+        """Bring the view up to date with the heads of every key, reading
+        only the keys whose heads changed.
+
+        :param heads: the hex id of the head commit of every key
+        :type heads: dict
+        :param show: obtains the value for a head commit's hex id
+        :type show: func
+        """
+        with self._lock:
+            lines = []
+            for key in set(self._keys) - set(heads):
+                lines.append(self._forget(key))
+            for key, head in heads.iteritems():
+                entry = self._keys.get(key)
+                if entry is None or entry[0] != head:
+                    lines.append(self._set(key, head, show(head)))
+            if self._journal == 0 or self._journal > 2 * len(self._keys) + 100:
+                self._compact()
+            elif lines:
+                self._write(lines)
+
+    def _compact(self):
+        """Rewrite the journal with one line per key.  Must be called with
+        the lock held.
+        """
+        lines = [{'path': self.path}]
+        for key, (head, encoded) in sorted(self._keys.iteritems()):
+            if encoded is None:
+                lines.append([key, head])
+            else:
+                lines.append([key, head, self._json.loads(encoded)])
+        directory = os.path.dirname(self._file)
+        if not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError as e:
+                if e.errno != errno.EEXIST:
+                    raise
+        fd, tmp = tempfile.mkstemp(dir=directory)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(''.join(self._json.dumps(line) + '\n' for line in lines))
+        os.rename(tmp, self._file)
+        self._journal = len(lines)
+
+    def destroy(self):
+        """Delete the journal.
+        """
+        with self._lock:
+            try:
+                os.remove(self._file)
+            except OSError as e:
+                if e.errno != errno.ENOENT:
+                    raise
+            self._keys.clear()
+            self._terms.clear()
+            self._journal = 0
+            self._cleared()
+
+    def _cleared(self):
+        """Hook for subclasses, called once every key is forgotten.
+        """
+        pass
+
+    def head(self, key):
+        """The hex id of the head commit a key was indexed at.
+
+        :raises: KeyError if the key is not indexed
+        """
+        with self._lock:
+            return self._keys[key][0]
+
+    def find(self, term):
+        """Find the keys a term was extracted from.
+
+        :param term: the term
+        :type term: anything that runs through :func:`json.dumps`
+
+        :returns: the keys
+        :rtype: set
+        """
+        with self._lock:
+            return set(self._terms.get(self._encode(term), ()))
+
+
+def sort_key(term):
+    """Order terms so that each type of scalar sorts together, or return
+    None for terms that cannot be ordered, such as lists.
+    """
+    if term is None:
+        return (0,)
+    elif isinstance(term, bool):
+        return (1, term)
+    elif isinstance(term, (int, long, float)):
+        return (2, term)
+    elif isinstance(term, basestring):
+        return (3, term)
+    else:
+        return None
+
+
+class Index(View):
+    """A :class:`View` that also keeps its scalar terms in sorted order, so
+    that keys can be found by a range of terms.  Obtain one with
+    :func:`create_index <jsongit.models.Repository.create_index>`.
+    """
+
+    def __init__(self, name, directory, path=None, func=None):
+        super(Index, self).__init__(name, directory, path=path, func=func)
+        # (sort key, key) pairs in order, and their sort keys alone, which
+        # are searched for the bounds of a range.
+        self._sorted = []
+        self._order = []
+
+    def _added(self, key, head, encoded):
+        order = sort_key(self._json.loads(encoded))
+        if order is not None:
+            i = bisect.bisect_left(self._sorted, (order, key))
+            self._sorted.insert(i, (order, key))
+            self._order.insert(i, order)
+
+    def _removed(self, key, encoded):
+        order = sort_key(self._json.loads(encoded))
+        if order is not None:
+            i = bisect.bisect_left(self._sorted, (order, key))
+            if i < len(self._sorted) and self._sorted[i] == (order, key):
+                del self._sorted[i]
+                del self._order[i]
+
+    def _cleared(self):
+        del self._sorted[:]
+        del self._order[:]
+
+    def range(self, low=None, high=None):
+        """Find the keys whose terms are between low and high, inclusive.
+        Only terms of the same type as the bounds are found, so numbers are
+        not mixed with strings.
+
+        >>> index.range(low=18, high=65)
+        ['jon', 'mary']
+
+        :param low: (optional) the lowest term.  Defaults to no limit.
+        :param high: (optional) the highest term.  Defaults to no limit.
+
+        :returns: the keys, ordered by their terms
+        :rtype: list
+        :raises: TypeError if neither bound is given, or they are not scalars
+            of the same type
+        """
+        bounds = [sort_key(b) for b in (low, high) if b is not None]
+        if not bounds or None in bounds or \
+                len(set(b[0] for b in bounds)) != 1:
+            raise TypeError("Range must be between scalars of the same type")
+        rank = bounds[0][0]
+        with self._lock:
+            start = bisect.bisect_left(self._order, (rank,) if low is None
+                                       else sort_key(low))
+            end = bisect.bisect_left(self._order, (rank + 1,)) if high is None \
+                else bisect.bisect_right(self._order, sort_key(high))
+            return [key for order, key in self._sorted[start:end]]
+
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+
+"""
+jsongit.watch
+
+A feed of changes to keys, so consumers need not poll every key's head.
+"""
+
+import collections
+import os
+import threading
+import time
+
+
+#: A change to a key.  `old` is None if the key was created, and `new` is None
+#: if it was removed.
+Event = collections.namedtuple('Event', ['key', 'old', 'new'])
+
+# Directory timestamps this close to now may be updated again without
+# changing, so they are not trusted to show that nothing changed.
+_RACY = 2
+
+
+class Watcher(object):
+    """An iterator of :class:`Event` for keys under a prefix, blocking until
+    each change happens.  Obtain one with :func:`watch
+    <jsongit.models.Repository.watch>`.
+
+    >>> for key, old, new in repo.watch('users/'):
+    ...     print(key)
+
+    Commits and removals made through the same repository are delivered
+    directly.  Changes made by other processes are found by watching the
+    reference files, with inotify if :mod:`pyinotify` is installed, or by
+    checking their directories' modification times otherwise.
+
+    Events wait in a buffer until they are read.  If it fills up, the oldest
+    are discarded, and counted in :attr:`dropped`.
+    """
+
+    def __init__(self, repo, prefix=None, poll=1.0, maxlen=10000):
+        self._repo = repo
+        self._prefix = prefix or ''
+        self._events = collections.deque(maxlen=maxlen)
+        self._cond = threading.Condition()
+        self._closed = False
+        self._stopped = threading.Event()
+        self._heads = repo._heads(self._prefix)
+        self._stamps = None
+        #: How many events were discarded because the buffer was full.
+        self.dropped = 0
+        if poll is None:
+            self._thread = None
+        else:
+            self._stamps = self._scan_stamps()
+            self._thread = threading.Thread(target=self._run, args=(poll,),
+                                            name='jsongit-watch')
+            self._thread.daemon = True
+            self._thread.start()
+
+    def __iter__(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+    def next(self):
+        event = self.get()
+        if event is None:
+            raise StopIteration
+        return event
+
+    def _matches(self, key):
+        return key.startswith(self._prefix)
+
+    def _push(self, key, old, new):
+        """Record a change, unless it is already known.  Must be called with
+        the condition held.
+        """
+        if self._heads.get(key) == new:
+            return
+        if new is None:
+            self._heads.pop(key, None)
+        else:
+            self._heads[key] = new
+        if len(self._events) == self._events.maxlen:
+            self.dropped += 1
+        self._events.append(Event(key, old, new))
+        self._cond.notify_all()
+
+    def publish(self, key, old, new):
+        """Deliver a change made in this process.  Called by the repository.
+        """
+        if self._matches(key):
+            with self._cond:
+                self._push(key, old, new)
+
+    def _refs_dir(self):
+        return os.path.join(self._repo._repo.path, 'refs', 'heads', 'jsongit')
+
+    def _scan_stamps(self):
+        """Modification times of packed-refs and of every directory holding
+        references, which change whenever a reference in them is written or
+        deleted.
+        """
+        stamps = {}
+        packed = os.path.join(self._repo._repo.path, 'packed-refs')
+        for path in [packed] + [d for d, _, _ in os.walk(self._refs_dir())]:
+            try:
+                stamps[path] = os.stat(path).st_mtime
+            except OSError:
+                pass
+        return stamps
+
+    def rescan(self):
+        """Compare every head under the prefix against those last seen,
+        recording an event for each difference.  Called periodically when
+        watching for changes from other processes; it is only necessary to
+        call it directly if `poll` was None.
+        """
+        with self._cond:
+            heads = self._repo._heads(self._prefix)
+            for key, new in heads.iteritems():
+                old = self._heads.get(key)
+                if old != new:
+                    self._push(key, old, new)
+            for key in set(self._heads) - set(heads):
+                self._push(key, self._heads[key], None)
+
+    def _changed(self):
+        stamps = self._scan_stamps()
+        changed = stamps != self._stamps or any(
+            mtime > time.time() - _RACY for mtime in stamps.itervalues())
+        self._stamps = stamps
+        return changed
+
+    def _run(self, poll):
+        try:
+            import pyinotify
+        except ImportError:
+            pyinotify = None
+        if pyinotify is None:
+            while not self._stopped.wait(poll):
+                if self._changed():
+                    self.rescan()
+        else:
+            self._run_inotify(pyinotify, poll)
+
+    def _run_inotify(self, pyinotify, poll):
+        class Ignore(pyinotify.ProcessEvent):
+            def process_default(self, event):
+                pass
+        manager = pyinotify.WatchManager()
+        mask = (pyinotify.IN_CREATE | pyinotify.IN_DELETE |
+                pyinotify.IN_MOVED_TO | pyinotify.IN_MODIFY)
+        manager.add_watch(self._repo._repo.path, mask)
+        manager.add_watch(os.path.join(self._repo._repo.path, 'refs'), mask,
+                          rec=True, auto_add=True)
+        notifier = pyinotify.Notifier(manager, Ignore(),
+                                      timeout=int(poll * 1000))
+        try:
+            while not self._stopped.is_set():
+                if notifier.check_events():
+                    notifier.read_events()
+                    notifier.process_events()
+                    self.rescan()
+        finally:
+            notifier.stop()
+
+    def get(self, timeout=None):
+        """Wait for the next event.
+
+        :param timeout:
+            (optional) How long to wait, in seconds.  Defaults to waiting
+            until there is an event or the watcher is closed.
+        :type timeout: number
+
+        :returns: the event, or None if there was none in time
+        :rtype: :class:`Event`
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while not self._events and not self._closed:
+                if deadline is None:
+                    # waiting without a timeout cannot be interrupted in
+                    # Python 2
+                    self._cond.wait(1)
+                else:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            if self._events:
+                return self._events.popleft()
+            return None
+
+    def close(self):
+        """Stop watching.  Iteration ends once buffered events are read.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._stopped.set()
+        self._repo._unwatch(self)
+        if self._thread is not None and \
+                self._thread is not threading.current_thread():
+            self._thread.join()
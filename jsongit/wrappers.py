@@ -6,15 +6,21 @@ jsongit.wrappers
 These classes provide limited interfaces to pygit2 and json_diff constructs.
 """
 
-import json_diff
+import pygit2
 import itertools
-import copy
+import binascii
+import collections
+import threading
+
+from .paths import MISSING
 
 class Commit(object):
     """A wrapper around :class:`pygit2.Commit` linking to a single key in the
     repo.
     """
 
+    __slots__ = ('_commit', '_repo', '_key', '_data')
+
     def __init__(self, repo, key, data, pygit2_commit):
         self._commit = pygit2_commit
         self._repo = repo
@@ -24,6 +30,9 @@ class Commit(object):
     def __eq__(self, other):
         return self.oid == other.oid
 
+    def __ne__(self, other):
+        return not self == other
+
     def __str__(self):
         return "'%s'='%s'@%s" % (self.key, self.data, self.hex[0:10])
 
@@ -38,6 +47,10 @@ class Commit(object):
         :returns: the data associated with this commit.
         :rtype: Boolean, Number, None, String, Dict, or List
         """
+        if self._data is MISSING:
+            # not decoded until it is needed
+            self._data = self._repo._value(
+                self._repo._navigate_tree(self._commit.tree.oid, self._key))
         return self._data
 
     @property
@@ -105,12 +118,129 @@ class Commit(object):
         return self._repo
 
 
+#: A name and email pair, shared between :class:`CommitInfo` instances.
+Person = collections.namedtuple('Person', ['name', 'email'])
+
+_people = {}
+_people_lock = threading.Lock()
+
+def person(signature):
+    """Obtain the shared :class:`Person` for a :class:`pygit2.Signature`.
+    """
+    ident = (signature.name, signature.email)
+    try:
+        return _people[ident]
+    except KeyError:
+        with _people_lock:
+            return _people.setdefault(ident, Person(*ident))
+
+
+class CommitInfo(object):
+    """A compact record of a commit, yielded by :func:`log
+    <jsongit.models.Repository.log>` when `info` is True.  Unlike
+    :class:`Commit`, it does not hold on to the underlying
+    :class:`pygit2.Commit` or its decoded data, so long histories can be
+    kept in memory cheaply.
+    """
+
+    __slots__ = ('_repo', '_raw', '_time', '_offset', '_author', '_committer')
+
+    def __init__(self, repo, pygit2_commit):
+        self._repo = repo
+        self._raw = pygit2_commit.oid.raw
+        self._time = pygit2_commit.commit_time
+        self._offset = pygit2_commit.commit_time_offset
+        self._author = person(pygit2_commit.author)
+        self._committer = person(pygit2_commit.committer)
+
+    def __eq__(self, other):
+        return self.oid == other.oid
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __str__(self):
+        return self.hex[0:10]
+
+    def __repr__(self):
+        return "%s(%s,time=%s,author=%s)" % (type(self).__name__,
+                                             self.__str__(), self.time,
+                                             self.author)
+
+    @property
+    def oid(self):
+        """
+        :returns: The unique 20-byte ID of this commit.
+        :rtype: :class:`pygit2.Oid`
+        """
+        return pygit2.Oid(raw=self._raw)
+
+    @property
+    def hex(self):
+        """
+        :returns: The unique 40-character hex representation of this commit's ID.
+        :rtype: string
+        """
+        return binascii.hexlify(self._raw)
+
+    @property
+    def author(self):
+        """
+        :returns: The author of this commit.
+        :rtype: :class:`Person`
+        """
+        return self._author
+
+    @property
+    def committer(self):
+        """
+        :returns: The committer of this commit.
+        :rtype: :class:`Person`
+        """
+        return self._committer
+
+    @property
+    def time(self):
+        """
+        :returns: The time of this commit.
+        :rtype: long
+        """
+        return self._time
+
+    @property
+    def offset(self):
+        """
+        :returns: The timezone offset of this commit, in minutes.
+        :rtype: int
+        """
+        return self._offset
+
+    @property
+    def repo(self):
+        """
+        :returns: The repository of this commit.
+        :rtype: :class:`Repository <jsongit.models.Repository>`
+        """
+        return self._repo
+
+    def commit(self):
+        """Load the full :class:`Commit`, including its key and data.
+
+        :rtype: :class:`Commit`
+        """
+        return self._repo._build_commit(self._repo._repo[self.oid])
+
+
 class DiffWrapper(object):
     """An internal wrapper for :mod:`json_diff`.
     """
 
-    def __init__(self, diff):
-        if Diff.is_json_diff(diff):
+    __slots__ = ('_diff', '_replace', '_replaces')
+
+    def __init__(self, diff, replaces=None):
+        if replaces is None:
+            replaces = diff is not None and not Diff.is_json_diff(diff)
+        if not replaces and Diff.is_json_diff(diff):
             # wrap recursive updates
             if Diff.UPDATE in diff:
                 update = diff[Diff.UPDATE]
@@ -122,6 +252,8 @@ class DiffWrapper(object):
             diff = {} if diff is None else diff
 
         self._diff = diff
+        # Whether the diff replaces wholesale, even with a falsy value.
+        self._replaces = replaces
 
     def __str__(self):
         return self._diff.__str__()
@@ -159,36 +291,93 @@ class DiffWrapper(object):
         """
         return self._replace
 
-    def apply(self, original):
+    @property
+    def _empty(self):
+        return not self._replaces and not self._diff
+
+    def apply(self, original, in_place=False):
         """Return an object modified with the changes in this diff.
 
+        Parts of original that the diff does not change are shared with the
+        result rather than copied, so only what changes costs anything.
+        Modifying one may therefore modify the other.
+
         :param original: the object to apply the diff to.
         :type original: list, dict, number, or string
+        :param in_place:
+            (optional) Whether to modify original itself, rather than the
+            levels of it that change being copied.  Defaults to False.
+        :type in_place: boolean
 
         :returns: the modified object
         :rtype: list, dict, number, or string
         """
-        if self.replace:
-            return self.replace
+        if self._replaces:
+            return self._replace
+        elif not self._diff:
+            return original
+        elif isinstance(original, list):
+            return self._apply_list(original, in_place)
+        obj = original if in_place else dict(original)
+        for k in self.remove or ():
+            del obj[k]
+        for k, v in (self.update or {}).iteritems():
+            # Recursive application
+            obj[k] = v.apply(obj[k], in_place)
+        obj.update(self.append or ())
+        return obj
+
+    def _apply_list(self, original, in_place):
+        """Apply the diff to a list, rebuilding it at most once however many
+        items change.  Removed and updated indexes refer to original, and
+        appended indexes to the result.
+        """
+        remove = dict((int(k), v) for k, v in (self.remove or {}).iteritems())
+        update = dict((int(k), v) for k, v in (self.update or {}).iteritems())
+        append = dict((int(k), v) for k, v in (self.append or {}).iteritems())
+        if remove:
+            kept = [item for i, item in enumerate(original) if i not in remove]
+            kept_index = [i for i in xrange(len(original)) if i not in remove]
         else:
-            obj = copy.copy(original)
-            for k, v in (self.remove or {}).iteritems():
-                obj.pop(k)
-            for k, v in (self.update or {}).iteritems():
-                # Recursive application
-                obj[k] = v.apply(obj[k])
-            for k, v in (self.append or {}).iteritems():
-                if hasattr(obj, 'insert'):
-                    obj.insert(k, v)
-                else:
-                    obj[k] = v
-            return obj
+            kept = original if in_place else list(original)
+            kept_index = None
+        if update:
+            if kept_index is None:
+                for k, v in update.iteritems():
+                    kept[k] = v.apply(kept[k], in_place)
+            else:
+                for j, i in enumerate(kept_index):
+                    if i in update:
+                        kept[j] = update[i].apply(kept[j], in_place)
+        positions = sorted(append)
+        if not positions:
+            result = kept
+        elif positions[0] >= len(kept):
+            # appended to the end, which is all json_diff ever does
+            kept.extend(append[k] for k in positions)
+            result = kept
+        else:
+            result = []
+            start = 0
+            for k in positions:
+                take = k - len(result)
+                if take > 0:
+                    result.extend(kept[start:start + take])
+                    start += take
+                result.append(append[k])
+            result.extend(kept[start:])
+        if in_place and result is not original:
+            original[:] = result
+            return original
+        return result
 
 
 class Diff(DiffWrapper):
     """A class to encapsulate differences between two JSON git objects.
     """
 
+    __slots__ = ()
+
     APPEND = '_append'
     REMOVE = '_remove'
     UPDATE = '_update'
@@ -203,25 +392,38 @@ class Diff(DiffWrapper):
             return False
 
     def __init__(self, obj1, obj2):
-        if isinstance(obj2, obj1.__class__):
+        if obj1 is obj2:
+            # nothing differs from itself
+            super(Diff, self).__init__(None)
+        elif isinstance(obj2, obj1.__class__):
+            # json_diff is slow to import, so wait for the first diff.
+            import json_diff
             c = json_diff.Comparator()
-            c.obj1 = obj1
-            c.obj2 = obj2
+            # json_diff substitutes obj1 and obj2 for any empty dict it
+            # compares, so they must be unset for nested empty dicts to work.
+            del c.obj1
+            del c.obj2
             diff = c._compare_elements(obj1, obj2)
             super(Diff, self).__init__(diff)
         else:
             # if types differ we just replace
-            super(Diff, self).__init__(obj2)
+            super(Diff, self).__init__(obj2, replaces=True)
 
 
 class Conflict(object):
     """A class wrapper for the conflict between two diffs.
     """
 
+    __slots__ = ('_conflict',)
+
     def __init__(self, diff1, diff2):
         self._conflict = {}
-        if diff1.replace or diff2.replace:
-            if diff1.replace != diff2.replace:
+        if diff1._replaces or diff2._replaces:
+            # replacing conflicts with any other change, unless both
+            # replace with the same thing
+            if not (diff1._empty or diff2._empty or
+                    (diff1._replaces and diff2._replaces and
+                     diff1.replace == diff2.replace)):
                 self._conflict = {'replace': (diff1.replace, diff2.replace)}
         else:
             for verb1, verb2 in itertools.product(['append', 'update', 'remove'],
@@ -279,6 +481,9 @@ class Merge(object):
     """A class wrapper for the results of a merge operation.
     """
 
+    __slots__ = ('_success', '_message', '_original', '_merged', '_conflict',
+                 '_result')
+
     def __init__(self, success, original, merged, message, result=None,
                  conflict=None):
         self._success = success
@@ -16,7 +16,7 @@ except ImportError:
 
 execfile('jsongit/version.py')
 
-packages = ['jsongit']
+packages = ['jsongit', 'jsongit.bench']
 
 setup(
     name='jsongit',
@@ -0,0 +1,81 @@
+import helpers
+
+
+class TestBlame(helpers.RepoTestCase):
+
+    def setUp(self):
+        super(TestBlame, self).setUp()
+        self.repo.commit('jon', {'name': 'Jon', 'limits': {'max_conn': 10}})
+        self.repo.commit('jon', {'name': 'Jon', 'limits': {'max_conn': 20},
+                                 'tags': ['a']})
+
+    def test_blame(self):
+        """Maps every path to the commit that last changed it.
+        """
+        head = self.repo.head('jon')
+        first = self.repo.head('jon', back=1)
+        self.assertEqual({'name': first, 'limits.max_conn': head,
+                          'tags[0]': head}, self.repo.blame('jon'))
+
+    def test_blame_path(self):
+        """Blames only the path asked for.
+        """
+        self.assertEqual({'limits': self.repo.head('jon')},
+                         self.repo.blame('jon', path='limits'))
+        self.assertRaises(KeyError, self.repo.blame, 'jon', path='nothing')
+        self.assertRaises(KeyError, self.repo.blame, 'nobody')
+
+    def test_unchanged_commits(self):
+        """Commits that did not change a path are passed over.
+        """
+        head = self.repo.head('jon')
+        self.repo.commit('jon', self.repo.show('jon'))
+        self.repo.commit('jon', {'name': 'Jon', 'limits': {'max_conn': 20},
+                                 'tags': ['a'], 'age': 30})
+        blame = self.repo.blame('jon')
+        self.assertEqual(head, blame['limits.max_conn'])
+        self.assertEqual(self.repo.head('jon'), blame['age'])
+
+    def test_changed_back(self):
+        """A path changed back to an earlier value was last changed then.
+        """
+        self.repo.commit('jon', {'name': 'Jon', 'limits': {'max_conn': 10}})
+        self.assertEqual(self.repo.head('jon'),
+                         self.repo.blame('jon')['limits.max_conn'])
+
+    def test_scalar(self):
+        """A value that is not a dict or list is blamed as a whole.
+        """
+        self.repo.commit('president', 'washington')
+        self.repo.commit('president', 'washington')
+        self.assertEqual({'': self.repo.head('president', back=1)},
+                         self.repo.blame('president'))
+
+    def test_after_more_commits(self):
+        """Blaming again after new commits gives the same as blaming afresh.
+        """
+        self.repo.blame('jon')
+        first = self.repo.head('jon', back=1)
+        self.repo.commit('jon', {'name': 'Jon', 'limits': {'max_conn': 20},
+                                 'tags': ['b']})
+        blame = self.repo.blame('jon')
+        self.assertEqual(first, blame['name'])
+        self.assertEqual(self.repo.head('jon', back=1),
+                         blame['limits.max_conn'])
+        self.assertEqual(self.repo.head('jon'), blame['tags[0]'])
+
+    def test_data(self):
+        """Blamed commits read their data when it is asked for.
+        """
+        commit = self.repo.blame('jon', path='name')['name']
+        self.assertEqual({'name': 'Jon', 'limits': {'max_conn': 10}},
+                         commit.data)
+
+    def test_nested_key(self):
+        """Keys in directories are blamed too.
+        """
+        self.repo.commit('users/jon', {'a': 1, 'b': 1})
+        self.repo.commit('users/jon', {'a': 1, 'b': 2})
+        self.assertEqual({'a': self.repo.head('users/jon', back=1),
+                          'b': self.repo.head('users/jon')},
+                         self.repo.blame('users/jon'))
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from jsongit.models import Diff, Conflict
+from jsongit.wrappers import DiffWrapper
 import helpers
 import itertools
 
@@ -135,6 +136,63 @@ class DiffTest(helpers.unittest.TestCase):
         self.assertEquals({'violets': 'blue'}, diff.update['flowers'].remove)
         self.assertEquals(b, diff.apply(a))
 
+    def test_diff_falsy_replace(self):
+        """Replacing with a falsy value still replaces.
+        """
+        for a, b in ((7, 0), ('foo', ''), (True, False), ([1], None),
+                     ({'a': 1}, None)):
+            diff = Diff(a, b)
+            self.assertEquals(b, diff.replace)
+            self.assertEquals(b, diff.apply(a))
+
+    def test_diff_array_large(self):
+        """Many appends and removals in a list apply in one pass.
+        """
+        a = range(1000)
+        b = range(1500)
+        self.assertEquals(b, Diff(a, b).apply(a))
+        self.assertEquals(a, Diff(b, a).apply(b))
+
+    def test_apply_array_indexes(self):
+        """Removed and updated indexes refer to the original list, appended
+        indexes to the result.
+        """
+        diff = DiffWrapper({'_remove': {0: 'a', 2: 'c'},
+                            '_update': {'3': 'D'},
+                            '_append': {0: 'x', 5: 'y'}})
+        self.assertEquals(['x', 'b', 'D', 'e', 'y'],
+                          diff.apply(['a', 'b', 'c', 'd', 'e']))
+
+    def test_apply_shares_unchanged(self):
+        """Unchanged parts are shared, and the original is left alone.
+        """
+        a = {'same': {'x': [1]}, 'changed': {'y': 1}}
+        b = {'same': {'x': [1]}, 'changed': {'y': 2}}
+        result = Diff(a, b).apply(a)
+        self.assertEquals(b, result)
+        self.assertIs(a['same'], result['same'])
+        self.assertEquals({'y': 1}, a['changed'])
+
+    def test_apply_in_place(self):
+        """In place, the original itself is changed.
+        """
+        a = {'list': [1, 2, {'z': 1}], 'dict': {'y': 1}}
+        b = {'list': [1, 3, {'z': 2}, 4], 'dict': {'y': 2}}
+        diff = Diff(a, b)
+        inner = a['list']
+        result = diff.apply(a, in_place=True)
+        self.assertIs(a, result)
+        self.assertIs(inner, result['list'])
+        self.assertEquals(b, a)
+
+    def test_diff_replace_conflicts_with_change(self):
+        """Replacing conflicts with any other change, but not with none.
+        """
+        a = {'roses': 'red'}
+        self.assertTrue(Conflict(Diff(a, None), Diff(a, {'roses': 'blue'})))
+        self.assertFalse(Conflict(Diff(a, None), Diff(a, a)))
+        self.assertFalse(Conflict(Diff(a, 0), Diff(a, 0)))
+
     def xtest_diff_scalar_replace_no_conflict(self):
         a = 'foo'
         b = 'bar'
@@ -222,3 +280,56 @@ class DiffTest(helpers.unittest.TestCase):
         self.assertEquals({'violets': ('magenta', None)}, conflict.update)
         self.assertEquals({'violets': (None, 'blue')}, conflict.remove)
 
+    def test_diff_nested_empty_dict(self):
+        """Empty dicts nested in documents can be diffed.
+        """
+        a = {'roses': {}, 'violets': 'blue', 'lilacs': {}}
+        b = {'roses': {'color': 'red'}, 'violets': 'blue', 'lilacs': {}}
+        diff = Diff(a, b)
+        self.assertEquals(b, diff.apply(a))
+        self.assertEquals(a, Diff(b, a).apply(b))
+
+
+class RepositoryDiffTest(helpers.RepoTestCase):
+
+    def setUp(self):
+        super(RepositoryDiffTest, self).setUp()
+        self.repo.commit('jon', {'status': 'active'})
+        self.repo.commit('jon', {'status': 'retired'})
+        self.repo.commit('mary', {'status': 'active'})
+
+    def test_keys_and_back(self):
+        """Diffs heads, or steps back from them.
+        """
+        diff = self.repo.diff('jon', 'jon', back_a=1)
+        self.assertEquals({'status': 'retired'}, diff.update)
+        self.assertEquals({'status': 'active'},
+                          self.repo.diff('jon', 'mary').apply(
+                              self.repo.show('jon')))
+
+    def test_commits(self):
+        """Commits can be diffed, including from a log.
+        """
+        head, parent = list(self.repo.log('jon'))
+        self.assertEquals({'status': 'retired'},
+                          self.repo.diff(parent, head).update)
+        self.assertEquals({'status': 'retired'},
+                          self.repo.diff(head, head, back_a=1).update)
+        self.assertRaises(IndexError, self.repo.diff, head, head, back_a=2)
+        self.assertRaises(KeyError, self.repo.diff, 'nobody', 'jon')
+
+    def test_same_blob(self):
+        """Identical values have no differences.
+        """
+        diff = self.repo.diff('jon', 'mary', back_a=1)
+        self.assertIsNone(diff.replace)
+        self.assertIsNone(diff.update)
+        self.assertIsNone(diff.append)
+        self.assertIsNone(diff.remove)
+
+    def test_cached(self):
+        """The same pair of values is only diffed once.
+        """
+        diff = self.repo.diff('jon', 'jon', back_a=1)
+        self.assertIs(diff, self.repo.diff('mary', 'jon'))
+        self.assertIsNot(diff, self.repo.diff('jon', 'mary'))
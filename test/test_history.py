@@ -0,0 +1,121 @@
+import os
+
+import jsongit
+import helpers
+
+
+def at(time):
+    return jsongit.utils.signature('sally', 's@s.com', time=time)
+
+
+class TestShowAt(helpers.RepoTestCase):
+
+    def commit_presidents(self):
+        self.repo.commit('president', 'washington', author=at(1000))
+        self.repo.commit('president', 'adams', author=at(2000))
+        self.repo.commit('president', 'jefferson', author=at(3000))
+
+    def test_show_at_exact_time(self):
+        """A commit made at exactly that time is shown.
+        """
+        self.commit_presidents()
+        self.assertEqual('adams', self.repo.show('president', at=2000))
+
+    def test_show_at_between(self):
+        """The newest commit before the time is shown.
+        """
+        self.commit_presidents()
+        self.assertEqual('washington', self.repo.show('president', at=1999))
+        self.assertEqual('jefferson', self.repo.show('president', at=5000))
+
+    def test_show_at_and_back(self):
+        """Steps back are counted from the commit at the time.
+        """
+        self.commit_presidents()
+        self.assertEqual('washington',
+                         self.repo.show('president', back=1, at=2500))
+
+    def test_head_at(self):
+        """Head can be looked up at a time.
+        """
+        self.commit_presidents()
+        commit = self.repo.head('president', at=2000)
+        self.assertEqual(self.repo.head('president', back=1), commit)
+
+    def test_show_at_too_early(self):
+        """IndexError if there were no commits by the time.
+        """
+        self.commit_presidents()
+        with self.assertRaises(IndexError):
+            self.repo.show('president', at=999)
+
+    def test_show_at_nonexistent(self):
+        """KeyError if there is no key.
+        """
+        with self.assertRaises(KeyError):
+            self.repo.show('president', at=1000)
+
+    def test_show_at_skewed_clock(self):
+        """A commit with an earlier time than its parent hides the parent.
+        """
+        self.repo.commit('president', 'washington', author=at(1000))
+        self.repo.commit('president', 'adams', author=at(3000))
+        self.repo.commit('president', 'jefferson', author=at(2000))
+        self.assertEqual('jefferson', self.repo.show('president', at=2500))
+        self.assertEqual('jefferson', self.repo.show('president', at=3500))
+
+    def test_show_at_and_back_skewed_clock(self):
+        """Steps back from a time follow parents, whatever their times.
+        """
+        self.repo.commit('president', 'washington', author=at(1000))
+        self.repo.commit('president', 'adams', author=at(3000))
+        self.repo.commit('president', 'jefferson', author=at(2000))
+        self.repo.commit('president', 'madison', author=at(4000))
+        self.assertEqual('adams',
+                         self.repo.show('president', back=1, at=2500))
+        self.assertEqual('washington',
+                         self.repo.head('president', back=2, at=2500).data)
+
+
+class TestShowAtIndexed(TestShowAt):
+
+    def setUp(self):
+        if os.path.lexists(helpers.PATH):
+            self.fail("Can't use %s for test repo, something is there." %
+                      helpers.PATH)
+        self.repo = jsongit.init(path=helpers.PATH, history_index=True)
+
+    def index_path(self, key):
+        return os.path.join(self.repo._repo.path, 'jsongit', 'history',
+                            key + '.idx')
+
+    def test_index_built_on_demand(self):
+        """The index is written by the first lookup, and extended by commits.
+        """
+        self.commit_presidents()
+        self.assertFalse(os.path.exists(self.index_path('president')))
+        self.repo.show('president', at=2000)
+        size = os.path.getsize(self.index_path('president'))
+        self.repo.commit('president', 'madison', author=at(4000))
+        self.assertGreater(os.path.getsize(self.index_path('president')), size)
+        self.assertEqual('madison', self.repo.show('president', at=4000))
+        self.assertEqual('jefferson', self.repo.show('president', at=3999))
+
+    def test_stale_index_rebuilt(self):
+        """An index that does not match the head is rebuilt.
+        """
+        self.commit_presidents()
+        self.repo.show('president', at=2000)
+        self.repo.checkout('president', 'vice')
+        self.repo.commit('vice', 'burr', author=at(4000))
+        self.repo.checkout('vice', 'president')
+        self.assertEqual('burr', self.repo.show('president', at=4000))
+        self.assertEqual('jefferson', self.repo.show('president', at=3000))
+
+    def test_remove_discards_index(self):
+        """Removing a key removes its index.
+        """
+        self.commit_presidents()
+        self.repo.show('president', at=2000)
+        self.repo.remove('president')
+        self.assertFalse(os.path.exists(self.index_path('president')))
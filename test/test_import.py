@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+
+import jsongit
+import helpers
+
+
+def run(code):
+    path = os.path.dirname(os.path.dirname(os.path.abspath(jsongit.__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+        [path, os.environ.get('PYTHONPATH', '')]))
+    return subprocess.check_output([sys.executable, '-c', code], env=env)
+
+
+class TestLazyImport(helpers.unittest.TestCase):
+
+    def test_import_is_lazy(self):
+        """Importing jsongit does not import pygit2 or json_diff.
+        """
+        out = run("import sys, jsongit; "
+                  "print('%s %s' % ('pygit2' in sys.modules, "
+                  "'json_diff' in sys.modules))")
+        self.assertEqual('False False', out.strip())
+
+    def test_json_diff_waits_for_diff(self):
+        """json_diff is imported by the first diff.
+        """
+        out = run("import sys, jsongit.wrappers; "
+                  "before = 'json_diff' in sys.modules; "
+                  "jsongit.wrappers.Diff({'a': 1}, {'a': 2}); "
+                  "print('%s %s' % (before, 'json_diff' in sys.modules))")
+        self.assertEqual('False True', out.strip())
+
+    def test_attributes(self):
+        """Functions and submodules are loaded when first used.
+        """
+        self.assertTrue(callable(jsongit.init))
+        self.assertTrue(callable(jsongit.signature))
+        self.assertEqual('jsongit.tracing', jsongit.tracing.__name__)
+        self.assertIn('init', dir(jsongit))
+        self.assertRaises(AttributeError, getattr, jsongit, 'nothing')
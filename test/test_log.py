@@ -87,7 +87,8 @@ class TestLog(RepoTestCase):
         merge = self.repo.merge('bar', 'foo')
         self.assertTrue(merge.success)
 
-        gen = self.repo.log('bar')
+        # the default order reaches bar's own commit before foo's
+        gen = self.repo.log('bar', order=jsongit.GIT_SORT_TOPOLOGICAL)
 
         self.assertEquals({'roses': 'red', 'violets':'blue', 'lilacs':'purple'},
                           gen.next().data)
@@ -101,3 +102,47 @@ class TestLog(RepoTestCase):
         with self.assertRaises(StopIteration):
             gen.next()
 
+    def test_first_parent_log(self):
+        """Can leave the history of merged keys out of the log.
+        """
+        self.repo.commit('foo', {'roses': 'red'})
+        self.repo.checkout('foo', 'bar')
+        self.repo.commit('foo', {'roses': 'red', 'violets': 'blue'})
+        self.repo.commit('bar', {'roses': 'red', 'lilacs': 'purple'})
+        self.assertTrue(self.repo.merge('bar', 'foo').success)
+
+        log = self.repo.log('bar', first_parent=True)
+
+        self.assertEquals([{'roses': 'red', 'violets':'blue', 'lilacs':'purple'},
+                           {'roses': 'red', 'lilacs':'purple'},
+                           {'roses': 'red'},
+                           {'roses': 'red'}], [c.data for c in log])
+
+
+    def test_info_log(self):
+        """Can log compact commit records instead of full commits.
+        """
+        bob = jsongit.utils.signature('bob', 'bob@bob.com')
+        self.repo.commit('foo', 'step 1', author=bob)
+        self.repo.commit('foo', 'step 2', author=bob)
+
+        full = list(self.repo.log('foo'))
+        info = list(self.repo.log('foo', info=True))
+
+        self.assertEquals([c.oid for c in full], [i.oid for i in info])
+        self.assertFalse(info[0] != list(self.repo.log('foo', info=True))[0])
+        self.assertFalse(full[0] != self.repo.head('foo'))
+        self.assertEquals([c.hex for c in full], [i.hex for i in info])
+        self.assertEquals([c.time for c in full], [i.time for i in info])
+        self.assertEquals('bob', info[0].author.name)
+        self.assertEquals('bob@bob.com', info[0].author.email)
+        self.assertIs(info[0].author, info[1].author)
+        self.assertEquals('step 1', info[1].commit().data)
+
+    def test_wrappers_have_no_dict(self):
+        """Commits and info records are slotted.
+        """
+        self.repo.commit('foo', 'bar')
+        self.assertFalse(hasattr(self.repo.head('foo'), '__dict__'))
+        self.assertFalse(hasattr(self.repo.log('foo', info=True).next(),
+                                 '__dict__'))
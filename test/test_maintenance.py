@@ -0,0 +1,228 @@
+import logging
+import logging.handlers
+import os
+import time
+
+import pygit2
+
+import jsongit
+from helpers import RepoTestCase
+
+
+class TestMaintenance(RepoTestCase):
+
+    def test_commit_creates_loose_objects(self):
+        """Every commit leaves loose objects behind.
+        """
+        before = self.repo.loose_objects()
+        self.repo.commit('foo', 'bar')
+        self.assertGreater(self.repo.loose_objects(), before)
+
+    def test_maintain_packs_objects(self):
+        """Maintenance packs away loose objects without losing data.
+        """
+        self.repo.commit('foo', 'bar')
+        self.repo.commit('foo', 'baz')
+        report = self.repo.maintain()
+        self.assertGreater(report['loose_before'], 0)
+        self.assertEqual(0, report['loose_after'])
+        self.assertEqual('baz', self.repo.show('foo'))
+        self.assertEqual('bar', self.repo.show('foo', back=1))
+
+    def test_maintain_packs_refs(self):
+        """Keys remain readable and writable from packed refs.
+        """
+        self.repo.commit('foo', 'bar')
+        self.repo.maintain(repack=False)
+        ref_path = os.path.join(self.repo._repo.path, 'refs', 'heads',
+                                'jsongit', 'foo')
+        self.assertFalse(os.path.exists(ref_path))
+        self.assertTrue(self.repo.committed('foo'))
+        self.repo.commit('foo', 'baz')
+        self.assertEqual('baz', self.repo.show('foo'))
+        self.assertEqual('bar', self.repo.show('foo', back=1))
+
+    def test_maintain_prunes_removed(self):
+        """Pruning deletes the detached commits of removed keys.
+        """
+        # with another key, HEAD's commits are not the same as those of foo
+        self.repo.commit('keep', 'this')
+        self.repo.commit('foo', 'bar')
+        self.repo.commit('foo', 'baz')
+        oids = [c.oid for c in self.repo.log('foo')]
+        self.repo.remove('foo')
+        self.repo.maintain(prune_unreachable=True)
+        # a fresh handle, as the open one may still have them cached
+        repo = pygit2.Repository(self.repo._repo.path)
+        for oid in oids:
+            self.assertNotIn(oid.hex, repo)
+        self.assertEqual('this', self.repo.show('keep'))
+
+    def test_schedule_maintenance(self):
+        """The scheduler maintains the repo once the threshold is crossed.
+        """
+        self.repo.commit('foo', 'bar')
+        scheduler = self.repo.schedule_maintenance(threshold=1, interval=0.01)
+        deadline = time.time() + 30
+        try:
+            while scheduler.last_report is None:
+                if time.time() > deadline:
+                    self.fail("Maintenance never ran: %r" %
+                              scheduler.last_error)
+                scheduler.join(0.01)
+        finally:
+            scheduler.stop()
+        self.assertEqual(0, self.repo.loose_objects())
+
+    def test_schedule_maintenance_failure(self):
+        """A failed maintenance is kept, and the scheduler carries on.
+        """
+        self.repo.commit('foo', 'bar')
+        maintain = self.repo.maintain
+        calls = []
+
+        def failing_maintain(**kwargs):
+            calls.append(kwargs)
+            if len(calls) == 1:
+                raise jsongit.GitCommandError(['repack'], 'disk full')
+            return maintain(**kwargs)
+        self.repo.maintain = failing_maintain
+        logger = logging.getLogger('jsongit.maintenance')
+        handler = logging.handlers.BufferingHandler(10)
+        logger.addHandler(handler)
+        scheduler = self.repo.schedule_maintenance(threshold=1, interval=0.01)
+        deadline = time.time() + 30
+        try:
+            while scheduler.last_report is None:
+                if time.time() > deadline:
+                    self.fail("Maintenance never ran again")
+                scheduler.join(0.01)
+        finally:
+            scheduler.stop()
+            logger.removeHandler(handler)
+            del self.repo.maintain
+        self.assertEqual(1, len(handler.buffer))
+        self.assertIsInstance(scheduler.last_error, jsongit.GitCommandError)
+        self.assertEqual(0, self.repo.loose_objects())
+
+    def test_stats_empty(self):
+        """An empty repository has no values.
+        """
+        stats = self.repo.stats()
+        self.assertEqual(0, stats['keys'])
+        self.assertEqual(0, stats['logical_bytes'])
+
+    def test_stats_dedup(self):
+        """Identical values count once towards unique bytes.
+        """
+        self.repo.commit('foo', 'bar')
+        self.repo.checkout('foo', 'baz')
+        self.repo.commit('foo', 'quux')
+        stats = self.repo.stats()
+        self.assertEqual(2, stats['keys'])
+        self.assertEqual(3, stats['commits'])
+        self.assertEqual(2, stats['blobs'])
+        self.assertEqual(len('"bar"') * 2 + len('"quux"'),
+                         stats['logical_bytes'])
+        self.assertEqual(len('"bar"') + len('"quux"'), stats['unique_bytes'])
+        self.assertAlmostEqual((len('"bar"') * 2 + len('"quux"')) /
+                               float(len('"bar"') + len('"quux"')),
+                               stats['dedup_ratio'])
+
+    def test_stats_measures_blobs(self):
+        """Only the blobs holding values count towards the size on disk.
+        """
+        for i in xrange(20):
+            self.repo.commit('foo', 'bar', message='commit %d' % i)
+        stats = self.repo.stats()
+        blob_id = self.repo.head('foo')._commit.tree[0].oid.hex
+        loose = os.path.join(self.repo._repo.path, 'objects', blob_id[:2],
+                             blob_id[2:])
+        self.assertEqual(1, stats['blobs'])
+        self.assertEqual(os.path.getsize(loose), stats['physical_bytes'])
+
+    def test_maintain_delta_compression(self):
+        """Packing near-identical versions shrinks the repository.
+        """
+        doc = dict(('field%d' % i, 'value %d' % i) for i in xrange(200))
+        for i in xrange(10):
+            doc['counter'] = i
+            self.repo.commit('doc', doc)
+        before = self.repo.stats()
+        self.repo.maintain(window=50, depth=50)
+        after = self.repo.stats()
+        self.assertEqual(before['logical_bytes'], after['logical_bytes'])
+        self.assertLess(after['physical_bytes'], before['physical_bytes'])
+        self.assertGreater(after['compression_ratio'], 2)
+
+    def test_compact_keep_last(self):
+        """Compacting keeps the values and messages of recent commits.
+        """
+        for i in xrange(10):
+            self.repo.commit('foo', i, message='v%d' % i)
+        report = self.repo.compact('foo', keep_last=3)
+        self.assertEqual({'keys': 1, 'commits_before': 10,
+                          'commits_after': 4}, report)
+        log = list(self.repo.log('foo'))
+        self.assertEqual([9, 8, 7, 6], [c.data for c in log])
+        self.assertEqual(['v9', 'v8', 'v7'], [c.message for c in log[:3]])
+        self.assertEqual(9, self.repo.show('foo'))
+        self.assertEqual(7, self.repo.show('foo', back=2))
+        self.repo.commit('foo', 10)
+        self.assertEqual(9, self.repo.show('foo', back=1))
+
+    def test_compact_short_history(self):
+        """Compacting a key with little history leaves it alone.
+        """
+        self.repo.commit('foo', 1)
+        self.repo.commit('foo', 2)
+        oid = self.repo.head('foo').oid
+        report = self.repo.compact('foo', keep_last=1)
+        self.assertEqual(0, report['keys'])
+        self.assertEqual(oid, self.repo.head('foo').oid)
+
+    def test_compact_keep_since(self):
+        """Commits made since the time given are kept.
+        """
+        for i in xrange(5):
+            self.repo.commit('foo', i)
+        self.repo.compact('foo', keep_since=0)
+        self.assertEqual(5, len(list(self.repo.log('foo'))))
+        self.repo.compact('foo', keep_since=time.time() + 60)
+        self.assertEqual([4], [c.data for c in self.repo.log('foo')])
+
+    def test_compact_prefix(self):
+        """A prefix compacts every key under it.
+        """
+        for i in xrange(5):
+            self.repo.commit('users/jon', i)
+            self.repo.commit('users/mary', i)
+            self.repo.commit('other', i)
+        report = self.repo.compact('users/', keep_last=1)
+        self.assertEqual(2, report['keys'])
+        self.assertEqual(2, len(list(self.repo.log('users/jon'))))
+        self.assertEqual(2, len(list(self.repo.log('users/mary'))))
+        self.assertEqual(5, len(list(self.repo.log('other'))))
+
+    def test_compact_requires_policy(self):
+        """Either keep_last or keep_since must be given.
+        """
+        self.repo.commit('foo', 'bar')
+        self.assertRaises(TypeError, self.repo.compact, 'foo')
+
+    def test_maintain_retention(self):
+        """Retention policies compact keys before the repository is packed.
+        """
+        # another key keeps HEAD's commits from matching those of logs/a
+        self.repo.commit('other', 'value')
+        for i in xrange(10):
+            self.repo.commit('logs/a', i)
+        old = self.repo.head('logs/a', back=5).oid
+        report = self.repo.maintain(prune_unreachable=True, retention={
+            'logs/': {'keep_last': 2}})
+        self.assertEqual(1, report['compacted']['logs/']['keys'])
+        self.assertIn('bytes_before', report)
+        self.assertIn('bytes_after', report)
+        # a fresh handle, as the open one may still have the object cached
+        self.assertNotIn(old.hex, pygit2.Repository(self.repo._repo.path))
+        self.assertEqual(9, self.repo.show('logs/a'))
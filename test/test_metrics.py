@@ -0,0 +1,151 @@
+import logging
+import os
+
+import jsongit
+import helpers
+from jsongit import metrics
+
+
+class ListHandler(logging.Handler):
+
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+class MetricsTestCase(helpers.RepoTestCase):
+
+    def setUp(self):
+        if os.path.lexists(helpers.PATH):
+            self.fail("Can't use %s for test repo, something is there." %
+                      helpers.PATH)
+        self.metrics = self.make_metrics()
+        self.repo = jsongit.init(path=helpers.PATH, metrics=self.metrics)
+
+    def make_metrics(self):
+        return metrics.Recorder()
+
+
+class TestRecorder(MetricsTestCase):
+
+    def test_commit_phases(self):
+        """Each phase of a commit is timed.
+        """
+        self.repo.commit('foo', 'bar')
+        timings = self.metrics.timings
+        for name in ('add', 'add.serialize', 'add.blob', 'add.index',
+                     'commit', 'commit.tree', 'commit.head', 'commit.ref'):
+            self.assertEqual(1, timings[name]['count'], name)
+        self.assertEqual(1, self.metrics.counts['commit.keys'])
+
+    def test_commit_ref_per_key(self):
+        """Every key in a commit gets its own ref timing.
+        """
+        self.repo.add('roses', 'red')
+        self.repo.add('violets', 'blue')
+        self.repo.commit()
+        self.assertEqual(2, self.metrics.timings['commit.ref']['count'])
+        self.assertEqual(2, self.metrics.counts['commit.keys'])
+
+    def test_show(self):
+        """Showing a value times the show and its decoding.
+        """
+        self.repo.commit('foo', 'bar')
+        self.metrics.reset()
+        self.repo.show('foo')
+        self.assertEqual(1, self.metrics.timings['show']['count'])
+        self.assertIn('decode', self.metrics.timings)
+
+    def test_log(self):
+        """A log is timed once it has been iterated through.
+        """
+        self.repo.commit('foo', 'bar')
+        self.repo.commit('foo', 'baz')
+        self.metrics.reset()
+        log = self.repo.log('foo')
+        self.assertNotIn('log', self.metrics.timings)
+        self.assertEqual(['baz', 'bar'], [c.data for c in log])
+        self.assertEqual(1, self.metrics.timings['log']['count'])
+
+    def test_merge_phases(self):
+        """Merges time the shared parent search, diffs and conflicts.
+        """
+        self.repo.commit('foo', {'roses': 'red'})
+        self.repo.checkout('foo', 'bar')
+        self.repo.commit('foo', {'roses': 'red', 'violets': 'blue'})
+        self.repo.commit('bar', {'roses': 'red', 'lilacs': 'purple'})
+        self.repo.merge('bar', 'foo')
+        timings = self.metrics.timings
+        for name in ('merge', 'merge.shared_parent', 'merge.diff',
+                     'merge.conflict', 'merge.apply'):
+            self.assertEqual(1, timings[name]['count'], name)
+        self.assertNotIn('diff', timings)
+
+    def test_blame_cached(self):
+        """Blaming again reads only the commits made since.
+        """
+        for i in xrange(5):
+            self.repo.commit('foo', {'a': i, 'b': 'x'})
+        self.repo.blame('foo')
+        self.repo.commit('foo', {'a': 5, 'b': 'x'})
+        first = self.repo.head('foo', back=5)
+        self.metrics.reset()
+        self.assertEqual(first, self.repo.blame('foo')['b'])
+        self.assertEqual(1, self.metrics.counts['blame.cached'])
+        self.assertEqual(2, self.metrics.timings['decode']['count'])
+
+    def test_timings_are_copies(self):
+        """Timings can be read while more are recorded.
+        """
+        self.repo.commit('foo', 'bar')
+        timings = self.metrics.timings
+        self.repo.commit('foo', 'baz')
+        self.assertEqual(1, timings['commit']['count'])
+        self.assertEqual(2, self.metrics.timings['commit']['count'])
+
+
+class TestPrometheusExporter(MetricsTestCase):
+
+    def make_metrics(self):
+        return metrics.PrometheusExporter()
+
+    def test_render(self):
+        """Renders timings and counts in Prometheus text format.
+        """
+        self.assertEqual('', self.metrics.render())
+        self.repo.commit('foo', 'bar')
+        text = self.metrics.render()
+        self.assertIn('# TYPE jsongit_operation_seconds summary\n', text)
+        self.assertIn('jsongit_operation_seconds_count{op="commit.tree"} 1\n',
+                      text)
+        self.assertIn('jsongit_events_total{event="commit.keys"} 1\n', text)
+
+
+class TestLoggingMetrics(MetricsTestCase):
+
+    def make_metrics(self):
+        self.handler = ListHandler()
+        logger = logging.getLogger('jsongit.test_metrics')
+        logger.addHandler(self.handler)
+        logger.setLevel(logging.DEBUG)
+        return metrics.LoggingMetrics(logger)
+
+    def test_logs(self):
+        """Logs each timing.
+        """
+        self.repo.commit('foo', 'bar')
+        self.assertTrue(any(m.startswith('commit.tree took ')
+                            for m in self.handler.messages))
+
+
+class TestNullMetrics(helpers.RepoTestCase):
+
+    def test_default(self):
+        """Repositories discard metrics by default.
+        """
+        self.assertIs(metrics.NULL, self.repo._metrics)
+        self.repo.commit('foo', 'bar')
+        self.assertEqual('bar', self.repo.show('foo'))
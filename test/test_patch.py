@@ -0,0 +1,158 @@
+import threading
+
+import jsongit
+import helpers
+from jsongit import patches
+
+
+class TestApplyPatch(helpers.unittest.TestCase):
+
+    def test_ops(self):
+        """Each operation changes the value as RFC 6902 describes.
+        """
+        value = {'a': [1, 2], 'b': {'c': 'x'}, 'd~/': 0}
+        result = patches.apply_patch(value, [
+            {'op': 'add', 'path': '/a/1', 'value': 9},
+            {'op': 'add', 'path': '/a/-', 'value': 3},
+            {'op': 'remove', 'path': '/a/0'},
+            {'op': 'replace', 'path': '/b/c', 'value': None},
+            {'op': 'copy', 'from': '/b', 'path': '/e'},
+            {'op': 'move', 'from': '/d~0~1', 'path': '/f'},
+            {'op': 'test', 'path': '/f', 'value': 0}])
+        self.assertEqual({'a': [9, 2, 3], 'b': {'c': None}, 'e': {'c': None},
+                          'f': 0}, result)
+
+    def test_whole_value(self):
+        """The empty pointer refers to the whole value.
+        """
+        self.assertEqual([1], patches.apply_patch(
+            {'a': 1}, [{'op': 'replace', 'path': '', 'value': [1]}]))
+
+    def test_errors(self):
+        """Bad operations raise PatchError, which is a ValueError.
+        """
+        for op in ({'op': 'replace', 'path': '/x', 'value': 1},
+                   {'op': 'remove', 'path': '/a/5'},
+                   {'op': 'add', 'path': '/a/01', 'value': 1},
+                   {'op': 'add', 'path': 'a', 'value': 1},
+                   {'op': 'test', 'path': '/a/0', 'value': 2},
+                   {'op': 'move', 'from': '/a', 'path': '/a/0'},
+                   {'op': 'frobnicate', 'path': '/a'},
+                   {'op': 'add', 'path': '/a'}):
+            self.assertRaises(jsongit.PatchError, patches.apply_patch,
+                              {'a': [1]}, [op])
+        self.assertTrue(issubclass(jsongit.PatchError, ValueError))
+
+
+class TestRepositoryPatch(helpers.RepoTestCase):
+
+    def setUp(self):
+        super(TestRepositoryPatch, self).setUp()
+        self.repo.commit('jon', {'status': 'active', 'tags': ['a']})
+
+    def test_patch(self):
+        """Commits the patched value on top of the head.
+        """
+        head = self.repo.head('jon')
+        commit = self.repo.patch('jon', [
+            {'op': 'replace', 'path': '/status', 'value': 'retired'},
+            {'op': 'add', 'path': '/tags/-', 'value': 'b'}])
+        self.assertEqual(commit, self.repo.head('jon'))
+        self.assertEqual({'status': 'retired', 'tags': ['a', 'b']},
+                         self.repo.show('jon'))
+        self.assertEqual(head, self.repo.head('jon', back=1))
+
+    def test_diff(self):
+        """Diffs are accepted as well as JSON Patches.
+        """
+        diff = jsongit.wrappers.Diff({'status': 'active', 'tags': ['a']},
+                                     {'status': 'retired', 'tags': ['a']})
+        self.repo.patch('jon', diff)
+        self.assertEqual({'status': 'retired', 'tags': ['a']},
+                         self.repo.show('jon'))
+
+    def test_failed_patch(self):
+        """Nothing is committed if the patch does not apply.
+        """
+        head = self.repo.head('jon')
+        self.assertRaises(jsongit.PatchError, self.repo.patch, 'jon',
+                          [{'op': 'remove', 'path': '/nothing'}])
+        self.assertEqual(head, self.repo.head('jon'))
+        self.assertRaises(KeyError, self.repo.patch, 'nobody', [])
+
+    def test_expected_oid(self):
+        """Nothing is committed if the head is not the one expected.
+        """
+        head = self.repo.head('jon')
+        self.repo.patch('jon', [{'op': 'add', 'path': '/x', 'value': 1}],
+                        expected_oid=head.hex)
+        self.assertRaises(jsongit.HeadMismatchError, self.repo.patch, 'jon',
+                          [{'op': 'add', 'path': '/y', 'value': 1}],
+                          expected_oid=head.oid)
+        self.assertEqual(1, self.repo.show('jon')['x'])
+        self.assertNotIn('y', self.repo.show('jon'))
+
+    def test_concurrent(self):
+        """Patches from many threads are all kept.
+        """
+        self.repo.commit('count', {'items': []})
+
+        def append(n):
+            for i in xrange(10):
+                self.repo.patch('count', [{'op': 'add', 'path': '/items/-',
+                                           'value': n * 10 + i}])
+        threads = [threading.Thread(target=append, args=(n, ))
+                   for n in xrange(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(range(40), sorted(self.repo.show('count')['items']))
+
+    def test_commit_during_patch(self):
+        """A commit landing between reading and committing is kept.
+        """
+        head = self.repo.head
+        calls = []
+
+        def racing_head(key, *args, **kwargs):
+            result = head(key, *args, **kwargs)
+            if not calls:
+                calls.append(key)
+                self.repo.commit('jon', {'status': 'active',
+                                         'tags': ['a', 'c']})
+            return result
+        self.repo.head = racing_head
+        try:
+            self.repo.patch('jon', [{'op': 'replace', 'path': '/status',
+                                     'value': 'retired'}])
+        finally:
+            del self.repo.head
+        self.assertEqual({'status': 'retired', 'tags': ['a', 'c']},
+                         self.repo.show('jon'))
+        self.assertEqual(3, len(list(self.repo.log('jon'))))
+
+    def test_commits_during_every_attempt(self):
+        """A patch gives up if the head keeps moving.
+        """
+        head = self.repo.head
+        racing = []
+
+        def racing_head(key, *args, **kwargs):
+            result = head(key, *args, **kwargs)
+            if not racing:
+                # commit() reads the head too, so do not race it
+                racing.append(key)
+                self.repo.commit('jon', {'status': 'active', 'tags': ['a']})
+                racing.pop()
+            return result
+        self.repo.head = racing_head
+        try:
+            self.assertRaises(jsongit.HeadMismatchError, self.repo.patch,
+                              'jon', [{'op': 'replace', 'path': '/status',
+                                       'value': 'retired'}])
+        finally:
+            del self.repo.head
+        self.assertEqual('active', self.repo.show('jon')['status'])
+        self.assertEqual(1 + jsongit.models.PATCH_ATTEMPTS,
+                         len(list(self.repo.log('jon'))))
@@ -0,0 +1,120 @@
+import json
+
+import jsongit
+import helpers
+from jsongit import paths, serializers
+
+
+class TestExtractJson(helpers.unittest.TestCase):
+
+    def test_matches_extract(self):
+        """Reads the same as decoding everything and following the path.
+        """
+        doc = {'a': [1, {'b': 2, 'c': [None, True]}], 'd': 'x"y',
+               'e': {}, 'f': []}
+        for indent in (None, 2):
+            raw = json.dumps(doc, indent=indent)
+            for path in ('a', 'a[1].b', 'a[1].c[1]', 'a[2]', 'a[1].z', 'd',
+                         'e', 'e.x', 'f[0]', 'd.x', 'a.b'):
+                steps = paths.parse_path(path)
+                self.assertEqual(paths.extract(doc, steps),
+                                 paths.extract_json(raw, steps, json), path)
+
+    def test_stops_early(self):
+        """Nothing after the value is read.
+        """
+        raw = '{"a": {"b": 1}, "c": this is not json'
+        self.assertEqual(1, paths.extract_json(raw, ('a', 'b'), json))
+
+
+class TestLeaves(helpers.unittest.TestCase):
+
+    def test_leaves(self):
+        """Finds a path to every scalar and empty container.
+        """
+        doc = {'a': [1, {'b': None}], 'c': {}, 'd': []}
+        self.assertEqual([('a[0]', ('a', 0)), ('a[1].b', ('a', 1, 'b')),
+                          ('c', ('c', )), ('d', ('d', ))],
+                         sorted(paths.leaves(doc)))
+        for path, steps in paths.leaves(doc):
+            self.assertEqual(steps, paths.parse_path(path))
+
+    def test_whole_value(self):
+        """A value that is itself a leaf has only the empty path.
+        """
+        self.assertEqual([('', ())], list(paths.leaves('jon')))
+        self.assertEqual([('', ())], list(paths.leaves({})))
+
+    def test_unwritable_names(self):
+        """Dicts with names a path cannot contain are leaves.
+        """
+        doc = {'a': {'b.c': 1}, 'd': [{'[e]': 2}]}
+        self.assertEqual([('a', ('a', )), ('d[0]', ('d', 0))],
+                         sorted(paths.leaves(doc)))
+
+
+class TestShowPath(helpers.RepoTestCase):
+
+    def setUp(self):
+        super(TestShowPath, self).setUp()
+        self.repo.commit('jon', {'user': {'emails': ['jon@q.com']}})
+        self.repo.commit('jon', {'user': {'emails': ['jon@r.com',
+                                                     'jon@q.com']}})
+        self.repo.commit('mary', {'user': {'emails': []}})
+
+    def test_show(self):
+        """Shows only what a path leads to, at any step back.
+        """
+        self.assertEqual('jon@r.com', self.repo.show('jon',
+                                                     path='user.emails[0]'))
+        self.assertEqual('jon@q.com', self.repo.show('jon', back=1,
+                                                     path='user.emails[0]'))
+        self.assertEqual(['jon@q.com'], self.repo.show('jon', back=1,
+                                                       path='user.emails'))
+
+    def test_missing(self):
+        """Paths that lead nowhere raise KeyError.
+        """
+        self.assertRaises(KeyError, self.repo.show, 'mary',
+                          path='user.emails[0]')
+        self.assertRaises(KeyError, self.repo.show, 'nobody', path='user')
+        self.assertRaises(ValueError, self.repo.show, 'jon', path='user..x')
+
+    def test_show_many(self):
+        """Shows several keys at once, with a default for missing ones.
+        """
+        self.assertEqual({'jon': 'jon@r.com', 'mary': None, 'bob': None},
+                         self.repo.show_many(['jon', 'mary', 'bob'],
+                                             path='user.emails[0]',
+                                             default=None))
+        self.assertEqual({'jon': {'user': {'emails': ['jon@q.com']}}},
+                         self.repo.show_many(['jon'], back=1))
+        self.assertRaises(KeyError, self.repo.show_many, ['jon', 'mary'],
+                          path='user.emails[0]')
+
+    def test_codec(self):
+        """Values written with a codec are decoded entirely.
+        """
+        serializers.register('sorted-json',
+                             lambda v: json.dumps(v, sort_keys=True),
+                             json.loads)
+        try:
+            tagged = jsongit.init(repo=self.repo._repo, codec='sorted-json')
+            tagged.commit('bob', {'user': {'emails': ['bob@q.com']}})
+            self.assertEqual('bob@q.com',
+                             self.repo.show('bob', path='user.emails[0]'))
+        finally:
+            serializers.unregister('sorted-json')
+
+    def test_readonly(self):
+        """Read-only repositories read paths whether or not the value is
+        cached.
+        """
+        reader = jsongit.open_readonly(helpers.PATH)
+        self.assertEqual('jon@r.com', reader.show('jon',
+                                                  path='user.emails[0]'))
+        reader.show('jon')
+        self.assertEqual('jon@r.com', reader.show('jon',
+                                                  path='user.emails[0]'))
+        self.assertEqual({'mary': []},
+                         reader.show_many(['mary'], path='user.emails'))
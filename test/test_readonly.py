@@ -0,0 +1,73 @@
+import jsongit
+import helpers
+from jsongit.models import ReadOnlyRepository
+
+
+class TestReadOnly(helpers.RepoTestCase):
+
+    def setUp(self):
+        super(TestReadOnly, self).setUp()
+        self.reader = jsongit.open_readonly(helpers.PATH)
+
+    def test_open(self):
+        """Opens a read-only handle, which has no writing methods.
+        """
+        self.assertIsInstance(self.reader, ReadOnlyRepository)
+        self.assertFalse(hasattr(self.reader, 'commit'))
+        self.assertFalse(hasattr(self.reader, 'add'))
+
+    def test_show(self):
+        """Shows the values committed through a repository.
+        """
+        self.repo.commit('foo', 'bar')
+        self.repo.commit('foo', 'baz')
+        self.assertEqual('baz', self.reader.show('foo'))
+        self.assertEqual('bar', self.reader.show('foo', back=1))
+        self.assertRaises(IndexError, self.reader.show, 'foo', back=2)
+        self.assertRaises(KeyError, self.reader.show, 'nothing')
+
+    def test_sees_new_commits(self):
+        """Cached heads are refreshed when a key is committed again.
+        """
+        self.repo.commit('foo', 'bar')
+        self.assertEqual('bar', self.reader.show('foo'))
+        self.repo.commit('foo', 'baz')
+        self.assertEqual('baz', self.reader.show('foo'))
+
+    def test_sees_removed_keys(self):
+        """Cached heads are dropped when a key is removed.
+        """
+        self.repo.commit('foo', 'bar')
+        self.assertTrue(self.reader.committed('foo'))
+        self.repo.remove('foo')
+        self.assertFalse(self.reader.committed('foo'))
+        self.assertRaises(KeyError, self.reader.show, 'foo')
+
+    def test_sees_packed_refs(self):
+        """Heads are still found after references are packed.
+        """
+        self.repo.commit('foo', 'bar')
+        self.assertEqual('bar', self.reader.show('foo'))
+        self.repo.maintain()
+        self.repo.commit('foo', 'baz')
+        self.repo.maintain()
+        self.assertEqual('baz', self.reader.show('foo'))
+
+    def test_keys_and_log(self):
+        """Lists keys and walks their history.
+        """
+        self.repo.commit('roses', 'red')
+        self.repo.commit('violets', 'blue')
+        self.repo.commit('violets', 'purple')
+        self.assertEqual(['roses', 'violets'], self.reader.keys())
+        self.assertEqual(['purple', 'blue'],
+                         [c.data for c in self.reader.log('violets')])
+        self.assertEqual(self.repo.head('violets'),
+                         self.reader.head('violets'))
+
+    def test_values_cached_by_blob(self):
+        """The same blob is only decoded once.
+        """
+        self.repo.commit('roses', {'color': 'red'})
+        self.repo.commit('tulips', {'color': 'red'})
+        self.assertIs(self.reader.show('roses'), self.reader.show('tulips'))
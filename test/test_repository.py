@@ -148,6 +148,16 @@ class TestJsonGitRepository(helpers.RepoTestCase):
         self.repo.commit('foo', 'step 2')
         self.assertEqual('step 1', self.repo.show('foo', back=1))
 
+    def test_show_skewed_clock(self):
+        """Heads and steps back follow parents, not commit times.
+        """
+        for value, time in (('a', 3000), ('b', 1000), ('c', 2000)):
+            self.repo.commit('p2', value, author=jsongit.utils.signature(
+                'sally', 's@s.com', time=time))
+        self.assertEqual('c', self.repo.show('p2'))
+        self.assertEqual('b', self.repo.show('p2', back=1))
+        self.assertEqual('a', self.repo.show('p2', back=2))
+
     def test_head_back_too_far(self):
         """Should get IndexError if we try to go back too far.
         """
@@ -170,6 +180,33 @@ class TestJsonGitRepository(helpers.RepoTestCase):
         self.repo.checkout('foo', 'bar')
         self.assertEqual({'roses': 'red'}, self.repo.show('bar'))
 
+    def test_checkout_shares_blob(self):
+        """Checkout reuses the source's blob, and keeps history.
+        """
+        self.repo.commit('foo', {'roses': 'red'})
+        self.repo.checkout('foo', 'bar')
+        foo, bar = self.repo.head('foo'), self.repo.head('bar')
+        self.assertEqual(foo._commit.tree[0].oid, bar._commit.tree[0].oid)
+        self.assertEqual(foo, self.repo.head('bar', back=1))
+        self.assertEqual({'roses': 'red'}, self.repo.index('bar'))
+
+    def test_checkout_prefix(self):
+        """Every key under a prefix can be checked out at once.
+        """
+        self.repo.commit('tenant/a/spoon', 'silver')
+        self.repo.commit('tenant/a/fork', 'stainless')
+        self.repo.commit('tenant/ab', 'not under the prefix')
+        self.assertEqual(['tenant/b/fork', 'tenant/b/spoon'],
+                         self.repo.checkout_prefix('tenant/a/', 'tenant/b/'))
+        self.assertEqual('silver', self.repo.show('tenant/b/spoon'))
+        self.assertEqual('stainless', self.repo.show('tenant/b/fork'))
+        self.assertEqual(self.repo.head('tenant/a/fork'),
+                         self.repo.head('tenant/b/fork', back=1))
+        self.assertRaises(KeyError, self.repo.checkout_prefix, 'nothing/',
+                          'tenant/c/')
+        self.assertRaises(jsongit.InvalidKeyError, self.repo.checkout_prefix,
+                          'tenant/a/', '/tenant/c/')
+
     # def test_checkout_old(self):
     #     """Explicitly checkout from an older commit.
     #     """
@@ -249,6 +286,25 @@ class TestJsonGitRepository(helpers.RepoTestCase):
         with self.assertRaises(jsongit.InvalidKeyError):
             self.repo.commit('path/to/key', 'bar')
 
+    def test_nested_key_reads(self):
+        """Values of nested keys are read from inside their directories.
+        """
+        self.repo.commit('path/to', {'a': 1})
+        self.repo.commit('path/to', {'a': 2})
+        self.assertEqual('path/to', self.repo.head('path/to').key)
+        self.assertEqual({'a': 2}, self.repo.head('path/to').data)
+        self.assertEqual(1, self.repo.show('path/to', back=1, path='a'))
+        self.assertEqual({'path/to': {'a': 1}},
+                         self.repo.show_many(['path/to'], back=1))
+        self.assertEqual({u'a': 2},
+                         self.repo.diff('path/to', 'path/to', back_a=1).update)
+        self.repo.add('path/to', {'a': 3})
+        self.repo.reset('path/to')
+        self.assertEqual({'a': 2}, self.repo.index('path/to'))
+        self.assertFalse(self.repo.staged('path/to'))
+        self.assertEqual([('path/to', 'unmodified')], list(self.repo.status()))
+        self.assertEqual({'a': 3}, self.repo.commit('path/to', {'a': 3}).data)
+
     def test_no_absolute(self):
         """Absolute-ish path is forbidden, because it leads to a mismatch
         between tree entries and the commit name.
@@ -361,3 +417,45 @@ class TestJsonGitRepository(helpers.RepoTestCase):
         self.repo.add('foo', 'added')
         self.repo.reset('foo')
         self.assertEquals('committed', self.repo.index('foo'))
+        self.assertFalse(self.repo.staged('foo'))
+
+    def test_status(self):
+        """Status reports every key in the index against its head.
+        """
+        self.repo.commit('huey', 'short')
+        self.repo.commit('louie', 'same')
+        self.repo.add('huey', 'long')
+        self.repo.add('dewey', 'tall')
+        self.assertEquals([('dewey', 'new'), ('huey', 'modified'),
+                           ('louie', 'unmodified')],
+                          list(self.repo.status()))
+        self.repo.add('huey', 'short')
+        self.assertIn(('huey', 'unmodified'), list(self.repo.status()))
+
+    def test_commit_if_changed(self):
+        """Unchanged values are not committed again.
+        """
+        first = self.repo.commit('foo', {'roses': 'red'})
+        self.assertEqual(first, self.repo.commit('foo', {'roses': 'red'},
+                                                 if_changed=True))
+        self.assertEqual(1, len(list(self.repo.log('foo'))))
+        second = self.repo.commit('foo', {'roses': 'white'}, if_changed=True)
+        self.assertEqual(second, self.repo.head('foo'))
+        self.assertEqual(first, self.repo.head('foo', back=1))
+        self.repo.commit('bar', 'new', if_changed=True)
+        self.assertEqual('new', self.repo.show('bar'))
+
+    def test_commit_if_head(self):
+        """Commits can be conditional on the head.
+        """
+        with self.assertRaises(jsongit.HeadMismatchError):
+            self.repo.commit('foo', 'bar', if_head='0' * 40)
+        self.assertFalse(self.repo.committed('foo'))
+        self.assertFalse(self.repo.staged('foo'))
+        first = self.repo.commit('foo', 'bar', if_head=None)
+        self.repo.commit('foo', 'baz', if_head=first.oid)
+        with self.assertRaises(jsongit.HeadMismatchError):
+            self.repo.commit('foo', 'qux', if_head=first.hex)
+        with self.assertRaises(jsongit.HeadMismatchError):
+            self.repo.commit('foo', 'qux', if_head=None)
+        self.assertEqual('baz', self.repo.show('foo'))
@@ -0,0 +1,92 @@
+import json
+import os
+
+import jsongit
+import helpers
+from jsongit import serializers
+
+
+def sorted_dumps(value):
+    return json.dumps(value, sort_keys=True)
+
+
+
+class TestSerializers(helpers.RepoTestCase):
+
+    def setUp(self):
+        super(TestSerializers, self).setUp()
+        serializers.register('sorted-json', sorted_dumps, json.loads)
+
+    def tearDown(self):
+        serializers.unregister('sorted-json')
+        super(TestSerializers, self).tearDown()
+
+    def reopen(self, **kwargs):
+        return jsongit.init(repo=self.repo._repo, **kwargs)
+
+    def blob(self, key):
+        tree = self.repo.head(key)._commit.tree
+        return self.repo._repo[tree[0].oid].data
+
+    def test_default_is_untagged(self):
+        """Values written without a codec are plain JSON.
+        """
+        self.repo.commit('foo', {'roses': 'red'})
+        self.assertEqual(json.dumps({'roses': 'red'}), self.blob('foo'))
+
+    def test_codec_is_tagged(self):
+        """Values written with a codec carry its name.
+        """
+        repo = self.reopen(codec='sorted-json')
+        repo.commit('foo', {'violets': 'blue', 'roses': 'red'})
+        self.assertEqual('\x00sorted-json\x00' +
+                         sorted_dumps({'violets': 'blue', 'roses': 'red'}),
+                         self.blob('foo'))
+        self.assertEqual({'violets': 'blue', 'roses': 'red'}, repo.show('foo'))
+
+    def test_mixed_codecs(self):
+        """Repositories with different codecs read each other's values.
+        """
+        tagged = self.reopen(codec='sorted-json')
+        self.repo.commit('foo', 'plain')
+        tagged.commit('foo', 'tagged')
+        self.assertEqual('tagged', self.repo.show('foo'))
+        self.assertEqual('plain', tagged.show('foo', back=1))
+
+    def test_codec_in_index(self):
+        """Staged values are decoded with their codec.
+        """
+        repo = self.reopen(codec='sorted-json')
+        repo.add('foo', [1, 2, 3])
+        self.assertEqual([1, 2, 3], self.repo.index('foo'))
+
+    def test_unknown_codec(self):
+        """Asking for an unknown codec raises KeyError.
+        """
+        with self.assertRaises(KeyError):
+            self.reopen(codec='no-such-codec')
+
+    def test_unregistered_codec(self):
+        """Reading a blob whose codec is not registered names the codec.
+        """
+        repo = self.reopen(codec='sorted-json')
+        repo.commit('foo', 'bar')
+        serializers.unregister('sorted-json')
+        try:
+            with self.assertRaises(ValueError) as cm:
+                self.repo.show('foo')
+            self.assertIn("'sorted-json'", str(cm.exception))
+        finally:
+            serializers.register('sorted-json', sorted_dumps, json.loads)
+
+    def test_msgpack(self):
+        """The built-in msgpack codec round-trips values.
+        """
+        try:
+            repo = self.reopen(codec='msgpack')
+        except ImportError:
+            self.skipTest('msgpack is not installed')
+        value = {'roses': ['red', 1, 2.5, None, True]}
+        repo.commit('foo', value)
+        self.assertEqual(value, self.repo.show('foo'))
+        self.assertTrue(self.blob('foo').startswith('\x00msgpack\x00'))
@@ -0,0 +1,53 @@
+from helpers import RepoTestCase
+
+
+class TestSnapshot(RepoTestCase):
+
+    def test_snapshot_show(self):
+        """Snapshot shows values as of when it was taken.
+        """
+        self.repo.commit('roses', 'red')
+        snapshot = self.repo.snapshot()
+        self.repo.commit('roses', 'white')
+        self.assertEqual('red', snapshot.show('roses'))
+        self.assertEqual('white', self.repo.show('roses'))
+
+    def test_snapshot_consistent_across_keys(self):
+        """Keys committed after the snapshot are not visible.
+        """
+        self.repo.commit('roses', 'red')
+        snapshot = self.repo.snapshot()
+        self.repo.commit('violets', 'blue')
+        self.assertEqual(['roses'], snapshot.keys())
+        self.assertNotIn('violets', snapshot)
+        with self.assertRaises(KeyError):
+            snapshot.show('violets')
+
+    def test_snapshot_removed_key(self):
+        """Removing a key does not affect an existing snapshot.
+        """
+        self.repo.commit('foo', 'bar')
+        snapshot = self.repo.snapshot()
+        self.repo.remove('foo')
+        self.assertEqual('bar', snapshot.show('foo'))
+
+    def test_snapshot_log_and_back(self):
+        """Log and back are relative to the snapshot's head.
+        """
+        self.repo.commit('president', 'washington')
+        self.repo.commit('president', 'adams')
+        snapshot = self.repo.snapshot()
+        self.repo.commit('president', 'madison')
+        self.assertEqual(['adams', 'washington'],
+                         [c.data for c in snapshot.log('president')])
+        self.assertEqual('washington', snapshot.show('president', back=1))
+        with self.assertRaises(IndexError):
+            snapshot.show('president', back=2)
+
+    def test_snapshot_head(self):
+        """Snapshot heads are the same commits as in the repository.
+        """
+        self.repo.commit('foo', 'bar')
+        snapshot = self.repo.snapshot()
+        self.assertEqual(self.repo.head('foo'), snapshot.head('foo'))
+        self.assertEqual(self.repo, snapshot.head('foo').repo)
@@ -1,40 +1,11 @@
-import sys
 import helpers
 import threading
 import random as global_random
-import string
+
+from jsongit.bench.generators import random_string, random_object
 
 FEW = 3
 LOTS = 10
-MAX_DEPTH = 1
-
-def random_number(r, j, l, min=-sys.maxint, max=sys.maxint):
-    r.jumpahead(j + l)
-    return r.random() * (max - min) + min
-
-def random_string(r, j, l, min=1, max=50):
-    r.jumpahead(j + l)
-    return ''.join(r.choice(string.ascii_letters +
-                            string.digits)
-                   for i in xrange(r.randint(min, max)))
-
-def random_array(r, j, l, min=1, max=10):
-    if l > MAX_DEPTH:
-        return []
-    r.jumpahead(j + l)
-    return [random_object(r, i, l + 1) for i in xrange(r.randint(min, max))]
-
-def random_dict(r, j, l, min=1, max=10):
-    if l > MAX_DEPTH:
-        return {}
-    r.jumpahead(j + l)
-    return dict([(r.choice([random_string, random_number])(r, i, l),
-                  random_object(r, i, l + 1))
-                 for i in xrange(r.randint(min, max))])
-
-def random_object(r, j, l):
-    r.jumpahead(j + l)
-    return r.choice([random_array, random_dict, random_string, random_number])(r, j, l)
 
 def commit(repo, num_commits):
     r = global_random.Random()
@@ -48,7 +19,14 @@ class TestRepoThreading(helpers.RepoTestCase):
     def do_with_threads(self, size, func, *args):
         """Generate and start size threads with target func.
         """
-        pool = [threading.Thread(target=func, args=args) for i in range(size)]
+        self.errors = []
+
+        def target():
+            try:
+                func(*args)
+            except Exception as e:
+                self.errors.append(e)
+        pool = [threading.Thread(target=target) for i in range(size)]
         for thread in pool:
             thread.start()
         return pool
@@ -56,6 +34,7 @@ class TestRepoThreading(helpers.RepoTestCase):
     def join_threads(self, pool):
         for thread in pool:
             thread.join()
+        self.assertEqual([], self.errors)
 
     def test_commit_once_few(self):
         """Make one commit each.
@@ -0,0 +1,111 @@
+import os
+
+import jsongit
+import helpers
+from jsongit import tracing
+
+
+class TracingTestCase(helpers.RepoTestCase):
+
+    def setUp(self):
+        if os.path.lexists(helpers.PATH):
+            self.fail("Can't use %s for test repo, something is there." %
+                      helpers.PATH)
+        self.tracer = tracing.Recorder()
+        self.repo = jsongit.init(path=helpers.PATH, tracer=self.tracer)
+
+
+class TestRecorder(TracingTestCase):
+
+    def test_commit_spans(self):
+        """A commit's add and refs are children of the commit span.
+        """
+        self.repo.commit('foo', 'bar')
+        commit, = self.tracer.find('commit')
+        add, = self.tracer.find('add')
+        ref, = self.tracer.find('commit.ref')
+        self.assertIsNone(commit.parent)
+        self.assertIs(commit, add.parent)
+        self.assertIs(commit, ref.parent)
+        self.assertEqual('foo', commit.attributes['key'])
+        self.assertEqual('foo', ref.attributes['key'])
+        self.assertEqual(len('"bar"'), add.attributes['blob_size'])
+        self.assertTrue(commit.duration >= ref.duration >= 0)
+
+    def test_show_back(self):
+        """Shows record how far back they were asked to go.
+        """
+        self.repo.commit('foo', 'bar')
+        self.repo.commit('foo', 'baz')
+        self.tracer.clear()
+        self.repo.show('foo', back=1)
+        show, = self.tracer.find('show')
+        self.assertEqual({'key': 'foo', 'back': 1}, show.attributes)
+
+    def test_log_depth(self):
+        """A log's span ends when it has been iterated through, with the
+        number of commits walked.
+        """
+        self.repo.commit('foo', 'bar')
+        self.repo.commit('foo', 'baz')
+        self.tracer.clear()
+        log = self.repo.log('foo')
+        next(log)
+        self.assertEqual([], self.tracer.find('log'))
+        log.close()
+        span, = self.tracer.find('log')
+        self.assertEqual({'key': 'foo', 'depth': 1}, span.attributes)
+        self.assertTrue(span.duration >= 0)
+
+    def test_merge_spans(self):
+        """Merges trace the shared parent search, diffs and conflicts.
+        """
+        self.repo.commit('foo', {'roses': 'red'})
+        self.repo.checkout('foo', 'bar')
+        self.repo.commit('foo', {'roses': 'red', 'violets': 'blue'})
+        self.repo.commit('bar', {'roses': 'red', 'lilacs': 'purple'})
+        self.tracer.clear()
+        self.repo.merge('bar', 'foo')
+        merge, = [s for s in self.tracer.find('merge') if s.parent is None]
+        self.assertEqual('bar', merge.attributes['key'])
+        shared, = self.tracer.find('merge.shared_parent')
+        self.assertEqual(3, shared.attributes['depth'])
+        conflict, = self.tracer.find('merge.conflict')
+        self.assertFalse(conflict.attributes['conflict'])
+        for name in ('merge.shared_parent', 'merge.diff', 'merge.conflict',
+                     'merge.apply'):
+            span, = self.tracer.find(name)
+            self.assertIs(merge, span.parent, name)
+
+    def test_error(self):
+        """Spans record the error an operation failed with.
+        """
+        self.assertRaises(KeyError, self.repo.show, 'nothing')
+        show, = self.tracer.find('show')
+        self.assertIn('error', show.attributes)
+
+    def test_hooks(self):
+        """Subclasses are told when spans start and end.
+        """
+        events = []
+
+        class Tracer(tracing.Tracer):
+            def on_start(self, span):
+                events.append(('start', span.name))
+
+            def on_end(self, span):
+                events.append(('end', span.name))
+
+        self.repo._tracer = Tracer()
+        self.repo.add('foo', 'bar')
+        self.assertEqual([('start', 'add'), ('end', 'add')], events)
+
+
+class TestNullTracer(helpers.RepoTestCase):
+
+    def test_default(self):
+        """Repositories do not trace by default.
+        """
+        self.assertIs(tracing.NULL, self.repo._tracer)
+        self.repo.commit('foo', 'bar')
+        self.assertEqual('bar', self.repo.show('foo'))
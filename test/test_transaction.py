@@ -0,0 +1,102 @@
+import jsongit
+from helpers import RepoTestCase
+
+
+class TestTransaction(RepoTestCase):
+
+    def test_commits_together(self):
+        """Every change is made when the block ends.
+        """
+        self.repo.commit('jon', {'name': 'Jon'})
+        with self.repo.transaction(message='Rename') as tx:
+            tx.add('jonathan', {'name': 'Jonathan'})
+            tx.add('mary', {'name': 'Mary'})
+            tx.remove('jon')
+            self.assertEqual(['jon'], self.repo.keys())
+        self.assertEqual(['jonathan', 'mary'], self.repo.keys())
+        self.assertEqual({'name': 'Mary'}, self.repo.show('mary'))
+        self.assertEqual('Rename', self.repo.head('mary').message)
+        self.assertEqual(self.repo.head('mary'), tx.commits['mary'])
+        self.assertFalse(self.repo.staged('jon'))
+
+    def test_history(self):
+        """Changed keys keep their history.
+        """
+        self.repo.commit('jon', 'first')
+        with self.repo.transaction() as tx:
+            tx.add('jon', 'second')
+        self.assertEqual(['second', 'first'],
+                         [c.data for c in self.repo.log('jon')])
+
+    def test_exception_discards(self):
+        """Nothing changes if the block raises.
+        """
+        with self.assertRaises(RuntimeError):
+            with self.repo.transaction() as tx:
+                tx.add('foo', 'bar')
+                raise RuntimeError()
+        self.assertEqual([], self.repo.keys())
+
+    def test_bad_key_changes_nothing(self):
+        """Invalid keys are found before anything is written.
+        """
+        self.repo.commit('path/to', 'foo')
+        head = self.repo.head('path/to')
+        for bad in ('path/to/key', 'path', '/absolute'):
+            with self.assertRaises(jsongit.InvalidKeyError):
+                with self.repo.transaction() as tx:
+                    tx.add('good', 'value')
+                    tx.add('path/to', 'changed')
+                    tx.add(bad, 'bar')
+            self.assertEqual(['path/to'], self.repo.keys())
+            self.assertEqual(head, self.repo.head('path/to'))
+
+    def test_directory_freed_by_removal(self):
+        """A key can replace a directory whose keys are removed.
+        """
+        self.repo.commit('path/to', 'foo')
+        with self.repo.transaction() as tx:
+            tx.remove('path/to')
+            tx.add('path', 'bar')
+        self.assertEqual(['path'], self.repo.keys())
+
+    def test_failure_restores_index(self):
+        """The index is put back if the commit fails, nested keys included.
+        """
+        self.repo.commit('path/to', 'foo')
+        def fail(*args, **kwargs):
+            raise RuntimeError()
+        self.repo._commit_refs = fail
+        with self.assertRaises(RuntimeError):
+            with self.repo.transaction() as tx:
+                tx.remove('path/to')
+                tx.add('path', 'bar')
+        del self.repo._commit_refs
+        self.assertEqual([('path/to', 'unmodified')], list(self.repo.status()))
+        self.assertEqual('foo', self.repo.index('path/to'))
+
+    def test_bad_removal(self):
+        """Removing a key that does not exist changes nothing.
+        """
+        with self.assertRaises(KeyError):
+            with self.repo.transaction() as tx:
+                tx.add('foo', 'bar')
+                tx.remove('nothing')
+        self.assertEqual([], self.repo.keys())
+
+    def test_not_json(self):
+        """Values that cannot be serialized change nothing.
+        """
+        with self.assertRaises(jsongit.NotJsonError):
+            with self.repo.transaction() as tx:
+                tx.add('foo', 'bar')
+                tx.add('baz', object())
+        self.assertEqual([], self.repo.keys())
+
+    def test_committed_once(self):
+        """A transaction cannot be committed twice.
+        """
+        with self.repo.transaction() as tx:
+            tx.add('foo', 'bar')
+        self.assertRaises(ValueError, tx.add, 'foo', 'baz')
+        self.assertRaises(ValueError, tx.commit)
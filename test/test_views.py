@@ -0,0 +1,153 @@
+import jsongit
+import helpers
+from jsongit import views
+
+
+class TestPaths(helpers.unittest.TestCase):
+
+    def test_parse_path(self):
+        """Paths are split into keys and indices.
+        """
+        self.assertEqual(('user', 'emails', 0, 'domain'),
+                         views.parse_path('user.emails[0].domain'))
+        for path in ('', '.a', 'a.', 'a..b', 'a[b]'):
+            self.assertRaises(ValueError, views.parse_path, path)
+
+    def test_extract(self):
+        """Paths that lead nowhere extract nothing.
+        """
+        value = {'a': [{'b': 1}]}
+        self.assertEqual(1, views.extract(value, ('a', 0, 'b')))
+        self.assertIs(views.MISSING, views.extract(value, ('a', 1, 'b')))
+        self.assertIs(views.MISSING, views.extract(value, ('a', 'b')))
+
+
+class TestViews(helpers.RepoTestCase):
+
+    def test_find(self):
+        """Finds keys by the terms extracted from their values.
+        """
+        self.repo.commit('jon', {'status': 'active'})
+        self.repo.create_view('status', path='status')
+        self.repo.commit('mary', {'status': 'active'})
+        self.repo.commit('bob', {'status': 'retired'})
+        self.repo.commit('sue', 'no status')
+        self.assertEqual(['jon', 'mary'], self.repo.find(status='active'))
+        self.assertEqual(['bob'], self.repo.find(status='retired'))
+        self.assertEqual([], self.repo.find(status='missing'))
+
+    def test_updates(self):
+        """Views follow commits, removals and merges.
+        """
+        self.repo.create_view('status', path='status')
+        self.repo.commit('jon', {'status': 'active', 'age': 30})
+        self.repo.checkout('jon', 'mary')
+        self.repo.commit('jon', {'status': 'retired', 'age': 30})
+        self.assertEqual(['mary'], self.repo.find(status='active'))
+        self.repo.merge('mary', 'jon')
+        self.assertEqual(['jon', 'mary'], self.repo.find(status='retired'))
+        self.repo.remove('jon')
+        self.assertEqual(['mary'], self.repo.find(status='retired'))
+
+    def test_func_and_criteria(self):
+        """Function views combine with other views.
+        """
+        self.repo.create_view('status', path='status')
+        self.repo.create_view('domain',
+                              func=lambda v: v['email'].split('@')[1])
+        self.repo.commit('jon', {'status': 'active', 'email': 'jon@q.com'})
+        self.repo.commit('mary', {'status': 'active', 'email': 'mary@r.com'})
+        self.assertEqual(['jon'],
+                         self.repo.find(status='active', domain='q.com'))
+        self.assertRaises(KeyError, self.repo.find, nothing=1)
+
+    def test_persisted(self):
+        """Views created again only read keys that changed since.
+        """
+        self.repo.create_view('status', path='status')
+        self.repo.commit('jon', {'status': 'active'})
+        self.repo.commit('mary', {'status': 'active'})
+        other = jsongit.init(helpers.PATH)
+        other.commit('mary', {'status': 'retired'})
+        shown = []
+        show = other._show_hex
+        other._show_hex = lambda hex: shown.append(hex) or show(hex)
+        other.create_view('status', path='status')
+        self.assertEqual(1, len(shown))
+        self.assertEqual(['jon'], other.find(status='active'))
+
+    def test_refresh(self):
+        """Changes from other repository objects are picked up on refresh.
+        """
+        self.repo.create_view('status', path='status')
+        other = jsongit.init(helpers.PATH)
+        other.commit('jon', {'status': 'active'})
+        self.assertEqual([], self.repo.find(status='active'))
+        self.repo.refresh_views()
+        self.assertEqual(['jon'], self.repo.find(status='active'))
+
+    def test_drop(self):
+        """Dropped views can no longer be searched.
+        """
+        self.repo.create_view('status', path='status')
+        self.repo.drop_view('status')
+        self.assertRaises(KeyError, self.repo.find, status='active')
+
+
+class TestIndexes(helpers.RepoTestCase):
+
+    def setUp(self):
+        super(TestIndexes, self).setUp()
+        self.repo.create_index('by_email', path='user.email')
+        self.repo.create_index('by_age', path='user.age')
+        for key, email, age in [('jon', 'jon@q.com', 30),
+                                ('mary', 'mary@q.com', 17),
+                                ('bob', 'bob@r.com', 65),
+                                ('sue', 'sue@r.com', 'unknown')]:
+            self.repo.commit(key, {'user': {'email': email, 'age': age}})
+
+    def test_query(self):
+        """Finds keys by an exact term.
+        """
+        self.assertEqual(['jon'], self.repo.query('by_email', 'jon@q.com'))
+        self.assertEqual([], self.repo.query('by_email', 'no@one.com'))
+
+    def test_range(self):
+        """Finds keys by a range of terms of the same type, in order.
+        """
+        self.assertEqual(['jon', 'bob'],
+                         self.repo.query('by_age', low=18, high=65))
+        self.assertEqual(['mary', 'jon'], self.repo.query('by_age', high=30))
+        self.assertEqual(['bob'], self.repo.query('by_age', low=31))
+        self.assertEqual(['sue'], self.repo.query('by_age', low='a'))
+        self.assertRaises(TypeError, self.repo.query, 'by_age', low=1,
+                          high='z')
+        self.assertRaises(TypeError, self.repo.query, 'by_age')
+
+    def test_maintained(self):
+        """Ranges follow commits and removals.
+        """
+        self.repo.commit('mary', {'user': {'email': 'mary@q.com', 'age': 18}})
+        self.repo.remove('bob')
+        self.assertEqual(['mary', 'jon'],
+                         self.repo.query('by_age', low=18, high=65))
+
+    def test_values(self):
+        """Returns values along with keys if asked.
+        """
+        self.assertEqual([('jon', {'user': {'email': 'jon@q.com', 'age': 30}})],
+                         self.repo.query('by_email', 'jon@q.com', values=True))
+
+    def test_persisted(self):
+        """Indexes created again keep their order.
+        """
+        other = jsongit.init(helpers.PATH)
+        other.create_index('by_age', path='user.age')
+        self.assertEqual(['jon', 'bob'], other.query('by_age', low=18))
+
+    def test_view_is_not_an_index(self):
+        """Views can be queried by exact term but not by range.
+        """
+        self.repo.create_view('status', path='status')
+        self.assertEqual([], self.repo.query('status', 'active'))
+        self.assertRaises(TypeError, self.repo.query, 'status', low=1)
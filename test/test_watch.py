@@ -0,0 +1,79 @@
+import helpers
+
+
+class TestWatch(helpers.RepoTestCase):
+
+    def test_commit(self):
+        """Commits through the repository are delivered directly.
+        """
+        watcher = self.repo.watch(poll=None)
+        self.repo.commit('foo', 'bar')
+        first = self.repo.head('foo').oid
+        self.repo.commit('foo', 'baz')
+        second = self.repo.head('foo').oid
+        self.assertEqual(('foo', None, first), watcher.get(timeout=0))
+        self.assertEqual(('foo', first, second), watcher.get(timeout=0))
+        self.assertIsNone(watcher.get(timeout=0))
+        watcher.close()
+
+    def test_remove(self):
+        """Removals have no new head.
+        """
+        self.repo.commit('foo', 'bar')
+        oid = self.repo.head('foo').oid
+        watcher = self.repo.watch(poll=None)
+        self.repo.remove('foo')
+        self.assertEqual(('foo', oid, None), watcher.get(timeout=0))
+        watcher.close()
+
+    def test_prefix(self):
+        """Only keys under the prefix are watched.
+        """
+        watcher = self.repo.watch('roses/', poll=None)
+        self.repo.commit('violets/blue', True)
+        self.repo.commit('roses/red', True)
+        self.assertEqual('roses/red', watcher.get(timeout=0).key)
+        self.assertIsNone(watcher.get(timeout=0))
+        watcher.close()
+
+    def test_bounded(self):
+        """The oldest events are discarded when the buffer is full.
+        """
+        watcher = self.repo.watch(poll=None, maxlen=2)
+        for i in range(3):
+            self.repo.commit('key%d' % i, i)
+        self.assertEqual(1, watcher.dropped)
+        self.assertEqual(['key1', 'key2'], [e.key for e in
+                                            [watcher.get(timeout=0),
+                                             watcher.get(timeout=0)]])
+        watcher.close()
+
+    def test_close_ends_iteration(self):
+        """Iteration ends with the buffered events once closed.
+        """
+        watcher = self.repo.watch(poll=None)
+        self.repo.commit('foo', 'bar')
+        watcher.close()
+        self.assertEqual(['foo'], [e.key for e in watcher])
+        self.repo.commit('foo', 'baz')
+        self.assertIsNone(watcher.get(timeout=0))
+
+    def test_other_process(self):
+        """Changes from other repository objects are found by polling.
+        """
+        other = helpers.jsongit.init(helpers.PATH)
+        with self.repo.watch(poll=0.05) as watcher:
+            other.commit('foo', 'bar')
+            event = watcher.get(timeout=5)
+            self.assertEqual(('foo', None, other.head('foo').oid), event)
+
+    def test_rescan(self):
+        """Watchers that do not poll can be rescanned by hand.
+        """
+        other = helpers.jsongit.init(helpers.PATH)
+        watcher = self.repo.watch(poll=None)
+        other.commit('foo', 'bar')
+        self.assertIsNone(watcher.get(timeout=0))
+        watcher.rescan()
+        self.assertEqual('foo', watcher.get(timeout=0).key)
+        watcher.close()